@@ -0,0 +1,51 @@
+# bench_data.py - Synthetic checklist templates and reports shared by the benchmark scripts
+#
+# Reports are seeded by their number, so every run (and every script) generates the same data.
+# Import from a benchmark script run as `python benchmarks/<script>.py` (this folder is then on sys.path).
+
+import os
+import random
+import sys
+from datetime import date
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from checklist_template import compile_structure
+from report_core import BUILTIN_TEMPLATE, METADATA_FIELDS, ReportModel
+
+WORDS = ("forklift", "reversed", "into", "rack", "upright", "aisle", "spill", "kit", "pallet", "blocked", "exit",
+         "extinguisher", "inspected", "cordoned", "night", "shift", "trained", "sensor", "dock", "leveller")
+
+
+def make_template(questions):
+    """The built-in checklist (questions=0) or a generated one with `questions` questions in sections of 10."""
+    if not questions: return BUILTIN_TEMPLATE
+    structure = [(f"Section {s + 1}", [(f"Question {n + 1}: is area {n + 1} compliant?", "yes_no" if n % 3 else "text", n % 2 == 0)
+                                      for n in range(s * 10, min(questions, s * 10 + 10))])
+                 for s in range((questions + 9) // 10)]
+    return compile_structure(f"Benchmark ({questions} questions)", structure)
+
+def words(rng, chars):
+    """About `chars` characters of checklist-like text."""
+    text = []
+    while sum(len(w) + 1 for w in text) < chars: text.append(rng.choice(WORDS))
+    return " ".join(text)[:chars]
+
+def make_report(n, template=None, links=3, text=300):
+    """Fully filled-in report number `n`: every METADATA_FIELDS entry and every question answered, `links` links
+    per list and a near miss with `text` characters of description (text=0: no near miss)."""
+    rng = random.Random(n)
+    report = ReportModel(template)
+    month = date(2024, n % 12 + 1, 1)
+    values = {"Warehouse Name": f"WH{n % 25:02d}", "Location": "Pune", "Report Date": month.isoformat(), "Report Month": month.strftime("%B %Y"),
+              "Uploaded By Role": "Safety Champion", "Uploaded By Email": f"inspector{n}@example.com"}
+    report.metadata.update({field: values.get(field, f"{field} {n}") for field in METADATA_FIELDS})
+    report.answers[:] = [rng.choice(("Yes", "No", "N/A")) if q.type == "yes_no" else words(rng, 60) for q in report.template.questions]
+    if text:
+        report.near_miss.update({"Incident Date": month.replace(day=2).isoformat(), "Incident Location": f"Aisle {n % 9 + 1}",
+                                 "Description": words(rng, text), "Immediate Action": words(rng, max(1, text // 4)),
+                                 "Prevention Suggestion": words(rng, max(1, text // 4))})
+        report.near_miss_attachments[:] = [f"https://example.com/nm/{n}/{i}.jpg" for i in range(links)]
+    report.action_points = words(rng, 500)
+    report.general_attachments[:] = [f"https://example.com/evidence/{n}/{i}.jpg" for i in range(links)]
+    return report
@@ -0,0 +1,61 @@
+# bench_pdf_export.py - Per-report PDF export time for a batch of reports
+#
+# Usage (from the project folder):
+#   python benchmarks/bench_pdf_export.py [--reports 500] [--keep]
+#
+# "cached" is the normal path (styles and template parts built once per process);
+# "uncached" clears those caches before every report, which is what each export
+# used to pay. Reports are synthetic but fully filled in, with a few links each.
+
+import argparse
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import exporters
+from bench_data import make_report
+
+def clear_caches():
+    exporters._pdf_styles = None
+    exporters._parsed_paragraphs.clear()
+    exporters._pdf_template_parts.clear()
+
+def run(reports, out_dir, cached):
+    times = []
+    for i, report in enumerate(reports):
+        if not cached: clear_caches()
+        t = time.perf_counter()
+        exporters.export_to_pdf(report, os.path.join(out_dir, f"report_{i}.pdf"))
+        times.append(time.perf_counter() - t)
+    return times
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure per-report PDF export time.")
+    parser.add_argument("--reports", type=int, default=500)
+    parser.add_argument("--keep", action="store_true", help="Keep the generated PDFs (prints the folder)")
+    args = parser.parse_args(argv)
+    if not exporters.REPORTLAB_AVAILABLE:
+        sys.exit("reportlab is not installed.")
+
+    reports = [make_report(n, text=0) for n in range(args.reports)]
+    out_dir = tempfile.mkdtemp(prefix="pdf_bench_")
+    exporters.export_to_pdf(reports[0], os.path.join(out_dir, "warmup.pdf")) # Library import, fonts
+    try:
+        for name, cached in (("uncached", False), ("cached", True)):
+            clear_caches()
+            t = time.perf_counter()
+            times = run(reports, out_dir, cached)
+            total = time.perf_counter() - t
+            print(f"{name:<9} {len(times)} reports in {total:6.2f} s   per report: median {statistics.median(times) * 1000:6.1f} ms"
+                  f"   mean {statistics.mean(times) * 1000:6.1f} ms")
+    finally:
+        if args.keep: print(f"PDFs written to {out_dir}")
+        else: shutil.rmtree(out_dir, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+# bench_project_format.py - Size and load time of JSON vs. compact (.wsc) project files
+#
+# Usage (from the project folder):
+#   python benchmarks/bench_project_format.py [--reports 2000]
+#
+# "header" opens compact files for their metadata only (what the app and `export` file naming
+# need up front); "full" decodes every section into a ReportModel. Reports are synthetic, with
+# every question answered, a near miss on every third report and a few links each.
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_data import make_report
+from project_format import CompactProject
+from report_core import ReportModel, read_project_file, read_project_metadata, write_project_file
+
+def timed(label, func, paths, total_bytes=None, repeat=3):
+    elapsed = float("inf")
+    for _ in range(repeat): # Best of `repeat` passes (the first one also warms the OS file cache)
+        t = time.perf_counter()
+        for path in paths: func(path)
+        elapsed = min(elapsed, time.perf_counter() - t)
+    size = f"   {total_bytes / len(paths):7.0f} bytes/file" if total_bytes is not None else ""
+    print(f"{label:<22} {elapsed * 1000:8.1f} ms   {elapsed / len(paths) * 1e6:7.1f} us/file{size}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare JSON and compact project files.")
+    parser.add_argument("--reports", type=int, default=2000)
+    args = parser.parse_args(argv)
+
+    out_dir = tempfile.mkdtemp(prefix="format_bench_")
+    try:
+        paths = {".json": [], ".wsc": []}
+        for n in range(args.reports):
+            report = make_report(n, text=300 if n % 3 == 0 else 0) # A near miss on every third report
+            for ext, files in paths.items():
+                files.append(os.path.join(out_dir, f"SafetyChecklist_{n}{ext}"))
+                write_project_file(files[-1], report)
+        sizes = {ext: sum(os.path.getsize(p) for p in files) for ext, files in paths.items()}
+        print(f"{args.reports} reports; compact files are {sizes['.json'] / sizes['.wsc']:.1f}x smaller")
+        timed("json metadata", read_project_metadata, paths[".json"], sizes[".json"])
+        timed("compact header", read_project_metadata, paths[".wsc"], sizes[".wsc"])
+        timed("json full", lambda p: ReportModel.from_dict(read_project_file(p)), paths[".json"])
+        timed("compact full", lambda p: CompactProject.open(p).to_report(), paths[".wsc"])
+    finally:
+        shutil.rmtree(out_dir, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+# bench_startup.py - Measures module import (cold-start) time of main.py
+#
+# Usage (from the project folder):
+#   python benchmarks/bench_startup.py [--runs 10] [--interactive]
+#
+# Each run is a fresh interpreter so nothing is cached in-process. "main.py" is the
+# real import; "main.py + export libs" adds the openpyxl/reportlab imports that used
+# to happen at module load, to show what the lazy loading saves.
+# --interactive also starts the app (needs a display) and reports time-to-interactive: from
+# importing main.py until the first checklist section can be answered, and until every section
+# is built. Run it on both versions to compare startup changes.
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CASES = {
+    "main.py": "import main",
+    "main.py + export libs": "import main, openpyxl, reportlab.platypus, reportlab.lib.styles",
+}
+
+def time_import(statement, runs):
+    """Returns per-run wall times (seconds) for importing `statement` in a fresh interpreter."""
+    code = f"import time; t = time.perf_counter(); {statement}; print(time.perf_counter() - t)"
+    times = []
+    for _ in range(runs):
+        out = subprocess.run([sys.executable, "-c", code], cwd=PROJECT_DIR, check=True,
+                             capture_output=True, text=True).stdout
+        times.append(float(out.strip().splitlines()[-1]))
+    return times
+
+INTERACTIVE_CODE = """
+import os, sys, tempfile, time
+os.environ["HOME"] = os.environ["USERPROFILE"] = tempfile.mkdtemp() # No journal recovery prompt from real autosaves
+import main
+app = main.WarehouseSafetyApp()
+def check():
+    if getattr(app, "startup_seconds", None) is None or getattr(app.checklist_frame, "building", False):
+        app.after(2, check)
+        return
+    print(app.startup_seconds, time.perf_counter() - main._PROCESS_START)
+    app.destroy()
+app.after(2, check)
+app.mainloop()
+"""
+
+def time_to_interactive(runs):
+    """Returns (first section usable, all sections built) times in seconds per run of the app."""
+    times = []
+    for _ in range(runs):
+        out = subprocess.run([sys.executable, "-c", INTERACTIVE_CODE], cwd=PROJECT_DIR, check=True,
+                             capture_output=True, text=True, timeout=120).stdout
+        times.append(tuple(float(v) for v in out.strip().splitlines()[-1].split()))
+    return times
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure main.py cold-start import time.")
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--interactive", action="store_true", help="Also measure time-to-interactive of the window")
+    args = parser.parse_args(argv)
+    for name, statement in CASES.items():
+        try:
+            times = time_import(statement, args.runs)
+        except subprocess.CalledProcessError as e:
+            print(f"{name:<24} failed: {e.stderr.strip().splitlines()[-1] if e.stderr else e}")
+            continue
+        print(f"{name:<24} median {statistics.median(times) * 1000:7.1f} ms   min {min(times) * 1000:7.1f} ms")
+    if args.interactive:
+        try:
+            runs = time_to_interactive(args.runs)
+        except subprocess.CalledProcessError as e:
+            print(f"time to interactive failed (no display?): {e.stderr.strip().splitlines()[-1] if e.stderr else e}")
+            return
+        for label, times in (("first section usable", [r[0] for r in runs]), ("all sections built", [r[1] for r in runs])):
+            print(f"{label:<24} median {statistics.median(times) * 1000:7.1f} ms   min {min(times) * 1000:7.1f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+# bench_suite.py - Benchmark suite for the load, save, rebuild and export paths, with JSON results
+#
+# Usage (from the project folder):
+#   python benchmarks/bench_suite.py -o results.json                  headless paths only
+#   xvfb-run python benchmarks/bench_suite.py --gui -o results.json   also the app methods (needs a display)
+#   python benchmarks/bench_suite.py -o new.json --compare old.json   flag operations >10% slower than old.json
+#   python benchmarks/bench_suite.py --questions 500 --links 200 --text 10000   one custom case
+#
+# Reports come from bench_data.py (seeded, so every run is the same). Each case scales three
+# things: the question count (0 = the built-in checklist), the number of evidence links and the
+# near-miss text size. Each operation runs --repeat times; median/min/max are reported in ms.
+# Headless operations call the same functions the app uses (ReportModel, project_schema,
+# write_project_file, exporters). With --gui they also run through a hidden WarehouseSafetyApp:
+# load_data, switching between two open reports, get_all_data, _write_project_file,
+# ChecklistFrame.rebuild_checklist_ui, _export_to_excel and _export_to_pdf.
+# The suite runs against a throw-away home folder, so the user's autosave journals, template cache
+# and report store are neither read nor changed.
+
+import os
+import sys
+import tempfile
+
+BENCH_HOME = tempfile.mkdtemp(prefix="bench_home_")
+os.environ["HOME"] = os.environ["USERPROFILE"] = BENCH_HOME # Before the app modules resolve ~/.warehouse_safety
+for _name in ("WAREHOUSE_REPORT_DB", "WAREHOUSE_CHECKLIST_TEMPLATE", "WAREHOUSE_PROFILE"): os.environ.pop(_name, None)
+
+import argparse
+import json
+import platform
+import shutil
+import statistics
+import subprocess
+import time
+from datetime import datetime
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_DIR)
+
+import exporters
+from bench_data import make_report, make_template
+from project_schema import load_project_file
+from report_core import ReportModel, write_project_file
+
+CASES = { # questions (0 = built-in checklist), evidence links per list, near-miss text characters
+    "builtin": {"questions": 0, "links": 3, "text": 300},
+    "many_links": {"questions": 0, "links": 500, "text": 300},
+    "long_near_miss": {"questions": 0, "links": 3, "text": 50000},
+    "large_template": {"questions": 1000, "links": 50, "text": 2000},
+}
+
+
+# ==============================================================================
+# Timing
+# ==============================================================================
+def measure(func, repeat):
+    """Calls func(run_number) `repeat` times after one warm-up call; returns the result dict in ms."""
+    func(-1)
+    times = []
+    for run in range(repeat):
+        t = time.perf_counter()
+        func(run)
+        times.append((time.perf_counter() - t) * 1000)
+    return {"median_ms": round(statistics.median(times), 3), "min_ms": round(min(times), 3), "max_ms": round(max(times), 3), "runs": repeat}
+
+def headless_ops(template, reports, out_dir):
+    """name -> func(run) for the Tk-free paths; reports alternate so every load changes every field."""
+    data = [r.to_dict() for r in reports]
+    paths = {ext: os.path.join(out_dir, f"bench{ext}") for ext in (".json", ".wsc")}
+    for ext, path in paths.items(): write_project_file(path, data[0], template)
+    model = ReportModel(template)
+    ops = {
+        "load_project_file.json": lambda run: load_project_file(paths[".json"], template),
+        "load_project_file.wsc": lambda run: load_project_file(paths[".wsc"], template),
+        "model.update_from_dict": lambda run: model.update_from_dict(data[run % 2]),
+        "model.to_dict": lambda run: reports[0].to_dict(),
+        "write_project_file.json": lambda run: write_project_file(paths[".json"], data[run % 2], template),
+        "write_project_file.wsc": lambda run: write_project_file(paths[".wsc"], data[run % 2], template),
+    }
+    if exporters.OPENPYXL_AVAILABLE:
+        ops["export_to_excel"] = lambda run: exporters.export_to_excel(reports[0], os.path.join(out_dir, "bench.xlsx"))
+    if exporters.REPORTLAB_AVAILABLE:
+        ops["export_to_pdf"] = lambda run: exporters.export_to_pdf(reports[0], os.path.join(out_dir, "bench.pdf"))
+    return ops
+
+def gui_ops(app, template, reports, out_dir):
+    """name -> func(run) for the app methods; idle tasks are flushed so widget redraws are included."""
+    app.set_template(template)
+    data = [r.to_dict() for r in reports]
+    project_path = os.path.join(out_dir, "bench_app.json")
+
+    def load(run):
+        app.load_data(data[run % 2])
+        app.update_idletasks()
+
+    def rebuild(run):
+        app.checklist_frame.rebuild_checklist_ui()
+        while app.checklist_frame.building: app.update() # Sections after the first are built in steps
+        app.update_idletasks()
+
+    def switch(run): # Between two open reports: only the bound values change
+        app.show_next_document()
+        app.update_idletasks()
+
+    for i in range(2): # Two report tabs to switch between
+        path = os.path.join(out_dir, f"bench_app_tab{i}.json")
+        write_project_file(path, data[i], template)
+        app.load_project(path)
+
+    ops = {"app.load_data": load, "app.switch_document": switch, "app.get_all_data": lambda run: app.get_all_data(),
+           "app._write_project_file": lambda run: app._write_project_file(project_path), "ChecklistFrame.rebuild_checklist_ui": rebuild}
+    if exporters.OPENPYXL_AVAILABLE:
+        ops["app._export_to_excel"] = lambda run: app._export_to_excel(data[0], os.path.join(out_dir, "bench_app.xlsx"))
+    if exporters.REPORTLAB_AVAILABLE:
+        ops["app._export_to_pdf"] = lambda run: app._export_to_pdf(data[0], os.path.join(out_dir, "bench_app.pdf"))
+    return ops
+
+def start_app():
+    """A hidden WarehouseSafetyApp, or (None, reason) when there is no display."""
+    if sys.platform.startswith("linux") and not (os.environ.get("DISPLAY") or os.environ.get("WAYLAND_DISPLAY")):
+        return None, "no display (run under xvfb-run)"
+    try:
+        import main as app_module
+        app = app_module.WarehouseSafetyApp()
+    except Exception as e: # tkinter.TclError without a usable display, missing customtkinter, ...
+        return None, f"could not start the app ({e})"
+    app.withdraw()
+    app.update() # Runs the scheduled initial checklist build
+    return app, None
+
+
+# ==============================================================================
+# Results
+# ==============================================================================
+def environment():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=PROJECT_DIR, capture_output=True, text=True).stdout.strip()
+    except OSError:
+        commit = ""
+    packages = {}
+    for name in ("customtkinter", "openpyxl", "reportlab", "numpy"):
+        try:
+            packages[name] = getattr(__import__(name), "__version__", "?")
+        except ImportError:
+            packages[name] = None
+    return {"created": datetime.now().isoformat(timespec="seconds"), "commit": commit, "python": platform.python_version(),
+            "platform": platform.platform(), "packages": packages}
+
+def compare(results, baseline, threshold):
+    """Prints new/old median ratios per operation. Returns the number of regressions beyond `threshold`."""
+    regressions = 0
+    print(f"\nCompared with {baseline['environment'].get('commit') or 'baseline'} ({baseline['environment'].get('created', '?')}):")
+    for case, ops in results["cases"].items():
+        old_ops = baseline.get("cases", {}).get(case, {}).get("results", {})
+        for op, result in ops["results"].items():
+            old = old_ops.get(op)
+            if not old or "median_ms" not in old or "median_ms" not in result: continue
+            ratio = result["median_ms"] / old["median_ms"] if old["median_ms"] else 1.0
+            flag = "  REGRESSION" if ratio > 1 + threshold else ""
+            regressions += bool(flag)
+            print(f"  {case:<16} {op:<36} {old['median_ms']:9.2f} -> {result['median_ms']:9.2f} ms  x{ratio:5.2f}{flag}")
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time the load, save, rebuild and export paths; results go to JSON.")
+    parser.add_argument("-o", "--out", default="bench_results.json", help="Result file (default: bench_results.json)")
+    parser.add_argument("--cases", nargs="+", choices=sorted(CASES), help="Cases to run (default: all)")
+    parser.add_argument("--questions", type=int, help="Run one custom case with this many questions (0 = built-in)")
+    parser.add_argument("--links", type=int, default=3, help="Links per list for the custom case")
+    parser.add_argument("--text", type=int, default=300, help="Near-miss description characters for the custom case")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--gui", action="store_true", help="Also time the app methods (needs a display, e.g. xvfb-run)")
+    parser.add_argument("--compare", metavar="BASELINE", help="Earlier result file to compare medians with")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Slowdown counted as a regression (default: 0.10)")
+    args = parser.parse_args(argv)
+
+    if args.questions is not None:
+        cases = {"custom": {"questions": args.questions, "links": args.links, "text": args.text}}
+    else:
+        cases = {name: CASES[name] for name in (args.cases or CASES)}
+    app, gui_skipped = start_app() if args.gui else (None, "not requested (--gui)")
+    if args.gui and app is None: print(f"App operations skipped: {gui_skipped}")
+    results = {"suite": "warehouse-checklist", "version": 1, "environment": environment(), "repeat": args.repeat,
+               "gui_skipped": gui_skipped, "cases": {}}
+    out_dir = tempfile.mkdtemp(prefix="bench_suite_")
+    try:
+        for name, params in cases.items():
+            template = make_template(params["questions"])
+            reports = [make_report(n, template, params["links"], params["text"]) for n in (1, 2)]
+            print(f"{name}: {len(template)} questions, {params['links']} links per list, {params['text']} near-miss characters")
+            ops = headless_ops(template, reports, out_dir)
+            if app is not None: ops.update(gui_ops(app, template, reports, out_dir))
+            case_results = {}
+            for op, func in ops.items():
+                case_results[op] = measure(func, args.repeat)
+                print(f"  {op:<36} median {case_results[op]['median_ms']:9.2f} ms   min {case_results[op]['min_ms']:9.2f} ms")
+            results["cases"][name] = {"params": dict(params, questions=len(template)), "results": case_results}
+    finally:
+        if app is not None: app.destroy()
+        shutil.rmtree(out_dir, ignore_errors=True)
+        shutil.rmtree(BENCH_HOME, ignore_errors=True)
+
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"Results written to {args.out}")
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        print(f"{regressions} regression(s) beyond {args.threshold:.0%}.")
+        return 1 if regressions else 0
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,193 @@
+# checklist_template.py - Checklist templates loaded from JSON/YAML, compiled and cached on disk
+#
+# Template file layout (JSON shown; YAML with the same keys works if PyYAML is installed):
+#   {
+#     "name": "Cold Storage Warehouse",
+#     "sections": [
+#       {"title": "Fire Safety Training",
+#        "questions": [
+#          {"id": "fire_training_commenced", "text": "Have you commenced ...?", "type": "yes_no", "mandatory": true,
+#           "previous_texts": ["Has fire training started?"]}
+#        ]}
+#     ]
+#   }
+#
+# Question ids must be unique and should never change once reports exist; the question text may be
+# reworded freely. The optional "previous_texts" lists earlier wordings, so answers saved under an
+# old text still load. Compiled templates are pickled under TEMPLATE_CACHE_DIR keyed by a hash of the file
+# contents, so large templates are only parsed and validated once.
+
+import hashlib
+import importlib.util
+import json
+import os
+import pickle
+import re
+from collections import namedtuple
+
+YAML_AVAILABLE = importlib.util.find_spec("yaml") is not None
+ANSWER_TYPES = ("yes_no", "text")
+TEMPLATE_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".warehouse_safety", "template_cache")
+_COMPILER_VERSION = "1" # Bump when CompiledTemplate changes shape, to invalidate old caches
+
+# One compiled question: position is the index within its section
+TemplateQuestion = namedtuple("TemplateQuestion", "id text type mandatory section_index position")
+
+
+class TemplateError(Exception):
+    """Raised when a checklist template file is missing, unreadable or invalid."""
+
+
+class CompiledTemplate:
+    """Checklist template in ready-to-use form.
+
+    `sections` has the same shape as CHECKLIST_STRUCTURE: [(title, [(text, answer_type, mandatory), ...]), ...].
+    `questions` lists every TemplateQuestion in checklist order; report answers are stored by that index.
+    """
+    __slots__ = ("name", "content_hash", "sections", "questions", "index_by_id", "index_by_text", "section_ranges")
+
+    def __init__(self, name, content_hash, questions, section_titles, previous_texts=()):
+        self.name = name
+        self.content_hash = content_hash
+        self.questions = tuple(questions)
+        self.index_by_id = {q.id: i for i, q in enumerate(self.questions)}
+        self.index_by_text = {q.text: i for i, q in enumerate(self.questions)}
+        for text, index in previous_texts: self.index_by_text.setdefault(text, index) # (old text, question index)
+        self.section_ranges = [] # (first, end) question index per section
+        self.sections = []
+        start = 0
+        for section_index, title in enumerate(section_titles):
+            end = start
+            while end < len(self.questions) and self.questions[end].section_index == section_index: end += 1
+            self.section_ranges.append((start, end))
+            self.sections.append((title, [(q.text, q.type, q.mandatory) for q in self.questions[start:end]]))
+            start = end
+
+    def __getstate__(self):
+        return {k: getattr(self, k) for k in self.__slots__}
+
+    def __setstate__(self, state):
+        for k, v in state.items(): setattr(self, k, v)
+
+    def __len__(self):
+        return len(self.questions)
+
+    def find(self, key):
+        """Returns the question index for a question id or text (None if unknown)."""
+        index = self.index_by_id.get(key)
+        return index if index is not None else self.index_by_text.get(key)
+
+
+# ==============================================================================
+# Compiling
+# ==============================================================================
+def slugify(text, max_length=48):
+    """Derives an id-style slug from question text (used for templates without explicit ids)."""
+    return re.sub(r"[^a-z0-9]+", "_", text.lower()).strip("_")[:max_length].rstrip("_")
+
+def compile_structure(name, structure, content_hash=None):
+    """Compiles a CHECKLIST_STRUCTURE-style literal; ids are derived from the question text."""
+    sections = [{"title": title, "questions": [{"id": slugify(qt), "text": qt, "type": at, "mandatory": m}
+                                               for qt, at, m in questions]}
+                for title, questions in structure]
+    definition = {"name": name, "sections": sections}
+    if content_hash is None:
+        content_hash = hashlib.sha256(json.dumps(definition, sort_keys=True).encode("utf-8")).hexdigest()
+    return compile_definition(definition, content_hash)
+
+def compile_definition(definition, content_hash):
+    """Validates a parsed template definition and returns a CompiledTemplate. Raises TemplateError."""
+    if not isinstance(definition, dict) or not isinstance(definition.get("sections"), list):
+        raise TemplateError("Template must be an object with a 'sections' list.")
+    problems, questions, titles, seen_ids, previous_texts = [], [], [], set(), []
+    for s_idx, section in enumerate(definition["sections"]):
+        if not isinstance(section, dict) or not section.get("title") or not isinstance(section.get("questions"), list):
+            problems.append(f"sections[{s_idx}]: needs a 'title' and a 'questions' list")
+            continue
+        titles.append(str(section["title"]))
+        position = 0
+        for q_idx, q in enumerate(section["questions"]):
+            where = f"sections[{s_idx}].questions[{q_idx}]"
+            if not isinstance(q, dict) or not q.get("text"):
+                problems.append(f"{where}: needs 'text'")
+                continue
+            q_id = str(q.get("id") or "")
+            q_type = q.get("type", "yes_no")
+            if not q_id: problems.append(f"{where}: missing 'id'")
+            elif q_id in seen_ids: problems.append(f"{where}: duplicate id '{q_id}'")
+            if q_type not in ANSWER_TYPES: problems.append(f"{where}: unknown type '{q_type}' (use {', '.join(ANSWER_TYPES)})")
+            old_texts = q.get("previous_texts") or []
+            if not isinstance(old_texts, list) or not all(isinstance(t, str) and t for t in old_texts):
+                problems.append(f"{where}: 'previous_texts' must be a list of texts")
+            else:
+                previous_texts.extend((t, len(questions)) for t in old_texts)
+            seen_ids.add(q_id)
+            questions.append(TemplateQuestion(q_id, str(q["text"]), q_type, bool(q.get("mandatory", True)), len(titles) - 1, position))
+            position += 1
+    current_texts = {q.text for q in questions}
+    for text, index in previous_texts:
+        if text in current_texts and questions[index].text != text:
+            problems.append(f"question '{questions[index].id}': previous text is the text of another question: {text!r}")
+    if problems:
+        raise TemplateError("Invalid checklist template:\n- " + "\n- ".join(problems))
+    return CompiledTemplate(str(definition.get("name") or "Unnamed Template"), content_hash, questions, titles, previous_texts)
+
+
+# ==============================================================================
+# Loading (with on-disk cache)
+# ==============================================================================
+def _parse_template_bytes(raw, file_path):
+    """Parses JSON, or YAML for .yaml/.yml files."""
+    try:
+        if file_path.lower().endswith((".yaml", ".yml")):
+            if not YAML_AVAILABLE:
+                raise TemplateError("YAML templates require 'PyYAML'.\nInstall using: pip install pyyaml")
+            import yaml
+            return yaml.safe_load(raw.decode("utf-8"))
+        return json.loads(raw.decode("utf-8"))
+    except TemplateError:
+        raise
+    except Exception as e:
+        raise TemplateError(f"Could not parse template '{os.path.basename(file_path)}': {e}") from e
+
+def load_template(file_path, cache_dir=TEMPLATE_CACHE_DIR):
+    """Loads and compiles a template file, reusing the cached compiled form when the content is unchanged."""
+    try:
+        with open(file_path, "rb") as f:
+            raw = f.read()
+    except OSError as e:
+        raise TemplateError(f"Could not read template file:\n{file_path}\n\n{e}") from e
+    content_hash = hashlib.sha256(_COMPILER_VERSION.encode("ascii") + raw).hexdigest()
+
+    cache_path = os.path.join(cache_dir, content_hash + ".pickle") if cache_dir else None
+    if cache_path and os.path.exists(cache_path):
+        try:
+            with open(cache_path, "rb") as f:
+                return pickle.load(f)
+        except Exception:
+            pass # Corrupt or stale cache entry: recompile below
+
+    compiled = compile_definition(_parse_template_bytes(raw, file_path), content_hash)
+    if cache_path:
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+            with open(tmp_path, "wb") as f:
+                pickle.dump(compiled, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, cache_path) # Atomic, so parallel loaders never see half a file
+        except OSError as e:
+            print(f"Warning: could not cache compiled template: {e}") # Cache is only an optimization
+    return compiled
+
+def template_to_definition(template):
+    """Returns the JSON-serializable definition of a compiled template (e.g. to write a starter file)."""
+    old_texts = {}
+    for text, index in template.index_by_text.items():
+        if template.questions[index].text != text: old_texts.setdefault(index, []).append(text)
+    def question(index, q):
+        entry = {"id": q.id, "text": q.text, "type": q.type, "mandatory": q.mandatory}
+        if index in old_texts: entry["previous_texts"] = old_texts[index]
+        return entry
+    return {"name": template.name, "sections": [
+        {"title": title, "questions": [question(start + i, q) for i, q in enumerate(template.questions[start:end])]}
+        for (title, _), (start, end) in zip(template.sections, template.section_ranges)]}
@@ -0,0 +1,168 @@
+# cli.py - Headless command line for report export (no Tk / customtkinter needed)
+#
+# Usage:
+#   python main.py export --format pdf --in "reports/2024-05/*.json" --out exported/
+#   python main.py export --format pdf --format xlsx --in a.json b.json --out exported/ --workers 4
+#   python main.py consolidate reports/ -o consolidated.xlsx      (same as consolidate.py)
+#   python main.py bundle reports/ --out bundle/                   (same as pdf_bundle.py)
+#   python main.py db import reports/                              (same as report_store.py)
+#   python main.py compliance reports/ -o compliance.xlsx          (same as compliance.py)
+#   python main.py search reports/ "forklift spill"                (same as search_index.py)
+#   python main.py links reports/                                  (same as link_check.py)
+#
+# `python cli.py ...` works the same way. Intended for cron jobs on servers without a display.
+
+import argparse
+import glob
+import importlib
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from checklist_template import TemplateError, load_template
+from project_schema import load_project_file
+from report_core import REQUIRED_METADATA, ProjectFileError, report_file_stem, resolve_template, safe_file_name
+
+FORMAT_EXTENSIONS = {"pdf": ".pdf", "xlsx": ".xlsx"}
+DELEGATED_COMMANDS = {"consolidate": "consolidate", "bundle": "pdf_bundle", "db": "report_store", "compliance": "compliance",
+                      "search": "search_index", "links": "link_check"} # Command -> module with main(argv)
+
+
+def expand_inputs(patterns):
+    """Expands file names / glob patterns (quoted patterns are expanded here, not by the shell). Keeps order, drops duplicates."""
+    seen, paths = set(), []
+    for pattern in patterns:
+        matches = sorted(glob.glob(pattern, recursive=True)) if glob.has_magic(pattern) else [pattern]
+        for path in matches:
+            key = os.path.abspath(path)
+            if key not in seen and not os.path.isdir(path):
+                seen.add(key)
+                paths.append(path)
+    return paths
+
+def _discard(paths):
+    for path in paths:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+def _export_one(task):
+    """Worker: validates one project file and exports it to each requested format under a temporary name.
+
+    Returns (in_path, stem, temporary outputs, warnings, error); run_export gives the outputs their final
+    names, so file names are decided in input order without the parent reading the inputs.
+    """
+    index, in_path, out_dir, formats, template_path = task
+    from exporters import ExportError, export_to_excel, export_to_pdf # Imported in the worker process
+    writers = {"pdf": export_to_pdf, "xlsx": export_to_excel}
+    outputs = []
+    try:
+        result = load_project_file(in_path, resolve_template(template_path))
+        if result.errors:
+            return in_path, None, [], [], "; ".join(str(p) for p in result.errors)
+        report = result.report # Validated by project_schema: metadata values are strings
+        stem = report_file_stem(report.metadata)
+        warnings = [f"missing {field}" for field in REQUIRED_METADATA if not report.metadata.get(field)]
+        for fmt in formats:
+            outputs.append(os.path.join(out_dir, f".{stem}.{index}.part{FORMAT_EXTENSIONS[fmt]}"))
+            writers[fmt](report, outputs[-1])
+        return in_path, stem, outputs, warnings, None
+    except (ProjectFileError, ExportError, TemplateError, OSError) as e:
+        _discard(outputs)
+        return in_path, None, [], [], str(e)
+    except Exception as e:
+        _discard(outputs)
+        return in_path, None, [], [], f"unexpected error: {e}"
+
+def _finish_outputs(result, out_dir, used):
+    """Moves a worker's outputs to <stem><ext>: SafetyReport_<WH>_<date> (as in the GUI), or the input name if
+    an earlier input took that stem, then _2, _3, ... if that is taken too (e.g. the same name in two folders).
+    Stems are compared case-insensitively. Returns (in_path, outputs, warnings, error)."""
+    in_path, stem, tmp_paths, warnings, error = result
+    if error: return in_path, [], warnings, error
+    if stem.lower() in used: stem = safe_file_name(os.path.splitext(os.path.basename(in_path))[0])
+    base, n = stem, 2
+    while stem.lower() in used:
+        stem, n = f"{base}_{n}", n + 1
+    used.add(stem.lower())
+    outputs = []
+    try:
+        for tmp_path in tmp_paths:
+            out_path = os.path.join(out_dir, stem + os.path.splitext(tmp_path)[1])
+            os.replace(tmp_path, out_path)
+            outputs.append(out_path)
+    except OSError as e:
+        _discard(tmp_paths)
+        return in_path, outputs, warnings, f"could not write output ({e})"
+    return in_path, outputs, warnings, None
+
+def run_export(patterns, out_dir, formats, workers=None, template_path=None):
+    """Exports every matching project file. Yields (in_path, outputs, warnings, error) per file, in input order."""
+    in_paths = expand_inputs(patterns)
+    os.makedirs(out_dir, exist_ok=True)
+    tasks = [(index, p, out_dir, formats, template_path) for index, p in enumerate(in_paths)]
+    used = set()
+    if workers == 1 or len(tasks) <= 1:
+        for task in tasks: yield _finish_outputs(_export_one(task), out_dir, used)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for result in pool.map(_export_one, tasks, chunksize=4):
+            yield _finish_outputs(result, out_dir, used)
+
+
+# ==============================================================================
+# Command Line
+# ==============================================================================
+def _cmd_export(args):
+    formats = list(dict.fromkeys(args.format or ["pdf"])) # Unique, in the given order
+    if args.template:
+        load_template(args.template) # Fail fast (and fill the cache) before starting workers
+    done = failed = 0
+    for in_path, outputs, warnings, error in run_export(args.inputs, args.out, formats, args.workers, args.template):
+        if error:
+            failed += 1
+            print(f"FAILED  {in_path}: {error}", file=sys.stderr)
+            continue
+        done += 1
+        note = f"  (warning: {', '.join(warnings)})" if warnings else ""
+        if not args.quiet: print(f"OK      {in_path} -> {', '.join(os.path.basename(o) for o in outputs)}{note}")
+    print(f"Exported {done} report(s), {failed} failed.")
+    return 1 if failed else 0
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="main.py", description="Warehouse Safety Checklist command line tools.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    export = sub.add_parser("export", help="Export project .json files to PDF/Excel without opening the app")
+    export.add_argument("--format", action="append", choices=sorted(FORMAT_EXTENSIONS), help="pdf or xlsx (repeat for both; default: pdf)")
+    export.add_argument("--in", dest="inputs", nargs="+", required=True, metavar="PROJECT", help="Project files or glob patterns")
+    export.add_argument("--out", required=True, help="Output folder (created if missing)")
+    export.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count, 1 = no pool)")
+    export.add_argument("--template", default=None, help="Checklist template file (.json/.yaml); default: built-in checklist")
+    export.add_argument("--quiet", action="store_true", help="Only print failures and the summary")
+    export.set_defaults(func=_cmd_export)
+
+    # Handled by their own modules (see main()); listed here for --help
+    sub.add_parser("consolidate", add_help=False, help="Consolidate a folder of project files (see consolidate.py -h)")
+    sub.add_parser("bundle", add_help=False, help="One PDF per warehouse plus a bookmarked master (see pdf_bundle.py -h)")
+    sub.add_parser("db", add_help=False, help="Import into / query the SQLite report store (see report_store.py -h)")
+    sub.add_parser("compliance", add_help=False, help="Compliance scores per warehouse/section/month to Excel (see compliance.py -h)")
+    sub.add_parser("search", add_help=False, help="Full-text search of near-miss and text answers (see search_index.py -h)")
+    sub.add_parser("links", add_help=False, help="Check evidence links for broken or restricted URLs (see link_check.py -h)")
+    return parser
+
+def main(argv=None):
+    argv = list(sys.argv[1:] if argv is None else argv)
+    if argv and argv[0] in DELEGATED_COMMANDS:
+        module = importlib.import_module(DELEGATED_COMMANDS[argv[0]])
+        return module.main(argv[1:])
+    args = build_parser().parse_args(argv)
+    try:
+        return args.func(args)
+    except TemplateError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 2
+
+if __name__ == "__main__":
+    sys.exit(main())
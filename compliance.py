@@ -0,0 +1,259 @@
+# compliance.py - Compliance scoring over many reports (NumPy, vectorized)
+#
+# The yes_no answers of N reports are held as one int8 matrix (reports x yes_no questions):
+#   1 = Yes, 0 = No, -1 = N/A, -2 = unanswered
+# Compliance % is Yes / (Yes + No); N/A and unanswered items do not count either way.
+# Every score below is computed with whole-matrix operations, so tens of thousands of reports
+# take milliseconds once loaded. Usage from the command line:
+#   python main.py compliance path/to/projects -o compliance.xlsx [--recursive]
+#   python main.py compliance --db reports.sqlite3 -o compliance.xlsx      (from the report store)
+
+import argparse
+import os
+import sys
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+from checklist_template import TemplateError
+from consolidate import DEFAULT_PATTERN, iter_project_files
+from project_schema import load_project_file
+from report_core import report_month_key, resolve_template, warehouse_key
+
+YES, NO, NOT_APPLICABLE, UNANSWERED = 1, 0, -1, -2
+ANSWER_CODES = {"Yes": YES, "No": NO, "N/A": NOT_APPLICABLE}
+
+# Result of summarize(). Percentages are NaN where nothing was answered Yes/No.
+#   section_pct         (warehouses x sections)   compliance % per warehouse and section
+#   warehouse_pct       (warehouses,)              overall compliance % per warehouse
+#   overall_pct         float                      all reports and sections together
+#   overall_section_pct (sections,)                all reports together
+#   question_failures   (yes_no questions,)        mandatory questions answered No (0 for optional ones)
+#   warehouse_failures  (warehouses,)              mandatory No answers per warehouse
+#   months              ["YYYY-MM", ...]           months with dated reports, ascending
+#   monthly_pct         (months,)                  overall compliance % per month
+#   monthly_change      (months,)                  change vs. the previous month (percentage points)
+#   warehouse_monthly_pct (warehouses x months)    per-warehouse trend
+ComplianceSummary = namedtuple("ComplianceSummary", "report_count warehouses report_counts sections section_pct warehouse_pct "
+                                                    "overall_pct overall_section_pct questions mandatory question_failures warehouse_failures "
+                                                    "months monthly_pct monthly_change warehouse_monthly_pct")
+
+
+def yes_no_columns(template):
+    """Question indices of the yes_no questions (the matrix columns), in checklist order."""
+    return [i for i, q in enumerate(template.questions) if q.type == "yes_no"]
+
+def encode_answers(answers, columns):
+    """One report's answers as int8 codes for the given question indices (bytes, cheap to send between processes)."""
+    return bytes(ANSWER_CODES.get(answers[i], UNANSWERED) & 0xFF for i in columns)
+
+
+class ComplianceData:
+    """Answer matrix of many reports plus each report's warehouse, month and source."""
+    def __init__(self, template, rows):
+        """`rows` is a list of (warehouse, month "YYYY-MM" or "", encoded answers, source)."""
+        self.template = template
+        self.columns = np.array(yes_no_columns(template), dtype=np.intp)
+        count = len(rows)
+        blob = b"".join(r[2] for r in rows)
+        self.answers = np.frombuffer(blob, dtype=np.int8).reshape(count, len(self.columns)) if count else \
+            np.zeros((0, len(self.columns)), dtype=np.int8)
+        # Warehouses are matched on report_core.warehouse_key() and shown with the spelling of their earliest report
+        keys = np.array([warehouse_key(r[0]) for r in rows], dtype=object).astype(str)
+        self.warehouse_keys, self.warehouse_codes = np.unique(keys, return_inverse=True)
+        earliest = {}
+        for (name, month, _, source), code in zip(rows, self.warehouse_codes.tolist()):
+            if code not in earliest or (month, str(source)) < earliest[code][:2]: earliest[code] = (month, str(source), name)
+        self.warehouse_names = [earliest[code][2] for code in range(len(self.warehouse_keys))]
+        self.month_names, self.month_codes = np.unique(np.array([r[1] for r in rows], dtype=object).astype(str), return_inverse=True)
+        self.sources = [r[3] for r in rows]
+        questions = template.questions
+        self.column_sections = np.array([questions[i].section_index for i in self.columns], dtype=np.intp)
+        self.mandatory = np.array([questions[i].mandatory for i in self.columns], dtype=bool)
+
+    def __len__(self):
+        return self.answers.shape[0]
+
+    @classmethod
+    def from_reports(cls, reports, template):
+        """Builds the matrix from (ReportModel, source) pairs."""
+        columns = yes_no_columns(template)
+        return cls(template, [(_warehouse_of(r.metadata), report_month_key(r.metadata), encode_answers(r.answers, columns), source)
+                              for r, source in reports])
+
+def _warehouse_of(metadata):
+    return (metadata.get("Warehouse Name") or "").strip() or "Unknown"
+
+
+# ==============================================================================
+# Loading
+# ==============================================================================
+def _encode_file(file_path, template):
+    """Worker: one project file -> (path, row or None, problems)."""
+    result = load_project_file(file_path, template)
+    if result.errors:
+        return file_path, None, [str(p) for p in result.errors]
+    report = result.report
+    return file_path, (_warehouse_of(report.metadata), report_month_key(report.metadata),
+                       encode_answers(report.answers, yes_no_columns(template)), file_path), []
+
+def load_directory(directory, template, pattern=DEFAULT_PATTERN, recursive=False, workers=None, chunksize=64):
+    """Loads every matching project file into a ComplianceData (parsed across a process pool).
+
+    Returns (data, errors) where errors is a list of (file_path, [problems]).
+    """
+    encode = partial(_encode_file, template=template) # Compiled templates pickle, so workers get it as-is
+    files = iter_project_files(directory, pattern, recursive)
+    rows, errors = [], []
+    if workers == 1:
+        results = map(encode, files)
+    else:
+        pool = ProcessPoolExecutor(max_workers=workers)
+        results = pool.map(encode, files, chunksize=chunksize)
+    try:
+        for path, row, problems in results:
+            if row is None: errors.append((path, problems))
+            else: rows.append(row)
+    finally:
+        if workers != 1: pool.shutdown()
+    return ComplianceData(template, rows), errors
+
+def load_store(store, template):
+    """Builds a ComplianceData from the SQLite report store (see report_store.py): one pass over reports, one over answers."""
+    columns = yes_no_columns(template)
+    position = {template.questions[i].id: p for p, i in enumerate(columns)}
+    rows, codes = {}, {}
+    for report_id, warehouse, month, source in store.conn.execute("SELECT id, warehouse, report_month, source_path FROM reports"):
+        rows[report_id] = [warehouse or "Unknown", month or "", None, source]
+        codes[report_id] = bytearray([UNANSWERED & 0xFF]) * len(columns)
+    for report_id, question_id, answer in store.conn.execute("SELECT report_id, question_id, answer FROM answers"):
+        p = position.get(question_id)
+        if p is not None: codes[report_id][p] = ANSWER_CODES.get(answer, UNANSWERED) & 0xFF
+    for report_id, row in rows.items(): row[2] = bytes(codes[report_id])
+    return ComplianceData(template, [tuple(row) for row in rows.values()])
+
+
+# ==============================================================================
+# Scoring (vectorized)
+# ==============================================================================
+def _group_sum(values, codes, group_count):
+    """Sums the rows of `values` (reports x k) per group code -> (groups x k)."""
+    out = np.zeros((group_count,) + values.shape[1:], dtype=np.float64)
+    np.add.at(out, codes, values)
+    return out
+
+def _percent(yes, no):
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(yes + no > 0, 100.0 * yes / (yes + no), np.nan)
+
+def summarize(data):
+    """Computes every compliance figure for a ComplianceData (see ComplianceSummary)."""
+    template = data.template
+    answers = data.answers
+    yes = (answers == YES)
+    no = (answers == NO)
+    warehouse_count = len(data.warehouse_names)
+
+    # Per-report Yes/No counts per section via one matrix product with a (questions x sections) indicator
+    section_count = len(template.sections)
+    indicator = np.zeros((len(data.columns), section_count), dtype=np.float64)
+    indicator[np.arange(len(data.columns)), data.column_sections] = 1.0
+    yes_by_section = yes @ indicator
+    no_by_section = no @ indicator
+
+    wh_yes = _group_sum(yes_by_section, data.warehouse_codes, warehouse_count)
+    wh_no = _group_sum(no_by_section, data.warehouse_codes, warehouse_count)
+    mandatory_no = no & data.mandatory # Broadcast over reports
+
+    # Month-over-month: only reports with a usable date
+    dated = data.month_names != ""
+    month_index = np.cumsum(dated) - 1 # Month code -> position among dated months
+    report_dated = dated[data.month_codes]
+    month_codes = month_index[data.month_codes[report_dated]]
+    month_count = int(dated.sum())
+    report_yes, report_no = yes.sum(axis=1), no.sum(axis=1)
+    m_yes = np.bincount(month_codes, weights=report_yes[report_dated], minlength=month_count)
+    m_no = np.bincount(month_codes, weights=report_no[report_dated], minlength=month_count)
+    monthly_pct = _percent(m_yes, m_no)
+    monthly_change = np.concatenate(([np.nan], np.diff(monthly_pct))) if month_count else monthly_pct
+    pair_codes = data.warehouse_codes[report_dated] * month_count + month_codes
+    wm_yes = np.bincount(pair_codes, weights=report_yes[report_dated], minlength=warehouse_count * month_count)
+    wm_no = np.bincount(pair_codes, weights=report_no[report_dated], minlength=warehouse_count * month_count)
+
+    return ComplianceSummary(
+        report_count=len(data),
+        warehouses=list(data.warehouse_names),
+        report_counts=np.bincount(data.warehouse_codes, minlength=warehouse_count),
+        sections=[title for title, _ in template.sections],
+        section_pct=_percent(wh_yes, wh_no),
+        warehouse_pct=_percent(wh_yes.sum(axis=1), wh_no.sum(axis=1)),
+        overall_pct=float(_percent(wh_yes.sum(), wh_no.sum())),
+        overall_section_pct=_percent(wh_yes.sum(axis=0), wh_no.sum(axis=0)),
+        questions=[template.questions[i].text for i in data.columns],
+        mandatory=data.mandatory,
+        question_failures=mandatory_no.sum(axis=0),
+        warehouse_failures=np.bincount(data.warehouse_codes, weights=mandatory_no.sum(axis=1), minlength=warehouse_count).astype(np.int64),
+        months=[str(m) for m in data.month_names[dated]],
+        monthly_pct=monthly_pct,
+        monthly_change=monthly_change,
+        warehouse_monthly_pct=_percent(wm_yes, wm_no).reshape(warehouse_count, month_count))
+
+def report_score(report):
+    """Compliance % of a single report (None if no Yes/No answers) and its mandatory No count."""
+    yes = no = mandatory_no = 0
+    for q, a in zip(report.template.questions, report.answers):
+        if q.type != "yes_no": continue
+        if a == "Yes": yes += 1
+        elif a == "No":
+            no += 1
+            if q.mandatory: mandatory_no += 1
+    return (100.0 * yes / (yes + no) if yes + no else None), mandatory_no
+
+
+# ==============================================================================
+# Command Line
+# ==============================================================================
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compliance scores per warehouse, section and month, written to Excel.")
+    parser.add_argument("directory", nargs="?", help="Folder containing project .json files")
+    parser.add_argument("--db", default=None, help="Read reports from this SQLite report store instead of a folder")
+    parser.add_argument("-o", "--out", required=True, help="Output workbook (.xlsx)")
+    parser.add_argument("--pattern", default=DEFAULT_PATTERN, help=f"File name pattern (default: {DEFAULT_PATTERN})")
+    parser.add_argument("--recursive", action="store_true", help="Also search sub-folders")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count, 1 = no pool)")
+    parser.add_argument("--template", default=None, help="Checklist template file (.json/.yaml); default: built-in checklist")
+    args = parser.parse_args(argv)
+
+    if not NUMPY_AVAILABLE:
+        parser.error("compliance scoring requires 'numpy'. Install using: pip install numpy")
+    if bool(args.directory) == bool(args.db):
+        parser.error("give either a project folder or --db")
+    if args.directory and not os.path.isdir(args.directory):
+        parser.error(f"not a directory: {args.directory}")
+    try:
+        template = resolve_template(args.template)
+    except TemplateError as e:
+        parser.error(str(e))
+    if args.db:
+        from report_store import ReportStore
+        with ReportStore(args.db) as store:
+            data, errors = load_store(store, template), []
+    else:
+        data, errors = load_directory(args.directory, template, args.pattern, args.recursive, args.workers)
+    for path, problems in errors:
+        print(f"SKIPPED {path}: " + "; ".join(problems), file=sys.stderr)
+
+    from exporters import export_compliance_excel
+    summary = summarize(data)
+    export_compliance_excel(summary, args.out)
+    print(f"Scored {summary.report_count} report(s) from {len(summary.warehouses)} warehouse(s) into {args.out} ({len(errors)} skipped).")
+    return 1 if errors and not len(data) else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
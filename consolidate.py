@@ -0,0 +1,134 @@
+# consolidate.py - Headless consolidation of many project .json files into one CSV/workbook
+#
+# Usage:
+#   python consolidate.py <project_dir> -o consolidated.csv
+#   python consolidate.py <project_dir> -o consolidated.xlsx --workers 8 --recursive
+#
+# Never imports the GUI (main.py / customtkinter), so it runs on a display-less server.
+
+import argparse
+import csv
+import fnmatch
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+from checklist_template import TemplateError
+from exporters import export_consolidated_excel
+from project_schema import load_project_file
+from report_core import BUILTIN_TEMPLATE, COMPACT_EXTENSION, METADATA_FIELDS, resolve_template, warehouse_key
+
+DEFAULT_PATTERN = "SafetyChecklist_*.json"
+EXTRA_COLUMNS = ["Near Miss Recorded", "Near Miss Links", "General Links"]
+
+
+def consolidated_header(template=BUILTIN_TEMPLATE):
+    """Column titles: source file, metadata, one column per checklist question, summary counts."""
+    return ["Source File"] + METADATA_FIELDS + [q.text for q in template.questions] + EXTRA_COLUMNS
+
+def report_row(report, source_name=""):
+    """Flattens one ReportModel into a row matching consolidated_header(report.template)."""
+    row = [source_name]
+    row.extend(report.metadata[k] for k in METADATA_FIELDS)
+    row.extend(report.answers)
+    row.append("Yes" if any(report.near_miss.values()) else "No")
+    row.append(len(report.near_miss_attachments))
+    row.append(len(report.general_attachments))
+    return row
+
+def iter_project_files(directory, pattern=DEFAULT_PATTERN, recursive=False):
+    """Yields project file paths under a directory without building the full listing first.
+
+    A pattern for .json project files also matches compact files with the same name (.wsc).
+    """
+    compact_pattern = pattern[:-5] + COMPACT_EXTENSION if pattern.lower().endswith(".json") else None
+    stack = [directory]
+    while stack:
+        current = stack.pop()
+        with os.scandir(current) as it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    if recursive: stack.append(entry.path)
+                elif fnmatch.fnmatch(entry.name, pattern) or (compact_pattern and fnmatch.fnmatch(entry.name, compact_pattern)):
+                    yield entry.path
+
+def _parse_one(file_path, template_path=None):
+    """Worker: parses and validates one file. Returns (path, row or None, problems)."""
+    result = load_project_file(file_path, resolve_template(template_path))
+    if result.errors:
+        return file_path, None, [str(p) for p in result.errors]
+    return file_path, report_row(result.report, os.path.basename(file_path)), []
+
+def parse_project_files(file_paths, workers=None, chunksize=16, template_path=None):
+    """Parses files across a process pool. Yields (path, row or None, problems) as results arrive."""
+    parse = partial(_parse_one, template_path=template_path)
+    if workers == 1:
+        for path in file_paths: yield parse(path)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for result in pool.map(parse, file_paths, chunksize=chunksize):
+            yield result
+
+def _sort_key(row):
+    """Groups rows per warehouse (by warehouse_key, as export_consolidated_excel does), then by report date."""
+    wh_idx = 1 + METADATA_FIELDS.index("Warehouse Name")
+    date_idx = 1 + METADATA_FIELDS.index("Report Date")
+    return (warehouse_key(row[wh_idx]), str(row[date_idx]), row[0])
+
+def write_csv(rows, out_path, header):
+    """Writes the consolidated rows to a UTF-8 CSV (with BOM so Excel opens it cleanly)."""
+    with open(out_path, 'w', encoding='utf-8-sig', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(header)
+        writer.writerows(rows)
+
+def write_xlsx(rows, out_path, header, template=BUILTIN_TEMPLATE):
+    """Writes the consolidated rows as a streamed workbook: Summary sheet + one sheet per warehouse."""
+    export_consolidated_excel(rows, out_path, header, template)
+
+def consolidate_directory(directory, out_path, pattern=DEFAULT_PATTERN, recursive=False, workers=None, template_path=None):
+    """Consolidates every matching project file under `directory` into `out_path` (.csv or .xlsx).
+
+    Returns (report_count, errors) where errors is a list of (file_path, [problems]).
+    """
+    template = resolve_template(template_path) # Also validates the template before forking
+    header = consolidated_header(template)
+    rows, errors = [], []
+    files = iter_project_files(directory, pattern, recursive)
+    for path, row, problems in parse_project_files(files, workers, template_path=template_path):
+        if row is None: errors.append((path, problems))
+        else: rows.append(row)
+    rows.sort(key=_sort_key)
+
+    if out_path.lower().endswith(".xlsx"): write_xlsx(rows, out_path, header, template)
+    else: write_csv(rows, out_path, header)
+    return len(rows), errors
+
+
+# ==============================================================================
+# Command Line
+# ==============================================================================
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Consolidate warehouse safety project files into one CSV/XLSX.")
+    parser.add_argument("directory", help="Folder containing project .json files")
+    parser.add_argument("-o", "--out", required=True, help="Output file (.csv or .xlsx)")
+    parser.add_argument("--pattern", default=DEFAULT_PATTERN, help=f"File name pattern (default: {DEFAULT_PATTERN})")
+    parser.add_argument("--recursive", action="store_true", help="Also search sub-folders")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count, 1 = no pool)")
+    parser.add_argument("--template", default=None, help="Checklist template file (.json/.yaml); default: built-in checklist")
+    args = parser.parse_args(argv)
+
+    if not os.path.isdir(args.directory):
+        parser.error(f"not a directory: {args.directory}")
+    try:
+        count, errors = consolidate_directory(args.directory, args.out, args.pattern, args.recursive, args.workers, args.template)
+    except TemplateError as e:
+        parser.error(str(e))
+    for path, problems in errors:
+        print(f"SKIPPED {path}: " + "; ".join(problems), file=sys.stderr)
+    print(f"Consolidated {count} report(s) into {args.out} ({len(errors)} skipped).")
+    return 1 if errors and not count else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,645 @@
+# exporters.py - Excel/PDF report writers (no Tk; used by the GUI and headless tools)
+
+import importlib.util
+import os
+import re
+import threading
+
+from report_core import PRIMARY_COLOR, SECONDARY_COLOR, DARK_GREY, METADATA_FIELDS, ReportModel, warehouse_key
+
+# --- Export library availability ---
+# Only look the packages up here; the heavy imports happen on first export (or in prewarm_exporters()).
+OPENPYXL_AVAILABLE = importlib.util.find_spec("openpyxl") is not None
+REPORTLAB_AVAILABLE = importlib.util.find_spec("reportlab") is not None
+
+_import_lock = threading.Lock()
+openpyxl = None
+SimpleDocTemplate = None
+
+def _load_openpyxl():
+    """Imports openpyxl into module globals on first use."""
+    global openpyxl, OpenpyxlFont, Alignment, PatternFill, Border, Side, NamedStyle, WriteOnlyCell
+    with _import_lock:
+        if openpyxl is None:
+            from openpyxl.styles import Font as OpenpyxlFont, Alignment, PatternFill, Border, Side, NamedStyle
+            from openpyxl.cell import WriteOnlyCell
+            import openpyxl as _openpyxl
+            openpyxl = _openpyxl # Set last: marks the group as loaded
+
+def _load_reportlab():
+    """Imports the reportlab platypus stack into module globals on first use."""
+    global SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, PageBreak, KeepTogether
+    global getSampleStyleSheet, ParagraphStyle, TA_CENTER, colors, inch
+    with _import_lock:
+        if SimpleDocTemplate is None:
+            from reportlab.platypus import Paragraph, Spacer, Table, TableStyle, PageBreak, KeepTogether
+            from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+            from reportlab.lib.enums import TA_CENTER
+            from reportlab.lib import colors
+            from reportlab.lib.units import inch
+            from reportlab.platypus import SimpleDocTemplate as _SimpleDocTemplate
+            SimpleDocTemplate = _SimpleDocTemplate # Set last: marks the group as loaded
+
+def prewarm_exporters():
+    """Loads whichever export libraries are installed. Safe to call from a background thread."""
+    try:
+        if OPENPYXL_AVAILABLE: _load_openpyxl()
+        if REPORTLAB_AVAILABLE: _load_reportlab()
+    except Exception as e:
+        print(f"Warning: could not preload export libraries: {e}") # Export will retry and report properly
+
+
+class ExportError(Exception):
+    """Raised with a user-facing message when an export cannot be written."""
+
+class ExportCancelled(Exception):
+    """Raised inside an export when its cancel event has been set."""
+
+def _checkpoint(progress, cancel, fraction, message):
+    """Reports progress (0..1) and aborts if cancellation was requested. Both hooks are optional."""
+    if cancel is not None and cancel.is_set():
+        raise ExportCancelled()
+    if progress is not None:
+        progress(fraction, message)
+
+
+def export_to_excel(report, file_path, progress=None, cancel=None):
+    """Exports a report (ReportModel or get_all_data() dict) to Excel, creating hyperlinks for URLs.
+
+    `progress(fraction, message)` is called between stages; setting the `cancel` event
+    (threading.Event) raises ExportCancelled before anything is written to disk.
+    """
+    report = ReportModel.coerce(report)
+    _checkpoint(progress, cancel, 0.0, "Loading Excel library")
+    _load_openpyxl()
+    try:
+        wb = openpyxl.Workbook()
+        ws = wb.active
+        ws.title = "Safety Checklist Report"
+
+        # --- Styling ---
+        H_FONT=OpenpyxlFont(name='Arial Black',size=16,bold=True,color="FF14467C")
+        MH_FONT=OpenpyxlFont(name='Arial',size=14,bold=True,color="FF14467C")
+        S_FONT=OpenpyxlFont(name='Arial',size=12,bold=True,color="FF39B54A")
+        Q_FONT=OpenpyxlFont(name='Arial',size=11,bold=True)
+        A_FONT=OpenpyxlFont(name='Arial',size=11)
+        ML_FONT=OpenpyxlFont(name='Arial',size=11,bold=True)
+        MV_FONT=OpenpyxlFont(name='Arial',size=11)
+        LINK_FONT=OpenpyxlFont(name='Arial',size=10,italic=True,underline='single',color='FF0000FF') # Blue underlined
+        WRAP_ALIGN=Alignment(wrap_text=True,vertical='top',horizontal='left')
+        CENTER_ALIGN=Alignment(vertical='center',horizontal='center')
+        BORDER_SIDE=Side(border_style="thin",color="FFDDDDDD") # Light grey
+        BORDER=Border(left=BORDER_SIDE,right=BORDER_SIDE,top=BORDER_SIDE,bottom=BORDER_SIDE)
+        FILL=PatternFill(start_color="FFEAEAEA",end_color="FFEAEAEA",fill_type="solid") # Lighter Fill
+
+        # --- Column Widths ---
+        ws.column_dimensions['A'].width = 50
+        ws.column_dimensions['B'].width = 70
+        row = 1
+
+        # --- Header ---
+        c = ws.cell(row=row, column=1, value="Warehouse Safety Compliance Report")
+        c.font = H_FONT
+        ws.merge_cells(start_row=row, start_column=1, end_row=row, end_column=2)
+        c.alignment = CENTER_ALIGN
+        row += 2
+
+        # --- Metadata ---
+        c = ws.cell(row=row, column=1, value="Report Information")
+        c.font = MH_FONT
+        ws.merge_cells(start_row=row, start_column=1, end_row=row, end_column=2)
+        c.fill = FILL
+        row += 1
+        for k, v in report.metadata.items():
+             ca = ws.cell(row=row, column=1, value=f"{k}:")
+             ca.font = ML_FONT
+             ca.border = BORDER
+             cb = ws.cell(row=row, column=2, value=v)
+             cb.font = MV_FONT
+             cb.alignment = WRAP_ALIGN
+             cb.border = BORDER
+             row += 1
+        row += 1 # Spacer
+
+        # --- Checklist Items ---
+        _checkpoint(progress, cancel, 0.2, "Checklist items")
+        c = ws.cell(row=row, column=1, value="Checklist Items")
+        c.font = MH_FONT
+        ws.merge_cells(start_row=row, start_column=1, end_row=row, end_column=2)
+        c.fill = FILL
+        row += 1
+        for section_title, questions in report.iter_sections():
+             cs = ws.cell(row=row, column=1, value=section_title)
+             cs.font = S_FONT
+             ws.merge_cells(start_row=row, start_column=1, end_row=row, end_column=2)
+             row += 1
+             for qt, _, m, a in questions:
+                 qd = f"{qt}{' *' if m else ''}"
+                 ca = ws.cell(row=row, column=1, value=qd)
+                 ca.font = Q_FONT
+                 ca.alignment = WRAP_ALIGN
+                 ca.border = BORDER
+                 cb = ws.cell(row=row, column=2, value=a if a else "[N/A]")
+                 cb.font = A_FONT
+                 cb.alignment = WRAP_ALIGN
+                 cb.border = BORDER
+                 row += 1
+        row += 1 # Spacer after all checklist sections
+
+        # --- Near Miss Report ---
+        _checkpoint(progress, cancel, 0.5, "Near miss report")
+        c = ws.cell(row=row, column=1, value="Near Miss Report")
+        c.font = MH_FONT
+        ws.merge_cells(start_row=row, start_column=1, end_row=row, end_column=2)
+        c.fill = FILL
+        row += 1
+        nm_details = report.near_miss
+        if any(nm_details.values()):
+            for k, v in nm_details.items():
+                 ca = ws.cell(row=row, column=1, value=f"{k.replace('_',' ')}:")
+                 ca.font = ML_FONT
+                 ca.border = BORDER
+                 cb = ws.cell(row=row, column=2, value=v if v else "[N/A]")
+                 cb.font = A_FONT
+                 cb.alignment = WRAP_ALIGN
+                 cb.border = BORDER
+                 row += 1
+            nm_att = report.near_miss_attachments
+            cal = ws.cell(row=row, column=1, value="Near Miss Evidence Links:")
+            cal.font = ML_FONT
+            cal.border = BORDER
+            if nm_att:
+                 ws.merge_cells(start_row=row, start_column=1, end_row=row + len(nm_att) - 1, end_column=1)
+                 start_r = row
+                 for i, url in enumerate(nm_att):
+                     cell = ws.cell(start_r + i, 2, url)
+                     cell.font = LINK_FONT
+                     cell.border = BORDER
+                     if url and url.startswith("http"): cell.hyperlink = url
+                 row += len(nm_att)
+            else:
+                 can = ws.cell(row=row, column=2, value="[None]")
+                 can.font = LINK_FONT
+                 can.border = BORDER
+                 row += 1
+        else:
+            cnn = ws.cell(row=row, column=1, value="[No Near Miss Recorded]")
+            cnn.font = A_FONT
+            ws.merge_cells(start_row=row, start_column=1, end_row=row, end_column=2)
+            cnn.border = BORDER
+            row += 1
+        row += 1 # Spacer
+
+        # --- Action Points ---
+        c = ws.cell(row=row, column=1, value="Action Points / Recommendations")
+        c.font = MH_FONT
+        ws.merge_cells(start_row=row, start_column=1, end_row=row, end_column=2)
+        c.fill = FILL
+        row += 1
+        ap_text = report.action_points
+        cap = ws.cell(row=row, column=1, value=ap_text if ap_text else "[None]")
+        cap.font = A_FONT
+        cap.alignment = WRAP_ALIGN
+        cap.border = BORDER
+        ws.merge_cells(start_row=row, start_column=1, end_row=row, end_column=2)
+        row += 2 # Spacer
+
+        # --- General Evidence Links ---
+        _checkpoint(progress, cancel, 0.7, "Evidence links")
+        c = ws.cell(row=row, column=1, value="General Evidence Links")
+        c.font = MH_FONT
+        ws.merge_cells(start_row=row, start_column=1, end_row=row, end_column=2)
+        c.fill = FILL
+        row += 1
+        gen_att = report.general_attachments
+        if gen_att:
+            for url in gen_att:
+                 cell = ws.cell(row=row, column=1, value=url)
+                 cell.font = LINK_FONT
+                 cell.border = BORDER
+                 if url and url.startswith("http"): cell.hyperlink = url
+                 ws.merge_cells(start_row=row, start_column=1, end_row=row, end_column=2)
+                 row += 1
+        else:
+            cga = ws.cell(row=row, column=1, value="[None]")
+            cga.font = LINK_FONT
+            cga.border = BORDER
+            ws.merge_cells(start_row=row, start_column=1, end_row=row, end_column=2)
+            row += 1
+
+        # --- Save ---
+        _checkpoint(progress, cancel, 0.9, "Writing file")
+        wb.save(file_path)
+        _checkpoint(progress, None, 1.0, "Done")
+
+    except PermissionError as e:
+        raise ExportError(f"Permission denied writing Excel file:\n'{os.path.basename(file_path)}'\n\nIs the file open elsewhere?") from e
+
+
+# ==============================================================================
+# PDF (styles and template parts are built once per process and reused)
+# ==============================================================================
+_PDF_ESCAPES = str.maketrans({'&': '&amp;', '<': '&lt;', '>': '&gt;', '\n': '<br/>'})
+_PARSED_CACHE_LIMIT = 4096 # Parsed paragraphs kept for repeated strings ("Yes", "[N/A]", labels, ...)
+
+_pdf_lock = threading.Lock()
+_pdf_styles = None
+_pdf_table_style = None
+_TemplateParagraph = None
+_parsed_paragraphs = {} # (markup, style name) -> parsed fragments
+_pdf_template_parts = {} # template content_hash -> [(section part, [question part, ...]), ...], see _template_parts
+
+def pdf_escape(text):
+    """Escapes text for a reportlab Paragraph (newlines become line breaks)."""
+    return text.translate(_PDF_ESCAPES) if text else ""
+
+def _get_pdf_styles():
+    """Sample stylesheet plus the report's paragraph styles, created on first use."""
+    global _pdf_styles, _pdf_table_style, _TemplateParagraph
+    if _pdf_styles is not None:
+        return _pdf_styles
+    with _pdf_lock:
+        if _pdf_styles is None:
+            styles = getSampleStyleSheet()
+            try:
+                from reportlab.pdfbase import pdfmetrics
+                # Use Arial Black only if it has been registered, otherwise reportlab fails at build time
+                header_font_name = 'Arial-Black' if 'Arial-Black' in pdfmetrics.getRegisteredFontNames() else 'Helvetica-Bold'
+            except Exception:
+                header_font_name='Helvetica-Bold' # Safe fallback
+
+            styles.add(ParagraphStyle(name='MainHeader', fontName=header_font_name, fontSize=18, textColor=colors.HexColor(SECONDARY_COLOR), alignment=TA_CENTER, spaceAfter=10))
+            styles.add(ParagraphStyle(name='SubHeader', parent=styles['Normal'], alignment=TA_CENTER, fontSize=10, textColor=colors.dimgrey, spaceAfter=15))
+            styles.add(ParagraphStyle(name='MetaHeader', fontName='Helvetica-Bold', fontSize=14, textColor=colors.HexColor(SECONDARY_COLOR), spaceBefore=12, spaceAfter=6, keepWithNext=1))
+            styles.add(ParagraphStyle(name='MetaLabel', fontName='Helvetica-Bold', fontSize=10, textColor=colors.black))
+            styles.add(ParagraphStyle(name='MetaValue', parent=styles['Normal'], fontSize=10, leftIndent=15, spaceAfter=3))
+            styles.add(ParagraphStyle(name='SectionHeaderPDF', fontName='Helvetica-Bold', fontSize=12, textColor=colors.HexColor(PRIMARY_COLOR), spaceBefore=15, spaceAfter=8, keepWithNext=1, backgroundColor=colors.HexColor("#F0F0F0"), padding=4, borderRadius=3))
+            styles.add(ParagraphStyle(name='QuestionStylePDF', parent=styles['Normal'], fontName='Helvetica-Bold', fontSize=10, textColor=colors.black, spaceBefore=6, leftIndent=10, allowWidows=1, allowOrphans=1, keepWithNext=1))
+            styles.add(ParagraphStyle(name='AnswerStylePDF', parent=styles['Normal'], fontName='Helvetica', fontSize=10, textColor=colors.darkslategray, leftIndent=25, spaceAfter=5, wordWrap='CJK', leading=12))
+            styles.add(ParagraphStyle(name='AnswerStyleEmptyPDF', parent=styles['AnswerStylePDF'], textColor=colors.HexColor(DARK_GREY), fontName='Helvetica-Oblique'))
+            styles.add(ParagraphStyle(name='NMFieldLabelPDF', parent=styles['MetaLabel'], leftIndent=10))
+            styles.add(ParagraphStyle(name='NMFieldValuePDF', parent=styles['MetaValue'], leftIndent=25))
+            styles.add(ParagraphStyle(name='AttachLabelPDF', parent=styles['MetaLabel'], leftIndent=10, spaceBefore=5, keepWithNext=1))
+            styles.add(ParagraphStyle(name='AttachmentLinkPDF', parent=styles['MetaValue'], fontName='Helvetica', fontSize=9, leftIndent=25, textColor=colors.blue, spaceAfter=2)) # Removed underline
+            _pdf_table_style = TableStyle([('VALIGN',(0,0),(-1,-1),'TOP'), ('LEFTPADDING',(0,0),(-1,-1),0), ('RIGHTPADDING',(0,0),(-1,-1),0), ('BOTTOMPADDING',(0,0),(-1,-1),2)])
+            _TemplateParagraph = _template_paragraph_class()
+            _pdf_styles = styles # Set last: marks the cache as ready
+    return _pdf_styles
+
+def _template_paragraph_class():
+    """Paragraph subclass (needs reportlab loaded) whose line breaking is shared between reports."""
+    class TemplateParagraph(Paragraph):
+        _layouts = None # width -> (lines, word list, max width), shared by every report using the template
+
+        def breakLines(self, width):
+            if self._layouts is None: # Pieces created by split() lay themselves out normally
+                return Paragraph.breakLines(self, width)
+            key = tuple(width) if isinstance(width, (list, tuple)) else width
+            layout = self._layouts.get(key)
+            if layout is None:
+                lines = Paragraph.breakLines(self, width)
+                layout = self._layouts[key] = (lines, self.frags, self._width_max)
+            lines, self.frags, self._width_max = layout
+            return lines
+    return TemplateParagraph
+
+def _parse_markup(markup, style):
+    return Paragraph(markup, style).frags
+
+def _para(markup, style_name, cache=True):
+    """Paragraph in one of the report styles. Repeated strings reuse their parsed fragments
+    (Paragraph only reads them while laying out), so only genuinely new text is parsed."""
+    style = _pdf_styles[style_name]
+    if not cache:
+        return Paragraph(markup, style)
+    key = (markup, style_name)
+    frags = _parsed_paragraphs.get(key)
+    if frags is None:
+        frags = _parse_markup(markup, style)
+        if len(_parsed_paragraphs) < _PARSED_CACHE_LIMIT: _parsed_paragraphs[key] = frags
+    return Paragraph(markup, style, frags=frags)
+
+def _template_parts(template):
+    """Parsed section headers and question lines of a checklist template, built once per template.
+
+    Each entry is (markup, frags, layouts); `layouts` memoizes line breaking per column width.
+    """
+    parts = _pdf_template_parts.get(template.content_hash)
+    if parts is None:
+        parts = []
+        for (title, _), (start, end) in zip(template.sections, template.section_ranges):
+            questions = []
+            for q in template.questions[start:end]:
+                markup = pdf_escape(f"{q.text}{' *' if q.mandatory else ''}")
+                questions.append((markup, _parse_markup(markup, _pdf_styles['QuestionStylePDF']), {}))
+            parts.append(((title, _parse_markup(title, _pdf_styles['SectionHeaderPDF']), {}), questions))
+        _pdf_template_parts[template.content_hash] = parts
+    return parts
+
+def _template_paragraph(part, style_name):
+    """Paragraph for template text (section titles, questions) that repeats in every report."""
+    markup, frags, layouts = part
+    paragraph = _TemplateParagraph(markup, _pdf_styles[style_name], frags=frags)
+    paragraph._layouts = layouts
+    return paragraph
+
+def _link_paragraph(url):
+    if url and url.startswith("http"):
+        escaped_url = pdf_escape(url)
+        display_url = escaped_url if len(escaped_url) < 70 else escaped_url[:67] + "..."
+        return _para(f'<link href="{escaped_url}">{display_url}</link>', 'AttachmentLinkPDF', cache=False)
+    else:
+        return _para(pdf_escape(url), 'AnswerStyleEmptyPDF', cache=False) if url else _para("[Invalid Link]", 'AnswerStyleEmptyPDF')
+
+def _value_paragraph(text, style_name, empty="[N/A]", empty_style=None):
+    """Paragraph for a user-entered value; short values (Yes/No, names, dates) are cached."""
+    if not text:
+        return _para(empty, empty_style or style_name)
+    return _para(pdf_escape(text), style_name, cache=len(text) <= 64)
+
+def build_pdf_story(report):
+    """Builds the list of flowables for one report (the page content of export_to_pdf)."""
+    report = ReportModel.coerce(report)
+    _load_reportlab()
+    _get_pdf_styles()
+    story = []
+
+    # --- Header ---
+    story.append(_para("Warehouse Safety Compliance Report", 'MainHeader'))
+    meta = report.metadata
+    story.append(_para(f"Date: {pdf_escape(meta.get('Report Date','N/A'))} | WH: {pdf_escape(meta.get('Warehouse Name','N/A'))} | Loc: {pdf_escape(meta.get('Location','N/A'))}", 'SubHeader', cache=False))
+    story.append(_para("Report Information", 'MetaHeader'))
+
+    # Metadata Table
+    meta_data_table = []
+    fields_ordered = METADATA_FIELDS
+    for i in range(0, len(fields_ordered), 2):
+         key1 = fields_ordered[i]
+         row = [_para(f"<b>{key1}:</b>", 'MetaLabel'), _value_paragraph(meta.get(key1,''), 'MetaValue'), "", ""]
+         if i + 1 < len(fields_ordered):
+             key2 = fields_ordered[i+1]
+             row[2:] = [_para(f"<b>{key2}:</b>", 'MetaLabel'), _value_paragraph(meta.get(key2,''), 'MetaValue')]
+         meta_data_table.append(row)
+    table = Table(meta_data_table, colWidths=[1.5*inch, 2.2*inch, 1.5*inch, 2.2*inch])
+    table.setStyle(_pdf_table_style)
+    story.append(table)
+    story.append(Spacer(1, 0.2*inch))
+
+    # Checklist Items
+    story.append(_para("Checklist Items", 'MetaHeader'))
+    answers = report.answers
+    first = 0
+    for title_part, questions in _template_parts(report.template):
+         section_items = [_template_paragraph(title_part, 'SectionHeaderPDF')]
+         for offset, question_part in enumerate(questions):
+             section_items.append(_template_paragraph(question_part, 'QuestionStylePDF'))
+             section_items.append(_value_paragraph(answers[first + offset], 'AnswerStylePDF', empty_style='AnswerStyleEmptyPDF'))
+         first += len(questions)
+         story.append(KeepTogether(section_items))
+
+    # Near Miss Report
+    story.append(PageBreak()); story.append(_para("Near Miss Report", 'MetaHeader'))
+    nm_details = report.near_miss
+    if any(nm_details.values()):
+         nm_section_content = []
+         field_map = {"Incident Date":"Date","Incident Location":"Location","Description":"Description","Immediate Action":"Action","Prevention Suggestion":"Prevention"}
+         for k, lbl in field_map.items():
+             nm_section_content.append(_para(f"<b>{lbl}:</b>", 'NMFieldLabelPDF'))
+             nm_section_content.append(_value_paragraph(nm_details.get(k,''), 'NMFieldValuePDF'))
+         nm_att = report.near_miss_attachments
+         nm_section_content.append(_para("<b>Evidence Links (Near Miss):</b>", 'AttachLabelPDF'))
+         nm_section_content.extend([_link_paragraph(url) for url in nm_att]) if nm_att else nm_section_content.append(_para("[None]", 'AnswerStyleEmptyPDF'))
+         story.append(KeepTogether(nm_section_content))
+    else: story.append(_para("[No Near Miss Recorded]", 'AnswerStyleEmptyPDF'))
+
+    # Action Points
+    story.append(Spacer(1, 0.2*inch)); story.append(_para("Action Points / Recommendations", 'MetaHeader'))
+    story.append(_value_paragraph(report.action_points, 'AnswerStylePDF', empty="[None]", empty_style='AnswerStyleEmptyPDF'))
+
+    # General Links
+    story.append(Spacer(1, 0.2*inch)); story.append(_para("General Evidence Links", 'MetaHeader'))
+    gen_att = report.general_attachments; story.extend([_link_paragraph(url) for url in gen_att]) if gen_att else story.append(_para("[None]", 'AnswerStyleEmptyPDF'))
+    return story
+
+def _new_pdf_doc(file_path):
+    """Letter-size document with the report margins (shared by single reports and bundles)."""
+    return SimpleDocTemplate(file_path, pagesize=(8.5*inch, 11*inch), leftMargin=0.6*inch, rightMargin=0.6*inch, topMargin=0.6*inch, bottomMargin=0.6*inch)
+
+def export_to_pdf(report, file_path, progress=None, cancel=None):
+    """Exports a report (ReportModel or get_all_data() dict) to PDF, creating hyperlinks for URLs.
+
+    Same `progress` / `cancel` hooks as export_to_excel; cancellation is also checked after
+    every laid-out flowable, and the file is only written once layout has finished.
+    """
+    _checkpoint(progress, cancel, 0.0, "Loading PDF library")
+    _load_reportlab()
+    try:
+        doc = _new_pdf_doc(file_path)
+        story = build_pdf_story(report)
+
+        # Build PDF (layout is the slow part, so report progress per flowable)
+        total = max(len(story), 1)
+        laid_out = [0]
+        def after_flowable(flowable):
+            laid_out[0] += 1
+            _checkpoint(progress, cancel, 0.2 + 0.75 * min(laid_out[0] / total, 1.0), "Laying out pages")
+        doc.afterFlowable = after_flowable
+        _checkpoint(progress, cancel, 0.2, "Laying out pages")
+        doc.build(story)
+        _checkpoint(progress, None, 1.0, "Done")
+
+    except PermissionError as e:
+        raise ExportError(f"Permission denied writing PDF file:\n'{os.path.basename(file_path)}'\n\nIs the file open elsewhere?") from e
+
+def export_reports_pdf(groups, file_path, cancel=None):
+    """Renders many reports into one PDF, each starting on a new page, with a bookmark per report.
+
+    `groups` is a list of (group_title, [(report, title), ...]); with a group_title the outline
+    has one entry per group and the reports nested below it. Each report's pages look exactly
+    like export_to_pdf() output for that report. Returns ([(title, first_page), ...], page_count).
+    """
+    _load_reportlab()
+    try:
+        doc = _new_pdf_doc(file_path)
+        story, marks = [], {}
+        for g_idx, (group_title, reports) in enumerate(groups):
+            for r_idx, (report, title) in enumerate(reports):
+                if story: story.append(PageBreak())
+                report_story = build_pdf_story(report)
+                # Bookmark on the report's first flowable (drawn at the top of its first page)
+                marks[id(report_story[0])] = (f"report_{g_idx}_{r_idx}", title, group_title, r_idx == 0)
+                story.extend(report_story)
+
+        starts = []
+        def after_flowable(flowable):
+            _checkpoint(None, cancel, 0.0, "")
+            mark = marks.get(id(flowable))
+            if mark is None: return
+            key, title, group_title, first_in_group = mark
+            doc.canv.bookmarkPage(key)
+            if group_title and first_in_group: # Outline entries need their own bookmark names
+                doc.canv.bookmarkPage(f"group_{key}")
+                doc.canv.addOutlineEntry(group_title, f"group_{key}", level=0)
+            doc.canv.addOutlineEntry(title, key, level=1 if group_title else 0)
+            starts.append((title, doc.page))
+        doc.afterFlowable = after_flowable
+        doc.build(story)
+        return starts, doc.page
+
+    except PermissionError as e:
+        raise ExportError(f"Permission denied writing PDF file:\n'{os.path.basename(file_path)}'\n\nIs the file open elsewhere?") from e
+
+
+# ==============================================================================
+# Consolidated Workbook (streaming, many reports)
+# ==============================================================================
+_INVALID_SHEET_CHARS = re.compile(r"[\[\]:*?/\\]")
+
+def _consolidated_styles():
+    """Named styles shared by every cell of the consolidated workbook (registered once per workbook)."""
+    border_side = Side(border_style="thin", color="FFDDDDDD")
+    border = Border(left=border_side, right=border_side, top=border_side, bottom=border_side)
+    header = NamedStyle(name="Consolidated Header")
+    header.font = OpenpyxlFont(name='Arial', size=11, bold=True, color="FFFFFFFF")
+    header.fill = PatternFill(start_color="FF14467C", end_color="FF14467C", fill_type="solid")
+    header.alignment = Alignment(wrap_text=True, vertical='top', horizontal='left')
+    header.border = border
+    cell = NamedStyle(name="Consolidated Cell")
+    cell.font = OpenpyxlFont(name='Arial', size=10)
+    cell.alignment = Alignment(wrap_text=True, vertical='top', horizontal='left')
+    cell.border = border
+    failed = NamedStyle(name="Consolidated No")
+    failed.font = OpenpyxlFont(name='Arial', size=10, bold=True, color="FFD32F2F")
+    failed.alignment = cell.alignment
+    failed.border = border
+    return header, cell, failed
+
+def _styled_cell(ws, value, style_name):
+    """Write-only cell using a named style registered on the workbook."""
+    c = WriteOnlyCell(ws, value=value)
+    c.style = style_name
+    return c
+
+def _unique_sheet_title(name, used):
+    """Excel sheet titles: max 31 chars, no []:*?/\\, unique (case-insensitive)."""
+    base = _INVALID_SHEET_CHARS.sub("_", name or "Unknown").strip("'") or "Unknown"
+    title, n = base[:31], 2
+    while title.lower() in used:
+        suffix = f" ({n})"
+        title, n = base[:31 - len(suffix)] + suffix, n + 1
+    used.add(title.lower())
+    return title
+
+def export_consolidated_excel(rows, file_path, header, template, progress=None, cancel=None):
+    """Streams many report rows into a write-only workbook: a Summary sheet plus one sheet per warehouse.
+
+    `rows` must be grouped by warehouse_key (consolidate.py sorts them), so names differing only in case or
+    surrounding spaces share one sheet, named as the first row spells it. Rows are laid out like `header`, which
+    contains "Warehouse Name", "Report Date" and one column per question of `template`. Rows are
+    written as they arrive and all cells share named styles, so memory stays flat with the row count.
+    """
+    _load_openpyxl()
+    wh_col, date_col = header.index("Warehouse Name"), header.index("Report Date")
+    first_q = header.index(template.questions[0].text) if len(template) else len(header)
+    yes_no_cols = {first_q + i for i, q in enumerate(template.questions) if q.type == "yes_no"}
+
+    wb = openpyxl.Workbook(write_only=True)
+    header_style, cell_style, failed_style = _consolidated_styles()
+    for style in (header_style, cell_style, failed_style): wb.add_named_style(style)
+
+    summary = wb.create_sheet("Summary") # Created first so it is the first tab; filled in at the end
+    summary.column_dimensions['A'].width = 32
+    for col in "BCDEF": summary.column_dimensions[col].width = 16
+    summary_rows, used_titles = [], {"summary"}
+    ws, current_wh, current_key, stats = None, None, None, None
+
+    def close_warehouse():
+        if stats is not None:
+            answered = stats["yes"] + stats["no"]
+            summary_rows.append([current_wh, stats["reports"], stats["latest"], stats["yes"], stats["no"],
+                                 round(100.0 * stats["yes"] / answered, 1) if answered else None])
+
+    for row_number, row in enumerate(rows, 1):
+        if row_number % 50 == 0:
+            _checkpoint(progress, cancel, 0.0, f"{row_number} reports written")
+        key = warehouse_key(row[wh_col])
+        if key != current_key:
+            close_warehouse()
+            warehouse = str(row[wh_col] or "").strip() or "Unknown"
+            current_wh, current_key, stats = warehouse, key, {"reports": 0, "latest": "", "yes": 0, "no": 0}
+            ws = wb.create_sheet(_unique_sheet_title(warehouse, used_titles))
+            ws.freeze_panes = "B2"
+            for i in range(len(header)):
+                ws.column_dimensions[openpyxl.utils.get_column_letter(i + 1)].width = 40 if i >= first_q else 18
+            ws.append([_styled_cell(ws, h, header_style.name) for h in header])
+        stats["reports"] += 1
+        stats["latest"] = max(stats["latest"], str(row[date_col] or ""))
+        for col in yes_no_cols:
+            if row[col] == "Yes": stats["yes"] += 1
+            elif row[col] == "No": stats["no"] += 1
+        ws.append([_styled_cell(ws, v, failed_style.name if v == "No" and i in yes_no_cols else cell_style.name)
+                   for i, v in enumerate(row)])
+    close_warehouse()
+
+    _checkpoint(progress, cancel, 0.9, "Writing summary")
+    summary.append([_styled_cell(summary, h, header_style.name) for h in
+                    ("Warehouse", "Reports", "Latest Report", "Yes Answers", "No Answers", "Compliance %")])
+    for values in summary_rows:
+        summary.append([_styled_cell(summary, v, cell_style.name) for v in values])
+    wb.save(file_path)
+    _checkpoint(progress, None, 1.0, "Done")
+    return len(summary_rows)
+
+
+# ==============================================================================
+# Compliance Workbook (see compliance.py)
+# ==============================================================================
+def _pct_cell(value):
+    """Percentage rounded for display; NaN (nothing answered Yes/No) becomes an empty cell."""
+    return None if value != value else round(float(value), 1)
+
+def export_compliance_excel(summary, file_path, progress=None, cancel=None):
+    """Writes a ComplianceSummary as a workbook: sections per warehouse, mandatory failures and monthly trend."""
+    _load_openpyxl()
+    try:
+        wb = openpyxl.Workbook(write_only=True)
+        header_style, cell_style, failed_style = _consolidated_styles()
+        for style in (header_style, cell_style, failed_style): wb.add_named_style(style)
+
+        def add_sheet(title, header, rows, widths):
+            ws = wb.create_sheet(title)
+            ws.freeze_panes = "B2"
+            for i, width in enumerate(widths): ws.column_dimensions[openpyxl.utils.get_column_letter(i + 1)].width = width
+            ws.append([_styled_cell(ws, h, header_style.name) for h in header])
+            for row in rows: ws.append([_styled_cell(ws, v, cell_style.name) for v in row])
+
+        # --- Section compliance per warehouse ---
+        _checkpoint(progress, cancel, 0.1, "Writing section compliance")
+        rows = [[wh, int(summary.report_counts[w]), _pct_cell(summary.warehouse_pct[w])] +
+                [_pct_cell(v) for v in summary.section_pct[w]] for w, wh in enumerate(summary.warehouses)]
+        rows.append(["All Warehouses", summary.report_count, _pct_cell(summary.overall_pct)] +
+                    [_pct_cell(v) for v in summary.overall_section_pct])
+        add_sheet("Section Compliance", ["Warehouse", "Reports", "Overall %"] + [f"{s} %" for s in summary.sections],
+                  rows, [28, 10, 12] + [18] * len(summary.sections))
+
+        # --- Mandatory failures ---
+        _checkpoint(progress, cancel, 0.4, "Writing mandatory failures")
+        rows = [[q, int(n)] for q, n, m in zip(summary.questions, summary.question_failures, summary.mandatory) if m]
+        rows.sort(key=lambda r: -r[1])
+        rows += [[], ["Warehouse", "Mandatory No Answers"]] + \
+                [[wh, int(n)] for wh, n in zip(summary.warehouses, summary.warehouse_failures)]
+        add_sheet("Mandatory Failures", ["Mandatory Question", "Reports Answering No"], rows, [80, 22])
+
+        # --- Monthly trend ---
+        _checkpoint(progress, cancel, 0.7, "Writing monthly trend")
+        rows = [["All Warehouses"] + [_pct_cell(v) for v in summary.monthly_pct],
+                ["Change vs. previous month"] + [_pct_cell(v) for v in summary.monthly_change]]
+        rows += [[wh] + [_pct_cell(v) for v in summary.warehouse_monthly_pct[w]] for w, wh in enumerate(summary.warehouses)]
+        add_sheet("Monthly Trend", ["Compliance %"] + summary.months, rows, [28] + [10] * len(summary.months))
+
+        _checkpoint(progress, cancel, 0.9, "Writing file")
+        wb.save(file_path)
+        _checkpoint(progress, None, 1.0, "Done")
+
+    except PermissionError as e:
+        raise ExportError(f"Permission denied writing Excel file:\n'{os.path.basename(file_path)}'\n\nIs the file open elsewhere?") from e
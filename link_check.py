@@ -0,0 +1,233 @@
+# link_check.py - Evidence link health check: URL format plus a concurrent HTTP probe per link
+#
+# Each link gets a LinkStatus with one of these states:
+#   ok           answered 2xx (after following redirects)
+#   restricted   redirected to a sign-in page, or 401/403: sharing is probably not "anyone with the link"
+#   broken       any other 4xx/5xx answer (deleted file, mistyped link, ...)
+#   invalid      not a well-formed http(s) URL (never probed)
+#   unreachable  DNS, connection, TLS or timeout error, e.g. while offline; never cached
+# Probes use asyncio streams (HEAD, falling back to GET if HEAD is refused). At most `limit`
+# connections are open at a time, and each link has its own `timeout`. Results are cached per URL in
+# LINK_CACHE_PATH for `ttl` seconds, so checking a report again only probes new or expired links.
+# Usage from the command line (project files, folders of project files or URLs):
+#   python main.py links reports/ --recursive
+
+import argparse
+import asyncio
+import json
+import os
+import ssl
+import sys
+import time
+from collections import namedtuple
+from urllib.parse import quote, urljoin, urlsplit
+
+LINK_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".warehouse_safety", "link_cache.json")
+DEFAULT_TTL = 24 * 3600 # Seconds a cached result is trusted
+DEFAULT_LIMIT = 8 # Concurrent connections
+DEFAULT_TIMEOUT = 10.0 # Seconds per link, redirects included
+MAX_REDIRECTS = 5
+SIGN_IN_HOSTS = {"accounts.google.com", "login.microsoftonline.com", "login.live.com", "login.windows.net"}
+SIGN_IN_PATH_SEGMENTS = {"login", "signin", "sign-in", "auth"} # Whole path segments ("login.php" counts, "/authors" does not)
+STATE_LABELS = {"ok": "OK", "restricted": "needs sign-in (check sharing)", "broken": "broken",
+                "invalid": "invalid URL", "unreachable": "not reachable"}
+_USER_AGENT = "WarehouseChecklist-LinkCheck/1.0"
+
+LinkStatus = namedtuple("LinkStatus", "url state detail checked_at")
+
+
+def link_problem(url):
+    """Why a URL is not a usable http(s) link (None if it is well-formed)."""
+    if not isinstance(url, str) or not url.strip():
+        return "empty link"
+    if url != url.strip() or any(c.isspace() or ord(c) < 32 for c in url):
+        return "contains spaces or control characters"
+    try:
+        parts = urlsplit(url)
+        parts.port # Raises ValueError for a non-numeric or out-of-range port
+    except ValueError as e:
+        return f"malformed URL ({e})"
+    if parts.scheme.lower() not in ("http", "https"):
+        return "must start with http:// or https://"
+    if not parts.hostname:
+        return "no host name"
+    return None
+
+def _is_sign_in(url):
+    parts = urlsplit(url)
+    segments = (segment.split(".")[0] for segment in parts.path.lower().split("/"))
+    return (parts.hostname or "").lower() in SIGN_IN_HOSTS or any(segment in SIGN_IN_PATH_SEGMENTS for segment in segments)
+
+
+# ==============================================================================
+# Probing
+# ==============================================================================
+async def _request(url, method):
+    """Sends one request and returns (status code, headers) of the response; the body is not read."""
+    parts = urlsplit(url)
+    https = parts.scheme.lower() == "https"
+    reader, writer = await asyncio.open_connection(parts.hostname, parts.port or (443 if https else 80),
+                                                   ssl=ssl.create_default_context() if https else None)
+    try:
+        target = quote(parts.path or "/", safe="/%:@!$&'()*+,;=~") + (f"?{parts.query}" if parts.query else "")
+        host = parts.hostname if parts.port is None else f"{parts.hostname}:{parts.port}"
+        writer.write(f"{method} {target} HTTP/1.1\r\nHost: {host}\r\nUser-Agent: {_USER_AGENT}\r\n"
+                     "Accept: */*\r\nConnection: close\r\n\r\n".encode("latin-1", "replace"))
+        await writer.drain()
+        status_line = (await reader.readline()).decode("latin-1").split()
+        if len(status_line) < 2 or not status_line[1].isdigit():
+            raise ConnectionError("not an HTTP response")
+        headers = {}
+        while True:
+            line = (await reader.readline()).decode("latin-1").strip()
+            if not line: break
+            name, _, value = line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+        return int(status_line[1]), headers
+    finally:
+        writer.close()
+        try:
+            await writer.wait_closed() # Releases the socket now rather than at garbage collection
+        except OSError:
+            pass # The connection is gone either way
+
+async def _probe(url):
+    """Follows redirects and classifies the final answer. Returns (state, detail)."""
+    for _ in range(MAX_REDIRECTS + 1):
+        status, headers = await _request(url, "HEAD")
+        if status in (405, 501): # HEAD not supported: ask for the page (only the headers are read)
+            status, headers = await _request(url, "GET")
+        if status in (301, 302, 303, 307, 308) and headers.get("location"):
+            url = urljoin(url, headers["location"])
+            if _is_sign_in(url): return "restricted", f"redirects to a sign-in page ({urlsplit(url).hostname})"
+            if link_problem(url): return "broken", f"redirects to an unusable address ({url})"
+            continue
+        if 200 <= status < 300: return "ok", f"HTTP {status}"
+        if status in (401, 403): return "restricted", f"HTTP {status} (access denied)"
+        return ("broken", f"HTTP {status}") if status >= 400 else ("ok", f"HTTP {status}")
+    return "broken", "too many redirects"
+
+async def probe_links(urls, limit=DEFAULT_LIMIT, timeout=DEFAULT_TIMEOUT):
+    """Probes well-formed URLs concurrently (at most `limit` at once). Returns {url: LinkStatus}."""
+    semaphore = asyncio.Semaphore(limit)
+
+    async def check(url):
+        problem = link_problem(url)
+        if problem:
+            return LinkStatus(url, "invalid", problem, time.time())
+        async with semaphore:
+            try:
+                state, detail = await asyncio.wait_for(_probe(url), timeout)
+            except asyncio.TimeoutError:
+                state, detail = "unreachable", f"no answer within {timeout:g} s"
+            except (OSError, EOFError, UnicodeError, ValueError) as e:
+                state, detail = "unreachable", str(e) or type(e).__name__ # DNS failure, refused, offline, bad TLS, ...
+        return LinkStatus(url, state, detail, time.time())
+
+    results = await asyncio.gather(*(check(url) for url in dict.fromkeys(urls)))
+    return {status.url: status for status in results}
+
+
+# ==============================================================================
+# Cached Checker
+# ==============================================================================
+class LinkChecker:
+    """Checks links with a per-URL result cache (a JSON file). check() blocks, so the GUI runs it in a worker thread."""
+    def __init__(self, cache_path=LINK_CACHE_PATH, ttl=DEFAULT_TTL, limit=DEFAULT_LIMIT, timeout=DEFAULT_TIMEOUT):
+        self.cache_path, self.ttl, self.limit, self.timeout = cache_path, ttl, limit, timeout
+        self._results = {} # url -> LinkStatus
+        if cache_path:
+            try:
+                with open(cache_path, "r", encoding="utf-8") as f:
+                    self._results = {url: LinkStatus(url, *entry) for url, entry in json.load(f).items()}
+            except FileNotFoundError:
+                pass
+            except (OSError, ValueError, TypeError) as e:
+                print(f"Warning: ignoring link check cache ({e})")
+
+    def cached(self, url):
+        """The cached status of a URL if it is still fresh (else None). Never touches the network."""
+        status = self._results.get(url)
+        return status if status is not None and time.time() - status.checked_at < self.ttl else None
+
+    def check(self, urls, force=False):
+        """Statuses for `urls`: fresh cached results as they are, the rest probed now. Returns {url: LinkStatus}."""
+        urls = list(dict.fromkeys(urls))
+        results = {} if force else {url: self.cached(url) for url in urls}
+        pending = [url for url in urls if results.get(url) is None]
+        if pending:
+            probed = asyncio.run(probe_links(pending, self.limit, self.timeout))
+            results.update(probed)
+            fresh = {url: s for url, s in probed.items() if s.state != "unreachable"} # Offline results must not stick
+            if fresh:
+                self._results = dict(self._results, **fresh) # Replaced whole: the GUI thread may be reading it
+                self._save()
+        return {url: results[url] for url in urls}
+
+    def _save(self):
+        if not self.cache_path: return
+        now = time.time()
+        data = {url: list(s[1:]) for url, s in self._results.items() if now - s.checked_at < self.ttl}
+        try:
+            os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+            tmp_path = f"{self.cache_path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(tmp_path, self.cache_path)
+        except OSError as e:
+            print(f"Warning: could not save link check cache ({e})")
+
+def summarize(statuses):
+    """One-line count per state, e.g. "3 OK, 1 needs sign-in (check sharing)"."""
+    counts = {}
+    for status in statuses:
+        counts[status.state] = counts.get(status.state, 0) + 1
+    return ", ".join(f"{counts[state]} {label}" for state, label in STATE_LABELS.items() if state in counts) or "no links"
+
+
+# ==============================================================================
+# Command Line
+# ==============================================================================
+def _collect_links(inputs, recursive=False):
+    """{url: [project file names]} from project files, folders of project files and plain URLs; plus load errors."""
+    from consolidate import DEFAULT_PATTERN, iter_project_files
+    from project_schema import iter_reports
+    links, errors, paths = {}, [], []
+    for item in inputs:
+        if os.path.isdir(item): paths.extend(sorted(iter_project_files(item, DEFAULT_PATTERN, recursive)))
+        elif os.path.isfile(item): paths.append(item)
+        else: links.setdefault(item, [])
+    for result in iter_reports(paths):
+        if result.errors:
+            errors.append((result.path, result.errors))
+            continue
+        for url in result.report.near_miss_attachments + result.report.general_attachments:
+            links.setdefault(url, []).append(os.path.basename(result.path))
+    return links, errors
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check the evidence links of project files (format, reachability, sharing).")
+    parser.add_argument("inputs", nargs="+", help="Project files, folders of project files, or URLs")
+    parser.add_argument("--recursive", action="store_true", help="Also search sub-folders")
+    parser.add_argument("--limit", type=int, default=DEFAULT_LIMIT, help=f"Concurrent connections (default: {DEFAULT_LIMIT})")
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT, help=f"Seconds per link (default: {DEFAULT_TIMEOUT:g})")
+    parser.add_argument("--refresh", action="store_true", help="Ignore cached results and probe every link")
+    parser.add_argument("--no-cache", action="store_true", help="Do not read or write the result cache")
+    args = parser.parse_args(argv)
+
+    links, errors = _collect_links(args.inputs, args.recursive)
+    for path, problems in errors:
+        print(f"SKIPPED {path}: " + "; ".join(str(p) for p in problems), file=sys.stderr)
+    checker = LinkChecker(None if args.no_cache else LINK_CACHE_PATH, limit=args.limit, timeout=args.timeout)
+    t = time.perf_counter()
+    statuses = checker.check(links, force=args.refresh)
+    for url, status in statuses.items():
+        sources = f"  [{', '.join(links[url][:3])}{' ...' if len(links[url]) > 3 else ''}]" if links[url] else ""
+        print(f"{status.state.upper():<12} {url}  ({status.detail}){sources}")
+    print(f"{len(statuses)} link(s) in {time.perf_counter() - t:.1f} s: {summarize(statuses.values())}.")
+    if statuses and all(s.state == "unreachable" for s in statuses.values()):
+        print("No link could be reached; check the network connection.", file=sys.stderr)
+    return 1 if any(s.state in ("restricted", "broken", "invalid") for s in statuses.values()) else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,40 +1,46 @@
 # main.py (Version 7.1 - Indentation Corrected)
 
+import time
+_PROCESS_START = time.perf_counter() # Reference point for the startup-time measurement
+import sys
+
+# --- Command-line mode (python main.py export ...) ---
+# Dispatched before the GUI imports so headless runs never load customtkinter or create a Tk root.
+# Only project files as arguments (e.g. "Open with" / double-click) start the GUI with them open;
+# anything else, including --help, goes to the command line.
+if __name__ == "__main__":
+    import multiprocessing
+    multiprocessing.freeze_support() # Process-pool workers of the frozen .exe start here and never reach the GUI
+    import os.path
+    from profiling import configure as configure_profiling
+    from report_core import COMPACT_EXTENSION
+    sys.argv[1:] = configure_profiling(sys.argv[1:]) # --profile / WAREHOUSE_PROFILE (see profiling.py)
+    if not all(os.path.isfile(arg) and arg.lower().endswith((".json", COMPACT_EXTENSION)) for arg in sys.argv[1:]):
+        from cli import main as cli_main
+        sys.exit(cli_main(sys.argv[1:]))
+
 import customtkinter as ctk
 import tkinter as tk
-from tkinter import filedialog, messagebox, simpledialog
-import json
+from tkinter import filedialog, messagebox, simpledialog, ttk
 import os
 import platform
 import webbrowser
-from datetime import datetime
 import re # Not currently used, but kept for potential future validation
+import threading
+import importlib.util
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 
-# --- Import necessary export libraries ---
-try:
-    import openpyxl
-    from openpyxl.styles import Font as OpenpyxlFont, Alignment, PatternFill, Border, Side
-    from openpyxl.worksheet.hyperlink import Hyperlink
-    OPENPYXL_AVAILABLE = True
-except ImportError:
-    OPENPYXL_AVAILABLE = False
-
-try:
-    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, PageBreak, KeepTogether
-    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-    from reportlab.lib.enums import TA_LEFT, TA_CENTER, TA_JUSTIFY
-    from reportlab.lib import colors
-    from reportlab.lib.units import inch
-    REPORTLAB_AVAILABLE = True
-except ImportError:
-    REPORTLAB_AVAILABLE = False
+# --- Tk-free data model and export writers ---
+from report_core import ReportModel
+from exporters import (OPENPYXL_AVAILABLE, REPORTLAB_AVAILABLE, ExportCancelled, ExportError, export_to_excel, export_to_pdf,
+                       prewarm_exporters)
 
 # --- Constants & Appearance ---
 ctk.set_appearance_mode("Light") # Force Light mode for consistent background
 
 # Define Brand Colors
-PRIMARY_COLOR = "#39B54A" # Main Green
-SECONDARY_COLOR = "#14467C" # Dark Blue
+from report_core import PRIMARY_COLOR, SECONDARY_COLOR # Main Green, Dark Blue (shared with exports)
 ACCENT_COLOR = "#5DC66A" # Lighter green for hover
 TEXT_ON_PRIMARY = "#FFFFFF" # White text on green buttons/tabs
 TEXT_ON_SECONDARY = "#FFFFFF" # White text on blue buttons
@@ -54,68 +60,213 @@ BODY_FONT_SIZE_MEDIUM = 13
 BODY_FONT_SIZE_SMALL = 12
 STATUS_FONT_SIZE = 11
 
-# --- Checklist Structure (Unchanged) ---
-CHECKLIST_STRUCTURE = [("Fire Safety Training", [("Have you commenced Fire Safety presentations as scheduled?", "yes_no", True), ("How are you tracking training completion?", "text", True)]), ("Documentation & Certifications", [("Is your Fire NOC valid and current?", "yes_no", True), ("Are warehouse fire layout diagrams displayed properly?", "yes_no", True)]), ("Safety Infrastructure", [("Have fluorescent markings been installed for emergency evacuation routes?", "yes_no", True), ("Are smoke detection systems, fire alarms, and emergency notification boards in place?", "yes_no", True), ("When was the last functionality test for sprinkler systems and fire hydrants?", "text", True)]), ("Operational Protocols", [("Is visitor registration being properly maintained?", "yes_no", True), ("Have daily SOPs and safety checklists been implemented?", "yes_no", True), ("How are you enforcing the prohibition of fire-ignition tools?", "text", True), ("Have you established machinery inspection schedules for hazard identification?", "yes_no", True)]), ("Maintenance Documentation", [("Has the procurement team implemented maintenance logbook protocols?", "yes_no", True)]), ("Personnel Qualification", [("Have you verified ITI certification or equivalent for all electrical personnel?", "yes_no", True)]), ("Safety Engagement Initiatives", [("What safety engagement activities have you organized recently?", "text", False), ("Which best practices from training have you implemented?", "text", False), ("Have you developed facility-specific internal safety protocols?", "yes_no", True)]), ("Compliance Verification", [("Have cross-Warehouse audits been conducted?", "yes_no", False), ("Is your monthly machinery safety inspection schedule established?", "yes_no", True), ("When was your last mock drill conducted?", "text", True), ("How are you maintaining inspection and compliance records?", "text", True)]), ("Seasonal Safety", [("Have all seasonal equipment (water coolers, etc.) been inspected?", "yes_no", True)])]
+# --- Checklist Structure & Field Definitions (see report_core.py) ---
+from report_core import BUILTIN_TEMPLATE, METADATA_FIELDS, NEAR_MISS_FIELDS, REQUIRED_METADATA
+from report_core import COMPACT_EXTENSION, ProjectFileError, read_project_file, report_file_stem, write_project_file
+from checklist_template import TemplateError, load_template
+from project_journal import ProjectJournal, journal_path_for
+from project_format import CompactProject, is_compact_file
+from project_schema import ProjectValidationError, load_project_data
+from profiling import PROFILER, record as record_span, span, timed
+from workspace import ReportDocument, Workspace
+AUTOSAVE_INTERVAL_MS = 30000 # How often journaled edits are folded into the project file
+CHECKLIST_BUILD_FALLBACK_MS = 1000 # Build the checklist by then even if its tab never reported a size
+TEMPLATE_ENV_VAR = "WAREHOUSE_CHECKLIST_TEMPLATE" # Optional path of the checklist template to start with
+
+
+def _set_if_changed(var, value):
+    """Sets a Tk variable only if its value differs (every set() fires all of its traces)."""
+    if var.get() != value: var.set(value)
+
+def _set_textbox_text(textbox, text):
+    """Replaces a textbox's content if it differs, leaving its modified flag cleared."""
+    try:
+        if textbox.get("1.0", "end-1c") != text:
+            textbox.delete("1.0", "end")
+            textbox.insert("1.0", text)
+        textbox.edit_modified(False)
+    except tk.TclError:
+        pass # Widget is being destroyed
+
+
+# ==============================================================================
+# Shared Styles
+# ==============================================================================
+# Colors are (light, dark) pairs. CTk widgets show the entry for the current appearance mode, and
+# ctk.set_appearance_mode() recolors every existing widget, so switching themes rebuilds nothing.
+PALETTE = {
+    "primary": (PRIMARY_COLOR, PRIMARY_COLOR),
+    "accent": (ACCENT_COLOR, ACCENT_COLOR),
+    "secondary": (SECONDARY_COLOR, "#7FB2E5"), # Dark blue headings would disappear on a dark background
+    "secondary_hover": ("#2C5D8F", "#5C8FC2"),
+    "background": (BACKGROUND_COLOR, "#1E1E1E"),
+    "status_bar": ("#EAEAEA", "#2A2A2A"),
+    "tab_hover": ("#E0E0E0", "#3A3A3A"),
+    "separator": ("gray80", "gray30"),
+    "text_light": (TEXT_COLOR_LIGHT, "#A6A6A6"),
+    "error": (ERROR_COLOR, "#EF6C6C"),
+}
+APPEARANCE_MODES = ("Light", "Dark")
+
+class StyleRegistry:
+    """Fonts, colors and widget option dicts, resolved once per app and shared by all frames.
+
+    Option dicts are unpacked into widget constructors (e.g. ctk.CTkButton(..., **styles.primary_button)).
+    """
+    FONT_SPECS = { # Attribute name -> (family, size, weight)
+        "header_font": (HEADER_FONT_FAMILY, HEADER_FONT_SIZE, "bold"),
+        "section_header_font": (BODY_FONT_FAMILY, BODY_FONT_SIZE_LARGE, "bold"),
+        "question_font": (BODY_FONT_FAMILY, BODY_FONT_SIZE_MEDIUM, "bold"),
+        "answer_font": (BODY_FONT_FAMILY, BODY_FONT_SIZE_SMALL, "normal"),
+        "button_font": (BODY_FONT_FAMILY, BODY_FONT_SIZE_SMALL, "bold"),
+        "metadata_label_font": (BODY_FONT_FAMILY, BODY_FONT_SIZE_SMALL, "bold"),
+        "metadata_entry_font": (BODY_FONT_FAMILY, BODY_FONT_SIZE_SMALL, "normal"),
+        "tab_font": (BODY_FONT_FAMILY, BODY_FONT_SIZE_SMALL + 1, "bold"),
+        "status_font": (BODY_FONT_FAMILY, STATUS_FONT_SIZE, "normal"),
+    }
+
+    def __init__(self):
+        self.fonts = {name: ctk.CTkFont(family=family, size=size, weight=weight)
+                      for name, (family, size, weight) in self.FONT_SPECS.items()}
+        f, c = self.fonts, PALETTE
+        self.colors = c
+        try: # Theme text colors are (light, dark) pairs too
+            label_text = ctk.ThemeManager.theme["CTkLabel"]["text_color"]
+            button_text = ctk.ThemeManager.theme["CTkButton"]["text_color"]
+        except KeyError:
+            label_text = button_text = ("#000000", "#FFFFFF") # Fallback black/white
+
+        self.primary_button = {"font": f["button_font"], "fg_color": c["primary"], "hover_color": c["accent"], "text_color": TEXT_ON_PRIMARY}
+        self.secondary_button = {"font": f["button_font"], "fg_color": c["secondary"], "hover_color": c["secondary_hover"],
+                                 "text_color": TEXT_ON_SECONDARY}
+        self.section_label = {"font": f["section_header_font"], "anchor": "w", "text_color": c["secondary"]}
+        self.field_label = {"font": f["question_font"], "anchor": "nw", "text_color": c["secondary"]}
+        self.question_label = {"font": f["question_font"], "anchor": "nw", "justify": "left"}
+        self.answer_entry = {"font": f["answer_font"], "border_width": 1, "corner_radius": 5}
+        self.textbox = {"wrap": tk.WORD, "font": f["answer_font"], "border_width": 1, "corner_radius": 5, "border_color": c["primary"]}
+        self.radio = {"font": f["answer_font"], "radiobutton_width": 18, "radiobutton_height": 18,
+                      "fg_color": c["primary"], "hover_color": c["accent"], "border_color": c["secondary"]}
+        self.separator = {"fg_color": c["separator"]}
+        self.link_row = {False: {"fg_color": "transparent", "text_color": label_text}, # Links look like labels...
+                         True: {"fg_color": c["accent"], "text_color": button_text}} # ...the selected one is highlighted
+        self.link_row_problem = {"fg_color": "transparent", "text_color": c["error"]}
+
+    def set_appearance(self, mode):
+        """Switches between "Light" and "Dark" live; existing widgets are recolored by CTk."""
+        ctk.set_appearance_mode(mode)
 
 
 # ==============================================================================
 # Main Application Class
 # ==============================================================================
+def _active_document_attr(name):
+    """App attribute kept on the active workspace document (see workspace.py)."""
+    return property(lambda self: getattr(self.workspace.active, name),
+                    lambda self, value: setattr(self.workspace.active, name, value))
+
 class WarehouseSafetyApp(ctk.CTk):
     """Main application window."""
-    def __init__(self):
-        super().__init__(fg_color=BACKGROUND_COLOR)
+    # Per-report state lives on the active ReportDocument; the rest of the app reads it as before
+    report = _active_document_attr("report")
+    project_file_path = _active_document_attr("path")
+    journal = _active_document_attr("journal")
+    _dirty_fields = _active_document_attr("dirty_fields")
+    _deferred_project = _active_document_attr("deferred")
+    near_miss_attachments = property(lambda self: self.report.near_miss_attachments) # Same list object as the model
+    general_attachments = property(lambda self: self.report.general_attachments) # Same list object as the model
+
+    @timed("startup: WarehouseSafetyApp.__init__")
+    def __init__(self, open_paths=()):
+        record_span("startup: imports", _PROCESS_START, time.perf_counter()) # Python, customtkinter and app modules
+        super().__init__(fg_color=PALETTE["background"])
         self.title("Warehouse Safety Checklist Application")
         self.geometry("1100x850")
         self.minsize(950, 750)
 
         # --- Data Storage Initialization ---
-        self.project_file_path = None
-        self.metadata_vars = {k: tk.StringVar() for k in ["Warehouse Name", "Location", "Report Date", "Report Month", "Uploaded By Name", "Uploaded By Role", "Uploaded By Emp ID", "Uploaded By Email", "Manager Name"]}
-        self.metadata_vars["Report Date"].set(datetime.now().strftime('%Y-%m-%d'))
-        self.metadata_vars["Report Month"].set(datetime.now().strftime('%B %Y'))
+        # Each open report is a ReportDocument in the workspace. The Tk variables below are shared by all
+        # of them and bound to the active one's ReportModel; switching reports only changes their values.
+        self.checklist_template = self._startup_template() # Compiled template shared by every open report
+        self.workspace = Workspace()
+        self.workspace.activate(self.workspace.add(ReportDocument(ReportModel.new(self.checklist_template))))
+        self.metadata_vars = {k: tk.StringVar(value=self.report.metadata[k]) for k in METADATA_FIELDS}
         self.checklist_data_vars = {}
-        self.near_miss_vars = {k: tk.StringVar() for k in ["Incident Date", "Incident Location", "Description", "Immediate Action", "Prevention Suggestion"]}
-        self.near_miss_attachments = [] # List of URL strings
+        self.near_miss_vars = {k: tk.StringVar(value=self.report.near_miss[k]) for k in NEAR_MISS_FIELDS}
         self.action_points_text_var = tk.StringVar() # Variable for ActionPointsFrame content
-        self.general_attachments = [] # List of URL strings
         self.status_var = tk.StringVar() # Defined HERE
-
-        # --- Define CTkFonts ---
-        self.header_font = ctk.CTkFont(family=HEADER_FONT_FAMILY, size=HEADER_FONT_SIZE, weight="bold")
-        self.section_header_font = ctk.CTkFont(family=BODY_FONT_FAMILY, size=BODY_FONT_SIZE_LARGE, weight="bold")
-        self.question_font = ctk.CTkFont(family=BODY_FONT_FAMILY, size=BODY_FONT_SIZE_MEDIUM, weight="bold")
-        self.answer_font = ctk.CTkFont(family=BODY_FONT_FAMILY, size=BODY_FONT_SIZE_SMALL)
-        self.button_font = ctk.CTkFont(family=BODY_FONT_FAMILY, size=BODY_FONT_SIZE_SMALL, weight='bold')
-        self.metadata_label_font = ctk.CTkFont(family=BODY_FONT_FAMILY, size=BODY_FONT_SIZE_SMALL, weight='bold')
-        self.metadata_entry_font = ctk.CTkFont(family=BODY_FONT_FAMILY, size=BODY_FONT_SIZE_SMALL)
-        self.tab_font = ctk.CTkFont(family=BODY_FONT_FAMILY, size=BODY_FONT_SIZE_SMALL + 1, weight='bold')
-        self.status_font = ctk.CTkFont(family=BODY_FONT_FAMILY, size=STATUS_FONT_SIZE)
+        self.link_checker = None # Created by get_link_checker()
+        self._export_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="export") # Excel and PDF can run side by side
+        self._background_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="background") # Scoring, indexing, link checks: never queue behind an export
+        self._export_jobs = [] # Running ExportJob objects, polled from the main thread
+        self._export_polling = False
+        self._bulk_update = False # True while model values are copied into the variables (load, clear); see _bulk_var_update
+        self._report_store = None # SQLite store, opened on first use when WAREHOUSE_REPORT_DB is set
+        self._open_on_start = list(open_paths) # Project files from the command line, opened once the checklist is built
+        self._bind_model_vars()
+
+        # --- Fonts, colors and widget options (shared by all frames) ---
+        with span("startup: fonts"):
+            self.styles = StyleRegistry()
+            for name, font in self.styles.fonts.items(): setattr(self, name, font) # self.header_font, self.answer_font, ...
+        self.appearance_var = tk.StringVar(value=ctk.get_appearance_mode())
 
         # --- Initialize UI ---
         self._create_menu()
         self._create_widgets()
         self._initialize_checklist_vars()
-        self.after(150, self._initial_checklist_build) # Build checklist after window geometry is stable
+        # The window shell is shown as soon as mainloop starts; the checklist is built when its tab first
+        # gets its real size (<Configure>), not after a guessed delay. The timer only covers windows that
+        # never get a <Configure> (e.g. started withdrawn).
+        self._shell_ready_at = time.perf_counter()
+        self._checklist_build_started = False
+        self.tabview.tab("Checklist Items").bind("<Configure>", self._on_checklist_tab_configure, add="+")
+        self.after(CHECKLIST_BUILD_FALLBACK_MS, self._on_checklist_tab_configure)
 
         self.protocol("WM_DELETE_WINDOW", self.on_closing) # Handle window close button
         self.update_title()
         self.status_var.set("Ready") # Set initial status message
+        self.after_idle(self._offer_journal_recovery) # Unsaved edits left by a crash of the previous session
+        self.after(AUTOSAVE_INTERVAL_MS, self._autosave_tick)
+        if PROFILER.enabled: self.after(500, self._poll_profile_readout)
 
         # --- Check Dependencies ---
         if not OPENPYXL_AVAILABLE: messagebox.showwarning("Missing Library", "Excel export disabled. Install 'openpyxl' using:\npip install openpyxl")
         if not REPORTLAB_AVAILABLE: messagebox.showwarning("Missing Library", "PDF export disabled. Install 'reportlab' using:\npip install reportlab")
 
+    def _on_checklist_tab_configure(self, event=None):
+        """First <Configure> of the checklist tab with a real size: builds the checklist (once)."""
+        if self._checklist_build_started or (event is not None and event.width <= 1): return
+        self._checklist_build_started = True
+        record_span("startup: window shell to sized checklist tab", self._shell_ready_at, time.perf_counter())
+        self._initial_checklist_build()
+
     def _initial_checklist_build(self):
-        """Ensures checklist is built after window geometry is stable to get correct sizes."""
+        """Builds the first checklist section now and the others in short steps (see ChecklistFrame.build_checklist_ui)."""
         try:
-            self.update_idletasks() # Ensure window size is calculated
-            if hasattr(self, 'checklist_frame'):
-                self.checklist_frame.rebuild_checklist_ui()
+            self.checklist_frame.build_checklist_ui(on_complete=self._on_checklist_built)
+            self.update_idletasks() # Paint the first section before the remaining build steps run
         except Exception as e:
             print(f"Error during initial checklist build: {e}") # Log error
             messagebox.showerror("UI Error", "Critical error: Could not build the checklist view.")
-
+        # Window is usable now (time-to-interactive): the first section can be answered
+        self.startup_seconds = time.perf_counter() - _PROCESS_START
+        record_span("startup: launch to usable window", _PROCESS_START, _PROCESS_START + self.startup_seconds)
+
+    def _on_checklist_built(self):
+        """All sections exist: load the export libraries off the main thread (not earlier, to keep the build smooth)."""
+        record_span("startup: launch to all sections built", _PROCESS_START, time.perf_counter())
+        threading.Thread(target=prewarm_exporters, name="export-prewarm", daemon=True).start()
+        open_paths, self._open_on_start = self._open_on_start, []
+        for path in open_paths: self.load_project(path)
+
+    def _poll_profile_readout(self):
+        """Shows the duration of the last timed operation (spans may end in worker threads, so this polls)."""
+        if PROFILER.last is not None:
+            name, seconds = PROFILER.last
+            _set_if_changed(self.profile_var, f"{name}: {seconds * 1000:.0f} ms")
+        self.after(500, self._poll_profile_readout)
+
+    @timed("startup: _create_menu")
     def _create_menu(self):
         """Creates the top menu bar (File, Help)."""
         menubar = tk.Menu(self)
@@ -125,9 +276,17 @@ class WarehouseSafetyApp(ctk.CTk):
         file_menu = tk.Menu(menubar, tearoff=0)
         menubar.add_cascade(label="File", menu=file_menu)
         file_menu.add_command(label="New Checklist", command=self.new_checklist, accelerator="Ctrl+N")
-        file_menu.add_command(label="Open Project (.json)...", command=self.load_project, accelerator="Ctrl+O")
+        file_menu.add_command(label="Open Project (.json/.wsc)...", command=self.load_project, accelerator="Ctrl+O")
         file_menu.add_command(label="Save Project", command=self.save_project, accelerator="Ctrl+S")
-        file_menu.add_command(label="Save Project As... (.json)", command=self.save_project_as, accelerator="Ctrl+Shift+S")
+        file_menu.add_command(label="Save Project As... (.json/.wsc)", command=self.save_project_as, accelerator="Ctrl+Shift+S")
+        file_menu.add_command(label="Close Report", command=self.close_document, accelerator="Ctrl+W")
+        file_menu.add_separator()
+
+        # --- Checklist Template Submenu ---
+        template_menu = tk.Menu(file_menu, tearoff=0)
+        file_menu.add_cascade(label="Checklist Template", menu=template_menu)
+        template_menu.add_command(label="Open Template (.json/.yaml)...", command=self.choose_checklist_template)
+        template_menu.add_command(label="Use Built-in Checklist", command=self.use_builtin_template)
         file_menu.add_separator()
 
         # --- Export Submenu ---
@@ -137,10 +296,28 @@ class WarehouseSafetyApp(ctk.CTk):
         ex_state_pdf = tk.NORMAL if REPORTLAB_AVAILABLE else tk.DISABLED
         export_menu.add_command(label="Excel (.xlsx)...", command=lambda: self.export_data('excel'), state=ex_state_excel)
         export_menu.add_command(label="PDF (.pdf)...", command=lambda: self.export_data('pdf'), state=ex_state_pdf)
+        export_menu.add_separator()
+        export_menu.add_command(label="Cancel Running Exports", command=self.cancel_exports)
 
         file_menu.add_separator()
         file_menu.add_command(label="Exit", command=self.on_closing)
 
+        # --- Reports Menu ---
+        reports_menu = tk.Menu(menubar, tearoff=0)
+        menubar.add_cascade(label="Reports", menu=reports_menu)
+        reports_menu.add_command(label="Compliance Dashboard...", command=self.open_compliance_dashboard)
+        reports_menu.add_command(label="Search Reports...", command=self.open_search)
+
+        # --- View Menu ---
+        view_menu = tk.Menu(menubar, tearoff=0)
+        menubar.add_cascade(label="View", menu=view_menu)
+        for mode in APPEARANCE_MODES:
+            view_menu.add_radiobutton(label=f"{mode} Theme", value=mode, variable=self.appearance_var,
+                                      command=lambda m=mode: self.styles.set_appearance(m))
+        view_menu.add_separator()
+        view_menu.add_command(label="Next Report", command=self.show_next_document, accelerator="Ctrl+Tab")
+        view_menu.add_command(label="Previous Report", command=lambda: self.show_next_document(-1), accelerator="Ctrl+Shift+Tab")
+
         # --- Help Menu ---
         help_menu = tk.Menu(menubar, tearoff=0)
         menubar.add_cascade(label="Help", menu=help_menu)
@@ -151,22 +328,39 @@ class WarehouseSafetyApp(ctk.CTk):
         self.bind_all("<Control-o>", lambda event: self.load_project())
         self.bind_all("<Control-s>", lambda event: self.save_project())
         self.bind_all("<Control-Shift-s>", lambda event: self.save_project_as())
+        self.bind_all("<Control-w>", lambda event: self.close_document())
+        self.bind_all("<Control-Tab>", lambda event: self.show_next_document())
+        self.bind_all("<Control-Shift-Tab>", lambda event: self.show_next_document(-1))
 
+    @timed("startup: _create_widgets")
     def _create_widgets(self):
         """Creates and grids all the main widgets in the window."""
         # Configure main window grid
-        self.grid_rowconfigure(2, weight=1) # Tabview row expands vertically
+        self.grid_rowconfigure(3, weight=1) # Tabview row expands vertically
         self.grid_columnconfigure(0, weight=1) # Allow content to expand horizontally
 
         # 1. Header Label
         header_label = ctk.CTkLabel(self, text="Warehouse Safety Compliance Checklist",
-                                    font=self.header_font, text_color=SECONDARY_COLOR, anchor="center")
+                                    font=self.header_font, text_color=self.styles.colors["secondary"], anchor="center")
         header_label.grid(row=0, column=0, pady=(15, 20), padx=20, sticky="ew")
 
-        # 2. Metadata Frame
+        # 2. Open Reports Bar (one tab per open report, shown while more than one is open)
+        colors = self.styles.colors
+        self.document_bar = ctk.CTkScrollableFrame(self, orientation="horizontal", height=34, fg_color=colors["background"],
+                                                   scrollbar_button_color=colors["tab_hover"], scrollbar_button_hover_color=colors["accent"])
+        self.document_tabs = ctk.CTkSegmentedButton(self.document_bar, values=[], command=self._on_document_tab, font=self.tab_font,
+                                                    text_color=colors["secondary"], selected_color=colors["primary"],
+                                                    selected_hover_color=colors["accent"], unselected_color=colors["background"],
+                                                    unselected_hover_color=colors["tab_hover"])
+        self.document_tabs.pack(side=tk.LEFT)
+        self.document_bar.grid(row=1, column=0, sticky="ew", padx=20, pady=(0, 10))
+        self.document_bar.grid_remove()
+        self._document_labels = {} # Tab label -> ReportDocument, in tab order
+
+        # 3. Metadata Frame
         metadata_frame = ctk.CTkFrame(self, corner_radius=6, border_width=1,
-                                      border_color=SECONDARY_COLOR, fg_color=BACKGROUND_COLOR)
-        metadata_frame.grid(row=1, column=0, sticky="ew", padx=20, pady=(0, 20))
+                                      border_color=colors["secondary"], fg_color=colors["background"])
+        metadata_frame.grid(row=2, column=0, sticky="ew", padx=20, pady=(0, 20))
         # Configure internal columns for alignment
         metadata_frame.columnconfigure((1, 4), weight=1, minsize=180) # Entry columns expand
         metadata_frame.columnconfigure(2, weight=0, minsize=40) # Space between columns
@@ -175,16 +369,16 @@ class WarehouseSafetyApp(ctk.CTk):
         row_num = 0
         col_num = 0
         for i, field in enumerate(fields):
-            label = ctk.CTkLabel(metadata_frame, text=f"{field}:", font=self.metadata_label_font, anchor="w", text_color=SECONDARY_COLOR)
+            label = ctk.CTkLabel(metadata_frame, text=f"{field}:", font=self.metadata_label_font, anchor="w", text_color=colors["secondary"])
             label.grid(row=row_num, column=col_num, sticky="w", padx=(15, 5), pady=7)
 
             if field == "Uploaded By Role":
                  widget = ctk.CTkComboBox(metadata_frame, variable=self.metadata_vars[field],
                                           values=["Safety Champion", "Manager", "Other"], state="readonly",
                                           font=self.metadata_entry_font, width=150,
-                                          button_color=PRIMARY_COLOR, border_width=1, border_color=PRIMARY_COLOR, # Branding
-                                          dropdown_font=self.metadata_entry_font, dropdown_fg_color=BACKGROUND_COLOR,
-                                          dropdown_hover_color=ACCENT_COLOR)
+                                          button_color=colors["primary"], border_width=1, border_color=colors["primary"], # Branding
+                                          dropdown_font=self.metadata_entry_font, dropdown_fg_color=colors["background"],
+                                          dropdown_hover_color=colors["accent"])
             else:
                 # Use standard entry appearance
                 widget = ctk.CTkEntry(metadata_frame, textvariable=self.metadata_vars[field],
@@ -199,31 +393,32 @@ class WarehouseSafetyApp(ctk.CTk):
                 col_num = 0 # Move back to the first label column
                 row_num += 1 # Move to the next row
 
-        # 3. Tabview
+        # 4. Tabview
         self.tabview = ctk.CTkTabview(self, corner_radius=6, border_width=1,
-                                      border_color=PRIMARY_COLOR,
-                                      segmented_button_selected_color=PRIMARY_COLOR,
-                                      segmented_button_selected_hover_color=ACCENT_COLOR,
-                                      segmented_button_unselected_color=BACKGROUND_COLOR,
-                                      segmented_button_unselected_hover_color="#E0E0E0",
+                                      border_color=colors["primary"],
+                                      segmented_button_selected_color=colors["primary"],
+                                      segmented_button_selected_hover_color=colors["accent"],
+                                      segmented_button_unselected_color=colors["background"],
+                                      segmented_button_unselected_hover_color=colors["tab_hover"],
                                       text_color_disabled="gray60",
-                                      fg_color=BACKGROUND_COLOR)
+                                      fg_color=colors["background"],
+                                      command=self._on_tab_change)
         # Explicitly set text colors for selected/unselected tabs
         self.tabview._segmented_button.configure(font=self.tab_font,
-                                                 text_color=SECONDARY_COLOR, # Unselected text
-                                                 selected_color=PRIMARY_COLOR, # Selected BG
-                                                 selected_hover_color=ACCENT_COLOR,
-                                                 unselected_color=BACKGROUND_COLOR,
-                                                 unselected_hover_color="#E0E0E0")
+                                                 text_color=colors["secondary"], # Unselected text
+                                                 selected_color=colors["primary"], # Selected BG
+                                                 selected_hover_color=colors["accent"],
+                                                 unselected_color=colors["background"],
+                                                 unselected_hover_color=colors["tab_hover"])
 
-        self.tabview.grid(row=2, column=0, sticky="nsew", pady=(0,10), padx=20)
+        self.tabview.grid(row=3, column=0, sticky="nsew", pady=(0,10), padx=20)
 
         # Add tabs and configure their frames
         tab_names = ["Checklist Items", "Near Miss Report", "Action Points", "General Links"]
         for name in tab_names:
             self.tabview.add(name)
             tab_frame = self.tabview.tab(name)
-            tab_frame.configure(fg_color=BACKGROUND_COLOR) # Ensure content area is white
+            tab_frame.configure(fg_color=colors["background"]) # Ensure content area matches the window
             tab_frame.grid_rowconfigure(0, weight=1)
             tab_frame.grid_columnconfigure(0, weight=1)
 
@@ -244,107 +439,248 @@ class WarehouseSafetyApp(ctk.CTk):
         self.attachment_frame = LinkAttachmentFrame(self.tabview.tab("General Links"), self, self.general_attachments, "General Evidence Links (Checklist Items)")
         self.attachment_frame.grid(row=0, column=0, sticky="nsew", padx=5, pady=5)
 
-        # 4. Status Bar
-        status_bar_frame = ctk.CTkFrame(self, height=28, corner_radius=0, fg_color="#EAEAEA", border_width=0)
-        status_bar_frame.grid(row=3, column=0, sticky="ew", padx=0, pady=(10,0))
-        status_label = ctk.CTkLabel(status_bar_frame, textvariable=self.status_var, font=self.status_font, anchor="w", padx=15, text_color=TEXT_COLOR_LIGHT)
+        # 5. Status Bar
+        status_bar_frame = ctk.CTkFrame(self, height=28, corner_radius=0, fg_color=colors["status_bar"], border_width=0)
+        status_bar_frame.grid(row=4, column=0, sticky="ew", padx=0, pady=(10,0))
+        self.profile_var = tk.StringVar() # Last timed operation, shown while profiling (see profiling.py)
+        if PROFILER.enabled:
+            ctk.CTkLabel(status_bar_frame, textvariable=self.profile_var, font=self.status_font, anchor="e", padx=15,
+                         text_color=colors["text_light"]).pack(side=tk.RIGHT)
+        status_label = ctk.CTkLabel(status_bar_frame, textvariable=self.status_var, font=self.status_font, anchor="w", padx=15, text_color=colors["text_light"])
         status_label.pack(side=tk.LEFT, fill=tk.X, expand=True)
 
     # --- Data Handling Methods ---
+    def _bind_model_vars(self):
+        """Keeps the ReportModel in sync with metadata, near miss and action point variables."""
+        for k, var in self.metadata_vars.items():
+            var.trace_add("write", lambda *a, k=k, v=var: self._on_field_write("metadata", k, v.get()))
+        for k, var in self.near_miss_vars.items():
+            var.trace_add("write", lambda *a, k=k, v=var: self._on_field_write("near_miss", k, v.get()))
+        self.action_points_text_var.trace_add("write", lambda *a: self._on_field_write("action_points", None, self.action_points_text_var.get()))
+
+    def _on_field_write(self, section, key, value):
+        """Variable trace target: updates the model, marks the field dirty and journals the edit."""
+        if self._bulk_update: return # Value was copied from the model, not typed by the user
+        self.report.apply_change(section, key, value)
+        self._mark_dirty(section, key)
+        try:
+            self.journal.append(section, key, value)
+        except OSError as e:
+            print(f"Warning: could not write autosave journal: {e}") # Editing must keep working
+
+    # --- Change Tracking ---
+    @property
+    def is_dirty(self):
+        """True if there are edits that are not in the project file yet (O(1))."""
+        return bool(self._dirty_fields)
+
+    def _mark_dirty(self, section, key):
+        was_clean = not self._dirty_fields
+        self._dirty_fields.add((section, key))
+        if was_clean: self.update_title() # Only the clean -> dirty transition changes the title
+
+    def _mark_clean(self):
+        """Called after a save, load or reset: everything shown is what's on disk (or a fresh checklist)."""
+        self._dirty_fields.clear()
+        self.update_title()
+
+    def on_attachments_changed(self, is_near_miss):
+        """Called by the link frames after a link was added or removed."""
+        section = "near_miss_attachments" if is_near_miss else "general_attachments"
+        self._on_field_write(section, None, list(self.near_miss_attachments if is_near_miss else self.general_attachments))
+
+    @contextmanager
+    def _bulk_var_update(self):
+        """Batch for copying model values into the variables (load, clear, template switch).
+
+        Inside it the model/journal traces return at once and the textbox frames skip their per-write
+        refresh. When the outermost batch ends, each textbox is refreshed once.
+        """
+        outer, self._bulk_update = not self._bulk_update, True
+        try:
+            yield
+        finally:
+            if outer:
+                self._bulk_update = False
+                if hasattr(self, 'near_miss_frame'): self.near_miss_frame.refresh_from_vars()
+                if hasattr(self, 'action_points_frame'): self.action_points_frame.refresh_from_vars()
+
+    def _push_model_to_vars(self):
+        """Copies the ReportModel values into the bound Tkinter variables in one batch (widgets follow via their variables).
+
+        Only variables whose value differs are set, so unchanged fields fire no traces and redraw nothing.
+        """
+        with self._bulk_var_update():
+            for k, var in self.metadata_vars.items(): _set_if_changed(var, self.report.metadata[k])
+            for index, question in enumerate(self.report.template.questions):
+                var = self.checklist_data_vars.get(question.text)
+                if var is not None: _set_if_changed(var, self.report.answers[index])
+            for k, var in self.near_miss_vars.items(): _set_if_changed(var, self.report.near_miss[k])
+            _set_if_changed(self.action_points_text_var, self.report.action_points)
+
+    def _refresh_ui_from_model(self):
+        """Shows the whole ReportModel: variables in one batch, then each link list once (pointed at this report's lists)."""
+        self._push_model_to_vars()
+        if hasattr(self, 'near_miss_frame'): self.near_miss_frame.update_attachment_list(self.report.near_miss_attachments)
+        if hasattr(self, 'attachment_frame'): self.attachment_frame.update_link_list(self.report.general_attachments)
+
     def _initialize_checklist_vars(self):
-        """Creates or resets the Tkinter variables for checklist answers."""
-        self.checklist_data_vars.clear()
-        for _, questions in CHECKLIST_STRUCTURE:
-            for qt, at, _ in questions:
-                if at == "yes_no":
-                    self.checklist_data_vars[qt] = tk.StringVar(value="")
-                elif at == "text":
-                    self.checklist_data_vars[qt] = tk.StringVar()
+        """Creates the Tkinter variables for checklist answers once (bound to the model); later calls only reset values."""
+        with self._bulk_var_update():
+            for index, question in enumerate(self.report.template.questions):
+                var = self.checklist_data_vars.get(question.text)
+                if var is None:
+                    var = tk.StringVar(value=self.report.answers[index])
+                    var.trace_add("write", lambda *a, q=question.id, v=var: self._on_field_write("checklist", q, v.get()))
+                    self.checklist_data_vars[question.text] = var
+                else:
+                    _set_if_changed(var, self.report.answers[index])
+
+    # --- Autosave Journal ---
+    def _switch_journal(self, project_path, discard_current=False):
+        """Points the journal at another project file (None = untitled)."""
+        if discard_current: self.journal.clear()
+        else: self.journal.close()
+        self.journal = ProjectJournal(journal_path_for(project_path))
+
+    def _compact_journal(self):
+        """Folds pending journaled edits of every loaded report into its project file (atomic writes).
+
+        Returns the documents written. Raises OSError, or ProjectFileError for a damaged compact file.
+        """
+        written = []
+        for document in self.workspace.loaded_documents():
+            if not (document.path and document.journal.pending): continue
+            if document is self.workspace.active: self.get_all_data() # Commits textbox text, decodes deferred sections
+            if document.flush():
+                self._store_report(document.path, document.report)
+                written.append(document)
+        if written: self.update_title()
+        return written
+
+    def _replay_journal(self, records):
+        """Applies journal records to the model and refreshes the widgets (recovered edits count as unsaved)."""
+        self._load_deferred_sections()
+        for record in records:
+            self.report.apply_change(record.get("s"), record.get("k"), record.get("v"))
+        self.load_data(self.report.to_dict())
+        for record in records: self._mark_dirty(record.get("s"), record.get("k"))
+
+    def _offer_journal_recovery(self):
+        """At startup: offers to restore edits journaled for an unsaved checklist before a crash."""
+        records = self.journal.records()
+        if not records: return
+        if messagebox.askyesno("Recover Unsaved Checklist",
+                               f"An unsaved checklist from a previous session was found ({len(records)} recorded edits).\n\nRestore it?"):
+            self._replay_journal(records)
+            self.status_var.set("Unsaved checklist restored.")
+        else:
+            self.journal.clear()
+
+    def _autosave_tick(self):
+        """Periodically folds the journal into the project file (atomic write), then empties the journal."""
+        try:
+            written = self._compact_journal()
+            if written: self.status_var.set("Autosaved: " + ", ".join(document.name for document in written))
+        except (OSError, ProjectFileError) as e:
+            self.status_var.set(f"Autosave failed: {e}") # Journal is kept, so nothing is lost
+        finally:
+            self.after(AUTOSAVE_INTERVAL_MS, self._autosave_tick)
+
+    # --- Report Store (optional SQLite index of saved reports, see report_store.py) ---
+    def _store_report(self, file_path, report=None):
+        """Records a report (default: the active one) in the store if WAREHOUSE_REPORT_DB is set. Failures never affect saving."""
+        from report_store import STORE_ENV_VAR, ReportStore
+        db_path = os.environ.get(STORE_ENV_VAR)
+        if not db_path: return
+        if report is None:
+            self._load_deferred_sections() # The store keeps the whole report
+            report = self.report
+        try:
+            if self._report_store is None: self._report_store = ReportStore(db_path)
+            self._report_store.save_report(file_path, report)
+        except Exception as e:
+            print(f"Warning: could not update report store {db_path}: {e}") # The project file is what counts
+
+    # --- Checklist Templates ---
+    def _startup_template(self):
+        """Template named by the WAREHOUSE_CHECKLIST_TEMPLATE environment variable, else the built-in checklist."""
+        template_path = os.environ.get(TEMPLATE_ENV_VAR)
+        if template_path:
+            try:
+                return load_template(template_path)
+            except TemplateError as e:
+                print(f"Warning: using built-in checklist. {e}")
+        return BUILTIN_TEMPLATE
+
+    def choose_checklist_template(self):
+        """Lets the user pick a template file (JSON/YAML) and switches the checklist to it."""
+        file_path = filedialog.askopenfilename(
+            filetypes=[("Checklist Templates", "*.json *.yaml *.yml"), ("All Files", "*.*")],
+            title="Open Checklist Template", initialdir=os.getcwd()
+        )
+        if not file_path:
+            self.status_var.set("Template change cancelled.")
+            return
+        try:
+            self.set_template(load_template(file_path))
+        except TemplateError as e:
+            messagebox.showerror("Template Error", str(e))
+            self.status_var.set("Template not loaded.")
+
+    def use_builtin_template(self):
+        self.set_template(BUILTIN_TEMPLATE)
+
+    def set_template(self, template):
+        """Switches the checklist to a compiled template, keeping answers whose question id/text still exists.
+
+        All open reports share the checklist widgets, so every loaded report switches; unloaded ones are
+        read with the new template when they are shown again.
+        """
+        self.checklist_template = template
+        for document in self.workspace.loaded_documents(): document.report.set_template(template)
+        self.checklist_data_vars.clear() # Old variables are bound to old question indexes
+        self._initialize_checklist_vars()
+        if hasattr(self, 'checklist_frame'): self.checklist_frame.rebuild_checklist_ui()
+        self.status_var.set(f"Checklist template: {template.name} ({len(template)} questions)")
 
     def _clear_all_fields(self):
         """Clears all input fields and data structures."""
         try:
-            # Clear Metadata (resetting defaults)
-            for k, var in self.metadata_vars.items(): var.set("")
-            self.metadata_vars["Report Date"].set(datetime.now().strftime('%Y-%m-%d'))
-            self.metadata_vars["Report Month"].set(datetime.now().strftime('%B %Y'))
-            # Clear Checklist Vars and UI
-            self._initialize_checklist_vars()
-            if hasattr(self, 'checklist_frame'): self.checklist_frame.rebuild_checklist_ui() # Rebuild UI to reflect cleared vars
-            # Clear Near Miss Vars and UI
-            for var in self.near_miss_vars.values(): var.set("")
-            self.near_miss_attachments.clear()
-            if hasattr(self, 'near_miss_frame'): self.near_miss_frame.update_attachment_list()
-             # Clear Action Points Var and UI
-            self.action_points_text_var.set("") # Var used by ActionPointsFrame trace
-            if hasattr(self, 'action_points_frame'): self.action_points_frame.clear_text()
-            # Clear General Links and UI
-            self.general_attachments.clear()
-            if hasattr(self, 'attachment_frame'): self.attachment_frame.update_link_list()
+            # Reset the model (metadata defaults, answers, near miss, links), then the bound variables.
+            # Checklist widgets are kept and follow their variables, so no rebuild is needed.
+            self._deferred_project = None
+            self.report.reset()
+            self._refresh_ui_from_model()
         except Exception as e:
             print(f"Error during field clearing: {e}")
             messagebox.showerror("Error", "Could not fully clear all fields.")
 
+    def _sync_pending_edits(self):
+        """Commits textbox text that is normally only written to its variable on focus-out.
+
+        Goes through the variables, so the usual trace marks the field dirty and journals it.
+        """
+        try:
+            if hasattr(self, 'action_points_frame'): self.action_points_frame._update_variable()
+            if hasattr(self, 'near_miss_frame'): self.near_miss_frame.commit_textboxes()
+        except Exception as e:
+            print(f"Error committing textbox text: {e}")
+
     def get_all_data(self):
         """Collects all data into a dictionary for saving/exporting."""
-        action_points_text = ""
-        if hasattr(self, 'action_points_frame'):
-             try:
-                 action_points_text = self.action_points_frame.get_text()
-             except Exception as e:
-                 print(f"Error getting text from ActionPointsFrame: {e}")
-
-        data = {
-            "metadata": {k: v.get() for k, v in self.metadata_vars.items()},
-            "checklist": {k: v.get() for k, v in self.checklist_data_vars.items()},
-            "near_miss": {
-                "details": {k: v.get() for k, v in self.near_miss_vars.items()},
-                "attachments": self.near_miss_attachments # URLs stored directly
-            },
-            "action_points": action_points_text,
-            "general_attachments": self.general_attachments # URLs stored directly
-        }
-        return data
+        self._load_deferred_sections()
+        self._sync_pending_edits()
+        return self.report.to_dict()
 
     def load_data(self, data):
         """Populates UI elements from a loaded data dictionary."""
         # Wrapped in try-except for robustness against malformed save files
         try:
             self.status_var.set("Loading data...")
-            # Load Metadata
-            loaded_meta = data.get("metadata", {})
-            for k, v in loaded_meta.items():
-                if k in self.metadata_vars:
-                    self.metadata_vars[k].set(v)
-
-            # Load Checklist (assign directly to variables)
-            loaded_checklist = data.get("checklist", {})
-            for q, a in loaded_checklist.items():
-                if q in self.checklist_data_vars:
-                    self.checklist_data_vars[q].set(a)
-
-            # Load Near Miss Details
-            loaded_near_miss = data.get("near_miss", {})
-            nm_details = loaded_near_miss.get("details", {})
-            for k, v in nm_details.items():
-                if k in self.near_miss_vars:
-                    self.near_miss_vars[k].set(v)
-
-            # Load Near Miss Attachments (URLs)
-            self.near_miss_attachments.clear()
-            self.near_miss_attachments.extend(loaded_near_miss.get("attachments", []))
-            if hasattr(self, 'near_miss_frame'):
-                self.near_miss_frame.update_attachment_list() # Update UI list
-
-            # Load Action Points
-            action_points_text = data.get("action_points", "")
-            self.action_points_text_var.set(action_points_text) # Set var (trace updates widget)
-
-            # Load General Attachments (URLs)
-            self.general_attachments.clear()
-            self.general_attachments.extend(data.get("general_attachments", []))
-            if hasattr(self, 'attachment_frame'):
-                self.attachment_frame.update_link_list() # Update UI list
+            self._deferred_project = None
+            self.report.update_from_dict(data) # Model first (every field is replaced), then the widgets once
+            self._refresh_ui_from_model()
 
             self.status_var.set("Data loaded successfully.")
 
@@ -352,27 +688,38 @@ class WarehouseSafetyApp(ctk.CTk):
             messagebox.showerror("Load Error", f"Failed loading data from file: {e}\n\nData might be incomplete or the file could be corrupted.")
             self.status_var.set("Error during data load.")
 
+    def _load_deferred_sections(self):
+        """Decodes the near miss, action point and link sections of a compact project opened lazily."""
+        project, self._deferred_project = self._deferred_project, None
+        if project is None: return
+        try:
+            project.load_sections_into(self.report)
+        except ProjectFileError as e:
+            messagebox.showerror("Load Error", f"Part of the project could not be read:\n{e}")
+        self._refresh_ui_from_model()
+
+    def _on_tab_change(self):
+        if self.tabview.get() != "Checklist Items": self._load_deferred_sections()
+
     # --- File Operations ---
     def new_checklist(self):
-        """Starts a new checklist, prompting if unsaved changes exist."""
-        current_data = self.get_all_data() # Get current state
-        # Check if significant data exists beyond defaults
-        has_data = any(v for k,v in current_data['metadata'].items() if k not in ["Report Date", "Report Month"]) or \
-                   any(current_data['checklist'].values()) or \
-                   any(current_data['near_miss']['details'].values()) or \
-                   current_data['near_miss']['attachments'] or \
-                   current_data['action_points'] or \
-                   current_data['general_attachments']
-
-        if self.project_file_path or has_data: # Check path OR existing data
-             if not messagebox.askyesno("Confirm New", "Discard current unsaved changes and start a new checklist?", icon='warning'):
+        """Shows a new checklist; open reports stay open. Prompts if the untitled checklist has unsaved changes.
+
+        There is at most one untitled checklist (it owns the untitled autosave journal), so it is reused.
+        """
+        self._sync_pending_edits()
+        document = self.workspace.untitled()
+        if document is not None and document.is_dirty:
+             if not messagebox.askyesno("Confirm New", "Discard the current unsaved checklist and start a new one?", icon='warning'):
                  return # User cancelled
 
         self.status_var.set("Creating new checklist...")
         try:
+            if document is None: document = self.workspace.add(ReportDocument(ReportModel.new(self.checklist_template)))
+            self.switch_document(document)
             self._clear_all_fields() # Clear all data and UI elements
-            self.project_file_path = None # Reset project path
-            self.update_title()
+            document.journal.clear() # User chose to discard unsaved edits
+            self._mark_clean() # Also updates the title
             if hasattr(self, 'tabview'): self.tabview.set("Checklist Items") # Go to first tab
             self.status_var.set("New checklist ready.")
         except Exception as e:
@@ -381,8 +728,11 @@ class WarehouseSafetyApp(ctk.CTk):
 
     def save_project(self):
         """Saves to current file or calls Save As if no file path exists."""
+        self._sync_pending_edits()
         if not self.project_file_path:
              self.save_project_as() # Prompts for name if not saved before
+        elif not self.is_dirty:
+            self.status_var.set(f"No changes to save: {os.path.basename(self.project_file_path)}")
         elif self.project_file_path: # Ensure path is actually set
             try:
                 self._write_project_file(self.project_file_path)
@@ -394,12 +744,10 @@ class WarehouseSafetyApp(ctk.CTk):
         """Prompts user for filename and saves the project."""
         file_path = None # Initialize
         try:
-            wh_name = self.metadata_vars["Warehouse Name"].get().replace(" ", "_") or "UnknownWH"
-            rep_date = self.metadata_vars["Report Date"].get() or datetime.now().strftime('%Y%m%d')
-            initial_file = f"SafetyChecklist_{wh_name}_{rep_date}.json"
+            initial_file = report_file_stem(self.report.metadata, "SafetyChecklist") + ".json"
             file_path = filedialog.asksaveasfilename(
                 defaultextension=".json",
-                filetypes=[("Checklist Project Files", "*.json"), ("All Files", "*.*")],
+                filetypes=[("Checklist Project Files", "*.json"), ("Compact Project Files", f"*{COMPACT_EXTENSION}"), ("All Files", "*.*")],
                 title="Save Project As",
                 initialfile=initial_file,
                 initialdir=os.path.dirname(self.project_file_path) if self.project_file_path else os.getcwd()
@@ -408,9 +756,16 @@ class WarehouseSafetyApp(ctk.CTk):
                 self.status_var.set("Save cancelled.")
                 return
 
+            other = self.workspace.find(file_path)
+            if other is not None and other is not self.workspace.active:
+                messagebox.showerror("Save Error", f"{os.path.basename(file_path)} is open in another report tab.\n\nClose it first or choose another name.")
+                self.status_var.set("Save cancelled.")
+                return
+
             # If user provided path, attempt to save
             self.project_file_path = file_path # Set path *before* writing
             self._write_project_file(file_path) # This might raise an error
+            self._switch_journal(file_path, discard_current=True) # Journaled edits are now in the new file
             self.update_title() # Update title only if save was successful
 
         except Exception as e: # Catch errors from _write_project_file specifically
@@ -420,13 +775,16 @@ class WarehouseSafetyApp(ctk.CTk):
              # If _write_project_file fails on an existing path, it resets it itself
              self.update_title()
 
+    @timed("save_project")
     def _write_project_file(self, file_path):
         """Helper: Writes the current data dictionary to a JSON file."""
         self.status_var.set(f"Saving: {os.path.basename(file_path)}...")
         data_to_save = self.get_all_data() # Get data just before writing
         try:
-            with open(file_path, 'w', encoding='utf-8') as f:
-                json.dump(data_to_save, f, indent=4, ensure_ascii=False)
+            write_project_file(file_path, data_to_save, self.report.template) # Atomic: temp file + os.replace; .wsc = compact
+            if self.journal.path == journal_path_for(file_path): self.journal.clear() # Edits are now in the file
+            self._mark_clean()
+            self._store_report(file_path)
             self.status_var.set(f"Saved: {os.path.basename(file_path)}")
         except IOError as e:
             messagebox.showerror("File Write Error", f"Could not write to file:\n{file_path}\n\nError: {e}\n\nCheck permissions or disk space.")
@@ -441,390 +799,338 @@ class WarehouseSafetyApp(ctk.CTk):
             self.update_title()
             raise # Re-raise other errors
 
-    def load_project(self):
-        """Loads project data from a JSON file."""
-        file_path = None
+    def load_project(self, file_path=None):
+        """Opens a project file in its own report tab (asks for the file unless `file_path` is given).
+
+        Reports already open stay open; a file that is open already is just shown.
+        """
+        self._sync_pending_edits()
         try:
-            file_path = filedialog.askopenfilename(
-                filetypes=[("Checklist Project Files", "*.json"), ("All Files", "*.*")],
+            file_path = file_path or filedialog.askopenfilename(
+                filetypes=[("Checklist Project Files", f"*.json *{COMPACT_EXTENSION}"), ("All Files", "*.*")],
                 title="Open Project",
                 initialdir=os.path.dirname(self.project_file_path) if self.project_file_path else os.getcwd()
             )
             if not file_path:
                 self.status_var.set("Open cancelled.")
                 return
+            open_document = self.workspace.find(file_path)
+            if open_document is not None:
+                if self.switch_document(open_document): self.status_var.set(f"Already open: {os.path.basename(file_path)}")
+                return
 
             self.status_var.set(f"Loading: {os.path.basename(file_path)}...")
-            with open(file_path, 'r', encoding='utf-8') as f:
-                loaded_data = json.load(f)
-
-            self._clear_all_fields() # Clear before loading new data
-            self.load_data(loaded_data) # Populate UI
-
-            self.project_file_path = file_path # Update path only on successful load
+            load_started = time.perf_counter() # Timed from here: the file dialog is not part of loading
+            template = self.checklist_template
+            report, project, warnings = self._read_report_file(file_path, template)
+
+            # Edits journaled for this file but never saved (e.g. after a crash) can be replayed on top
+            pending = ProjectJournal(journal_path_for(file_path)).records()
+            recovered = bool(pending) and messagebox.askyesno("Recover Unsaved Changes",
+                                                              f"{len(pending)} unsaved edits to this project were found from a previous session.\n\nApply them?")
+            if recovered:
+                if project is not None: report, project = project.to_report(template), None # Recovery needs the whole report
+                for record in pending: report.apply_change(record.get("s"), record.get("k"), record.get("v"))
+            elif pending:
+                ProjectJournal(journal_path_for(file_path)).clear()
+
+            # An untouched new checklist makes way for the opened report instead of staying open as a tab
+            replaced = self.workspace.active
+            if replaced.path or replaced.is_dirty or replaced.report.has_content(): replaced = None
+            if hasattr(self, 'tabview'): self.tabview.set("Checklist Items") # Go to first tab (near miss/links of compact files stay deferred)
+            document = self.workspace.add(ReportDocument(report, file_path, project)) # Near miss, action points and links of compact files are decoded when first needed
+            self._show_document(document)
+            if replaced is not None: self.workspace.close(replaced)
+            if recovered: # Recovered edits are not in the file yet: next autosave writes them
+                self.journal.pending = len(pending)
+                for record in pending: self._mark_dirty(record.get("s"), record.get("k"))
             self.update_title()
-            if hasattr(self, 'tabview'): self.tabview.set("Checklist Items") # Go to first tab
-            self.status_var.set(f"Loaded: {os.path.basename(file_path)}")
+            note = f" ({len(warnings)} warnings, e.g. {warnings[0]})" if warnings else ""
+            self.status_var.set(f"Loaded: {os.path.basename(file_path)}{note}")
+            record_span("load_project", load_started, time.perf_counter(), file=os.path.basename(file_path), compact=project is not None)
 
         except FileNotFoundError:
             messagebox.showerror("Load Error", f"File not found:\n{file_path or '?'}")
             self.status_var.set("Error: File not found.")
-        except json.JSONDecodeError:
-             messagebox.showerror("Load Error", f"Invalid project file format or corrupted file:\n{file_path or '?'}")
+        except ProjectValidationError as e: # Every structural problem at once, with its JSON path
+             listed = "\n".join(f"- {p}" for p in e.problems[:15])
+             if len(e.problems) > 15: listed += f"\n... and {len(e.problems) - 15} more"
+             messagebox.showerror("Load Error", f"{os.path.basename(file_path)} is not a valid project file:\n\n{listed}")
+             self.status_var.set("Error: Invalid project file.")
+        except ProjectFileError as e:
+             messagebox.showerror("Load Error", str(e))
              self.status_var.set("Error: Invalid project file.")
         except Exception as e:
              messagebox.showerror("Load Error", f"An unexpected error occurred loading project:\n{e}")
              self.status_var.set("Load error.")
-             self.project_file_path = None # Reset path on generic load error
              self.update_title()
 
+    def _read_report_file(self, file_path, template):
+        """Reads and validates a project file. Returns (report, deferred CompactProject or None, warnings).
+
+        Of a compact file only the header (metadata and answers) is decoded. Raises ProjectFileError.
+        """
+        if is_compact_file(file_path):
+            project = CompactProject.open(file_path)
+            report = ReportModel(template)
+            project.load_header_into(report) # Fails early if the file's template is unavailable
+            return report, project, []
+        loaded_data = read_project_file(file_path) # Errors name the line/column of broken JSON
+        report, errors, warnings = load_project_data(loaded_data, template)
+        if errors: raise ProjectValidationError(os.path.basename(file_path), errors)
+        for warning in warnings: print(f"{os.path.basename(file_path)}: {warning}")
+        return report, None, warnings
+
+    # --- Open Reports (see workspace.py) ---
+    def switch_document(self, document):
+        """Shows another open report. Returns False if it could not be shown."""
+        if document is self.workspace.active: return True
+        self._sync_pending_edits() # Textbox text still belongs to the report being left
+        return self._show_document(document)
+
+    def _show_document(self, document):
+        """Makes a document the active one and shows its values in the existing widgets (nothing is rebuilt)."""
+        if not document.loaded and not self._reload_document(document): return False
+        self.workspace.activate(document)
+        self._refresh_ui_from_model()
+        if hasattr(self, 'tabview'): self._on_tab_change() # Deferred sections are decoded off the checklist tab
+        self._unload_least_recent()
+        self.update_title()
+        return True
+
+    def _reload_document(self, document):
+        """Reads an unloaded report from its project file again. If that fails, the report is closed."""
+        try:
+            with span("reload_project", file=document.name):
+                document.report, document.deferred, _ = self._read_report_file(document.path, self.checklist_template)
+            return True
+        except (OSError, ProjectFileError) as e:
+            messagebox.showerror("Load Error", f"{document.name} could not be read again and was closed:\n{e}")
+            self.workspace.close(document)
+            if self.workspace.active is not None: self.update_title() # Also drops its tab
+            return False
+
+    def _unload_least_recent(self):
+        """Keeps at most workspace.max_loaded reports in memory; edits of an unloaded report are saved first."""
+        for document in self.workspace.over_limit():
+            try:
+                if document.flush(): self._store_report(document.path, document.report)
+            except (OSError, ProjectFileError) as e:
+                print(f"Warning: keeping {document.name} in memory, its edits could not be saved ({e})")
+                continue
+            self.workspace.unload(document)
+
+    def show_next_document(self, step=1):
+        """Shows the next (step=1) or previous (step=-1) open report."""
+        documents = self.workspace.documents
+        if len(documents) > 1:
+            self.switch_document(documents[(documents.index(self.workspace.active) + step) % len(documents)])
+
+    def close_document(self, document=None):
+        """Closes a report tab (default: the active one), asking to save unsaved changes."""
+        document = document or self.workspace.active
+        if not self.switch_document(document): return
+        self._sync_pending_edits()
+        if self.is_dirty:
+            answer = messagebox.askyesnocancel("Unsaved Changes", f"Save changes to {document.name} before closing it?", icon='warning')
+            if answer is None: return # Cancel: keep it open
+            if answer:
+                self.save_project()
+                if self.is_dirty: return # Save was cancelled or failed
+            else:
+                document.journal.clear() # User chose not to keep the edits
+        next_document = self.workspace.close(document)
+        while next_document is not None and not self._show_document(next_document):
+            next_document = self.workspace.documents[-1] if self.workspace.documents else None
+        if next_document is None: # Last report closed: show a new checklist
+            self._show_document(self.workspace.add(ReportDocument(ReportModel.new(self.checklist_template))))
+        self.status_var.set(f"Closed: {document.name}")
+
+    def _on_document_tab(self, label):
+        document = self._document_labels.get(label)
+        if document is not None and not self.switch_document(document):
+            self.update_title() # Selects the active report's tab again
+
     # --- Export ---
     def validate_for_export(self):
         """Checks if required metadata fields are filled."""
-        required_meta = ["Warehouse Name", "Location", "Uploaded By Name", "Uploaded By Role"]
-        missing = [f for f in required_meta if not self.metadata_vars[f].get()]
+        missing = [f for f in REQUIRED_METADATA if not self.metadata_vars[f].get()]
         if missing:
              messagebox.showerror("Missing Information", "Please fill required fields before exporting:\n- " + "\n- ".join(missing))
              return False
         return True
 
     def export_data(self, format_type):
-        """Handles the export process for selected format."""
+        """Asks for a file name, then runs the export in the background (several may run at once)."""
         if not self.validate_for_export(): return
 
-        data = self.get_all_data() # Get current data
-        wh_name = self.metadata_vars["Warehouse Name"].get().replace(" ", "_") or "UnknownWH"
-        rep_date = self.metadata_vars["Report Date"].get() or datetime.now().strftime('%Y%m%d')
-        default_filename = f"SafetyReport_{wh_name}_{rep_date}"
-        export_successful = False
+        default_filename = report_file_stem(self.report.metadata)
         file_path = None
 
-        try:
-            if format_type == 'excel':
-                if not OPENPYXL_AVAILABLE:
-                     messagebox.showerror("Missing Library", "Excel export requires 'openpyxl'.\nInstall using: pip install openpyxl")
-                     return
-                file_path = filedialog.asksaveasfilename(
-                    defaultextension=".xlsx", filetypes=[("Excel Files", "*.xlsx")],
-                    initialfile=default_filename + ".xlsx", title="Export Report as Excel"
-                )
-                if file_path:
-                    self.status_var.set("Exporting Excel...")
-                    self._export_to_excel(data, file_path) # Call helper
-                    export_successful = True
-
-            elif format_type == 'pdf':
-                 if not REPORTLAB_AVAILABLE:
-                     messagebox.showerror("Missing Library", "PDF export requires 'reportlab'.\nInstall using: pip install reportlab")
-                     return
-                 file_path = filedialog.asksaveasfilename(
-                    defaultextension=".pdf", filetypes=[("PDF Files", "*.pdf")],
-                    initialfile=default_filename + ".pdf", title="Export Report as PDF"
-                 )
-                 if file_path:
-                    self.status_var.set("Exporting PDF...")
-                    self._export_to_pdf(data, file_path) # Call helper
-                    export_successful = True
-
-            # --- Give feedback ---
-            if export_successful and file_path:
-                 messagebox.showinfo("Export Successful",
-                                     f"Report exported successfully to:\n{file_path}\n\n"
-                                     f"IMPORTANT:\n1. Ensure all links shared in the report have correct viewing permissions for the administrator.\n2. Send this exported file to the administrator.")
-                 self.status_var.set(f"Exported: {os.path.basename(file_path)}")
-            elif file_path: # Dialog shown, but export failed in helper
-                 self.status_var.set("Export failed.")
-            else: # Dialog cancelled by user
-                 self.status_var.set("Export cancelled.")
-
-        except Exception as e: # Catch errors from the export helpers
-             messagebox.showerror("Export Error", f"An unexpected error occurred during export as {format_type.upper()}:\n{e}")
-             self.status_var.set(f"Error exporting.")
+        if format_type == 'excel':
+            if not OPENPYXL_AVAILABLE:
+                 messagebox.showerror("Missing Library", "Excel export requires 'openpyxl'.\nInstall using: pip install openpyxl")
+                 return
+            file_path = filedialog.asksaveasfilename(
+                defaultextension=".xlsx", filetypes=[("Excel Files", "*.xlsx")],
+                initialfile=default_filename + ".xlsx", title="Export Report as Excel"
+            )
+            export_func, label = self._export_to_excel, "Excel"
 
-    # --- Export Helper Methods (Excel & PDF) ---
-    def _export_to_excel(self, data, file_path):
-        """Exports data to Excel, creating hyperlinks for URLs. (Cleaned)"""
+        elif format_type == 'pdf':
+             if not REPORTLAB_AVAILABLE:
+                 messagebox.showerror("Missing Library", "PDF export requires 'reportlab'.\nInstall using: pip install reportlab")
+                 return
+             file_path = filedialog.asksaveasfilename(
+                defaultextension=".pdf", filetypes=[("PDF Files", "*.pdf")],
+                initialfile=default_filename + ".pdf", title="Export Report as PDF"
+             )
+             export_func, label = self._export_to_pdf, "PDF"
+
+        if not file_path: # Dialog cancelled by user
+             self.status_var.set("Export cancelled.")
+             return
+
+        # Snapshot the data now so later edits don't leak into a running export
+        job = ExportJob(label, file_path)
+        job.future = self._export_pool.submit(export_func, self.get_all_data(), file_path, job.report, job.cancel_event)
+        self._export_jobs.append(job)
+        self.status_var.set(f"Exporting {label}...")
+        if not self._export_polling:
+            self._export_polling = True
+            self.after(100, self._poll_exports)
+
+    def _poll_exports(self):
+        """Main-thread poll: shows progress of running exports and reports finished ones."""
+        finished = [job for job in self._export_jobs if job.future.done()]
+        self._export_jobs = [job for job in self._export_jobs if not job.future.done()]
+        if self._export_jobs:
+            self.status_var.set(" | ".join(f"{job.label}: {job.message} ({job.fraction:.0%})" for job in self._export_jobs))
+            self.after(100, self._poll_exports)
+        else:
+            self._export_polling = False
+        for job in finished:
+            self._finish_export(job)
+
+    def _finish_export(self, job):
+        """Gives feedback for one completed, failed or cancelled export."""
         try:
-            wb = openpyxl.Workbook()
-            ws = wb.active
-            ws.title = "Safety Checklist RePYTHON MAIN.PY" \
-            "port"
-
-            # --- Styling ---
-            H_FONT=OpenpyxlFont(name='Arial Black',size=16,bold=True,color="FF14467C")
-            MH_FONT=OpenpyxlFont(name='Arial',size=14,bold=True,color="FF14467C")
-            S_FONT=OpenpyxlFont(name='Arial',size=12,bold=True,color="FF39B54A")
-            Q_FONT=OpenpyxlFont(name='Arial',size=11,bold=True)
-            A_FONT=OpenpyxlFont(name='Arial',size=11)
-            ML_FONT=OpenpyxlFont(name='Arial',size=11,bold=True)
-            MV_FONT=OpenpyxlFont(name='Arial',size=11)
-            LINK_FONT=OpenpyxlFont(name='Arial',size=10,italic=True,underline='single',color='FF0000FF') # Blue underlined
-            WRAP_ALIGN=Alignment(wrap_text=True,vertical='top',horizontal='left')
-            CENTER_ALIGN=Alignment(vertical='center',horizontal='center')
-            BORDER_SIDE=Side(border_style="thin",color="FFDDDDDD") # Light grey
-            BORDER=Border(left=BORDER_SIDE,right=BORDER_SIDE,top=BORDER_SIDE,bottom=BORDER_SIDE)
-            FILL=PatternFill(start_color="FFEAEAEA",end_color="FFEAEAEA",fill_type="solid") # Lighter Fill
-
-            # --- Column Widths ---
-            ws.column_dimensions['A'].width = 50
-            ws.column_dimensions['B'].width = 70
-            row = 1
-
-            # --- Header ---
-            c = ws.cell(row=row, column=1, value="Warehouse Safety Compliance Report")
-            c.font = H_FONT
-            ws.merge_cells(start_row=row, start_column=1, end_row=row, end_column=2)
-            c.alignment = CENTER_ALIGN
-            row += 2
-
-            # --- Metadata ---
-            c = ws.cell(row=row, column=1, value="Report Information")
-            c.font = MH_FONT
-            ws.merge_cells(start_row=row, start_column=1, end_row=row, end_column=2)
-            c.fill = FILL
-            row += 1
-            for k, v in data['metadata'].items():
-                 ca = ws.cell(row=row, column=1, value=f"{k}:")
-                 ca.font = ML_FONT
-                 ca.border = BORDER
-                 cb = ws.cell(row=row, column=2, value=v)
-                 cb.font = MV_FONT
-                 cb.alignment = WRAP_ALIGN
-                 cb.border = BORDER
-                 row += 1
-            row += 1 # Spacer
-
-            # --- Checklist Items ---
-            c = ws.cell(row=row, column=1, value="Checklist Items")
-            c.font = MH_FONT
-            ws.merge_cells(start_row=row, start_column=1, end_row=row, end_column=2)
-            c.fill = FILL
-            row += 1
-            for section_title, questions in CHECKLIST_STRUCTURE:
-                 cs = ws.cell(row=row, column=1, value=section_title)
-                 cs.font = S_FONT
-                 ws.merge_cells(start_row=row, start_column=1, end_row=row, end_column=2)
-                 row += 1
-                 for qt, _, m in questions:
-                     qd = f"{qt}{' *' if m else ''}"
-                     a = data['checklist'].get(qt, "[N/A]")
-                     ca = ws.cell(row=row, column=1, value=qd)
-                     ca.font = Q_FONT
-                     ca.alignment = WRAP_ALIGN
-                     ca.border = BORDER
-                     cb = ws.cell(row=row, column=2, value=a if a else "[N/A]")
-                     cb.font = A_FONT
-                     cb.alignment = WRAP_ALIGN
-                     cb.border = BORDER
-                     row += 1
-            row += 1 # Spacer after all checklist sections
-
-            # --- Near Miss Report ---
-            c = ws.cell(row=row, column=1, value="Near Miss Report")
-            c.font = MH_FONT
-            ws.merge_cells(start_row=row, start_column=1, end_row=row, end_column=2)
-            c.fill = FILL
-            row += 1
-            nm_details = data['near_miss']['details']
-            if any(nm_details.values()):
-                for k, v in nm_details.items():
-                     ca = ws.cell(row=row, column=1, value=f"{k.replace('_',' ')}:")
-                     ca.font = ML_FONT
-                     ca.border = BORDER
-                     cb = ws.cell(row=row, column=2, value=v if v else "[N/A]")
-                     cb.font = A_FONT
-                     cb.alignment = WRAP_ALIGN
-                     cb.border = BORDER
-                     row += 1
-                nm_att = data['near_miss']['attachments']
-                cal = ws.cell(row=row, column=1, value="Near Miss Evidence Links:")
-                cal.font = ML_FONT
-                cal.border = BORDER
-                if nm_att:
-                     ws.merge_cells(start_row=row, start_column=1, end_row=row + len(nm_att) - 1, end_column=1)
-                     start_r = row
-                     for i, url in enumerate(nm_att):
-                         cell = ws.cell(start_r + i, 2, url)
-                         cell.font = LINK_FONT
-                         cell.border = BORDER
-                         if url and url.startswith("http"): cell.hyperlink = url
-                     row += len(nm_att)
-                else:
-                     can = ws.cell(row=row, column=2, value="[None]")
-                     can.font = LINK_FONT
-                     can.border = BORDER
-                     row += 1
-            else:
-                cnn = ws.cell(row=row, column=1, value="[No Near Miss Recorded]")
-                cnn.font = A_FONT
-                ws.merge_cells(start_row=row, start_column=1, end_row=row, end_column=2)
-                cnn.border = BORDER
-                row += 1
-            row += 1 # Spacer
-
-            # --- Action Points ---
-            c = ws.cell(row=row, column=1, value="Action Points / Recommendations")
-            c.font = MH_FONT
-            ws.merge_cells(start_row=row, start_column=1, end_row=row, end_column=2)
-            c.fill = FILL
-            row += 1
-            ap_text = data['action_points']
-            cap = ws.cell(row=row, column=1, value=ap_text if ap_text else "[None]")
-            cap.font = A_FONT
-            cap.alignment = WRAP_ALIGN
-            cap.border = BORDER
-            ws.merge_cells(start_row=row, start_column=1, end_row=row, end_column=2)
-            row += 2 # Spacer
-
-            # --- General Evidence Links ---
-            c = ws.cell(row=row, column=1, value="General Evidence Links")
-            c.font = MH_FONT
-            ws.merge_cells(start_row=row, start_column=1, end_row=row, end_column=2)
-            c.fill = FILL
-            row += 1
-            gen_att = data['general_attachments']
-            if gen_att:
-                for url in gen_att:
-                     cell = ws.cell(row=row, column=1, value=url)
-                     cell.font = LINK_FONT
-                     cell.border = BORDER
-                     if url and url.startswith("http"): cell.hyperlink = url
-                     ws.merge_cells(start_row=row, start_column=1, end_row=row, end_column=2)
-                     row += 1
-            else:
-                cga = ws.cell(row=row, column=1, value="[None]")
-                cga.font = LINK_FONT
-                cga.border = BORDER
-                ws.merge_cells(start_row=row, start_column=1, end_row=row, end_column=2)
-                row += 1
-
-            # --- Save ---
-            wb.save(file_path)
-
-        except PermissionError:
-            messagebox.showerror("Save Error", f"Permission denied writing Excel file:\n'{os.path.basename(file_path)}'\n\nIs the file open elsewhere?")
-            raise # Re-raise for calling function
+            job.future.result()
+        except ExportCancelled:
+            self.status_var.set(f"{job.label} export cancelled.")
+        except ExportError as e:
+            messagebox.showerror("Save Error", str(e))
+            self.status_var.set("Export failed.")
         except Exception as e:
-            messagebox.showerror("Excel Export Error", f"An unexpected error occurred while creating the Excel file:\n{e}")
-            raise # Re-raise
+            messagebox.showerror("Export Error", f"An unexpected error occurred during export as {job.label.upper()}:\n{e}")
+            self.status_var.set(f"Error exporting.")
+        else:
+            messagebox.showinfo("Export Successful",
+                                f"Report exported successfully to:\n{job.file_path}\n\n"
+                                f"IMPORTANT:\n1. Ensure all links shared in the report have correct viewing permissions for the administrator.\n2. Send this exported file to the administrator.")
+            if not self._export_jobs: self.status_var.set(f"Exported: {os.path.basename(job.file_path)}")
+
+    def cancel_exports(self):
+        """Requests cancellation of every running or queued export."""
+        if not self._export_jobs:
+            self.status_var.set("No export running.")
+            return
+        for job in self._export_jobs:
+            job.cancel_event.set()
+        self.status_var.set("Cancelling export...")
 
-    def _export_to_pdf(self, data, file_path):
-        """Exports data to PDF, creating hyperlinks for URLs. (Cleaned)"""
+    # --- Export Helper Methods (Excel & PDF) ---
+    # Run on the export worker threads: no Tk calls here, errors are reported by _finish_export.
+    @timed("export: excel")
+    def _export_to_excel(self, data, file_path, progress=None, cancel=None):
+        """Exports data to Excel via exporters.export_to_excel."""
+        export_to_excel(data, file_path, progress, cancel)
+
+    @timed("export: pdf")
+    def _export_to_pdf(self, data, file_path, progress=None, cancel=None):
+        """Exports data to PDF via exporters.export_to_pdf."""
+        export_to_pdf(data, file_path, progress, cancel)
+
+    # --- Compliance Dashboard ---
+    def open_compliance_dashboard(self):
+        """Scores every project file in a folder (in the background) and shows the results."""
+        if importlib.util.find_spec("numpy") is None:
+            messagebox.showerror("Missing Library", "Compliance scoring requires 'numpy'.\nInstall using: pip install numpy")
+            return
+        folder = filedialog.askdirectory(
+            title="Select Folder with Project Files",
+            initialdir=os.path.dirname(self.project_file_path) if self.project_file_path else os.getcwd()
+        )
+        if not folder: return
+        self.status_var.set(f"Scoring reports in {os.path.basename(folder)}...")
+        future = self._background_pool.submit(self._score_folder, folder, self.report.template)
+        self.after(100, lambda: self._poll_compliance(future, folder))
+
+    def _score_folder(self, folder, template):
+        """Worker thread: loads the folder's reports (process pool) and summarizes them. No Tk calls."""
+        from compliance import load_directory, summarize
+        data, errors = load_directory(folder, template)
+        return summarize(data), errors
+
+    def _poll_compliance(self, future, folder):
+        if not future.done():
+            self.after(100, lambda: self._poll_compliance(future, folder))
+            return
         try:
-            doc = SimpleDocTemplate(file_path, pagesize=(8.5*inch, 11*inch), leftMargin=0.6*inch, rightMargin=0.6*inch, topMargin=0.6*inch, bottomMargin=0.6*inch)
-            styles = getSampleStyleSheet()
-            story = []
-
-            # --- PDF Styles ---
-            try:
-                from reportlab.pdfbase.ttfonts import TTFont
-                from reportlab.pdfbase import pdfmetrics
-                # Try to register font if needed, handle potential failure
-                # pdfmetrics.registerFont(TTFont('Arial-Black', 'arialblk.ttf'))
-                header_font_name='Arial-Black'
-            except:
-                header_font_name='Helvetica-Bold' # Safe fallback
-
-            styles.add(ParagraphStyle(name='MainHeader', fontName=header_font_name, fontSize=18, textColor=colors.HexColor(SECONDARY_COLOR), alignment=TA_CENTER, spaceAfter=10))
-            styles.add(ParagraphStyle(name='SubHeader', parent=styles['Normal'], alignment=TA_CENTER, fontSize=10, textColor=colors.dimgrey, spaceAfter=15))
-            styles.add(ParagraphStyle(name='MetaHeader', fontName='Helvetica-Bold', fontSize=14, textColor=colors.HexColor(SECONDARY_COLOR), spaceBefore=12, spaceAfter=6, keepWithNext=1))
-            styles.add(ParagraphStyle(name='MetaLabel', fontName='Helvetica-Bold', fontSize=10, textColor=colors.black))
-            styles.add(ParagraphStyle(name='MetaValue', parent=styles['Normal'], fontSize=10, leftIndent=15, spaceAfter=3))
-            styles.add(ParagraphStyle(name='SectionHeaderPDF', fontName='Helvetica-Bold', fontSize=12, textColor=colors.HexColor(PRIMARY_COLOR), spaceBefore=15, spaceAfter=8, keepWithNext=1, backgroundColor=colors.HexColor("#F0F0F0"), padding=4, borderRadius=3))
-            styles.add(ParagraphStyle(name='QuestionStylePDF', parent=styles['Normal'], fontName='Helvetica-Bold', fontSize=10, textColor=colors.black, spaceBefore=6, leftIndent=10, allowWidows=1, allowOrphans=1, keepWithNext=1))
-            styles.add(ParagraphStyle(name='AnswerStylePDF', parent=styles['Normal'], fontName='Helvetica', fontSize=10, textColor=colors.darkslategray, leftIndent=25, spaceAfter=5, wordWrap='CJK', leading=12))
-            styles.add(ParagraphStyle(name='AnswerStyleEmptyPDF', parent=styles['AnswerStylePDF'], textColor=colors.HexColor(DARK_GREY), fontName='Helvetica-Oblique'))
-            styles.add(ParagraphStyle(name='NMFieldLabelPDF', parent=styles['MetaLabel'], leftIndent=10))
-            styles.add(ParagraphStyle(name='NMFieldValuePDF', parent=styles['MetaValue'], leftIndent=25))
-            styles.add(ParagraphStyle(name='AttachLabelPDF', parent=styles['MetaLabel'], leftIndent=10, spaceBefore=5, keepWithNext=1))
-            styles.add(ParagraphStyle(name='AttachmentLinkPDF', parent=styles['MetaValue'], fontName='Helvetica', fontSize=9, leftIndent=25, textColor=colors.blue, spaceAfter=2)) # Removed underline
-
-            def pdf_escape(text): return text.replace('&','&').replace('<','<').replace('>','>').replace('\n','<br/>') if text else ""
-            def create_link_paragraph(url, style=styles['AttachmentLinkPDF']):
-                if url and url.startswith("http"):
-                    escaped_url = pdf_escape(url)
-                    display_url = escaped_url if len(escaped_url) < 70 else escaped_url[:67] + "..."
-                    return Paragraph(f'<link href="{escaped_url}">{display_url}</link>', style)
-                else:
-                    return Paragraph(pdf_escape(url) if url else "[Invalid Link]", styles['AnswerStyleEmptyPDF'])
-
-            # --- Build PDF Story ---
-            story.append(Paragraph("Warehouse Safety Compliance Report", styles['MainHeader']))
-            story.append(Paragraph(f"Date: {pdf_escape(data['metadata'].get('Report Date','N/A'))} | WH: {pdf_escape(data['metadata'].get('Warehouse Name','N/A'))} | Loc: {pdf_escape(data['metadata'].get('Location','N/A'))}", styles['SubHeader']))
-            story.append(Paragraph("Report Information", styles['MetaHeader']))
-
-            # Metadata Table
-            meta_data_table = []
-            meta = data['metadata']; fields_ordered = ["Warehouse Name", "Location", "Report Date", "Report Month", "Uploaded By Name", "Uploaded By Role", "Uploaded By Emp ID", "Uploaded By Email", "Manager Name"]
-            for i in range(0, len(fields_ordered), 2):
-                 key1 = fields_ordered[i]; val1 = pdf_escape(meta.get(key1,''))
-                 p1_label = Paragraph(f"<b>{key1}:</b>", styles['MetaLabel'])
-                 p1_value = Paragraph(val1 if val1 else "[N/A]", styles['MetaValue'])
-                 p2_label, p2_value = ("", "") # Placeholders
-                 if i + 1 < len(fields_ordered):
-                     key2 = fields_ordered[i+1]; val2 = pdf_escape(meta.get(key2,''))
-                     p2_label = Paragraph(f"<b>{key2}:</b>", styles['MetaLabel'])
-                     p2_value = Paragraph(val2 if val2 else "[N/A]", styles['MetaValue'])
-                 meta_data_table.append([p1_label, p1_value, p2_label, p2_value])
-            table = Table(meta_data_table, colWidths=[1.5*inch, 2.2*inch, 1.5*inch, 2.2*inch])
-            table.setStyle(TableStyle([('VALIGN',(0,0),(-1,-1),'TOP'), ('LEFTPADDING',(0,0),(-1,-1),0), ('RIGHTPADDING',(0,0),(-1,-1),0), ('BOTTOMPADDING',(0,0),(-1,-1),2)]));
-            story.append(table)
-            story.append(Spacer(1, 0.2*inch))
-
-            # Checklist Items
-            story.append(Paragraph("Checklist Items", styles['MetaHeader']))
-            for section_title, questions in CHECKLIST_STRUCTURE:
-                 section_items = [Paragraph(section_title, styles['SectionHeaderPDF'])]
-                 for qt, _, m in questions:
-                     qd = f"{qt}{' *' if m else ''}"
-                     a = data['checklist'].get(qt)
-                     p_q = Paragraph(pdf_escape(qd), styles['QuestionStylePDF'])
-                     p_a = Paragraph(pdf_escape(a), styles['AnswerStylePDF']) if a else Paragraph("[N/A]", styles['AnswerStyleEmptyPDF'])
-                     section_items.extend([p_q, p_a])
-                 story.append(KeepTogether(section_items))
-
-            # Near Miss Report
-            story.append(PageBreak()); story.append(Paragraph("Near Miss Report", styles['MetaHeader']))
-            nm_details = data['near_miss']['details']
-            if any(nm_details.values()):
-                 nm_section_content = []
-                 field_map = {"Incident Date":"Date","Incident Location":"Location","Description":"Description","Immediate Action":"Action","Prevention Suggestion":"Prevention"}
-                 for k, lbl in field_map.items():
-                     v = pdf_escape(nm_details.get(k,''))
-                     p_l = Paragraph(f"<b>{lbl}:</b>", styles['NMFieldLabelPDF'])
-                     p_v = Paragraph(v if v else "[N/A]", styles['NMFieldValuePDF'])
-                     nm_section_content.extend([p_l, p_v])
-                 nm_att = data['near_miss']['attachments']
-                 nm_section_content.append(Paragraph("<b>Evidence Links (Near Miss):</b>", styles['AttachLabelPDF']))
-                 nm_section_content.extend([create_link_paragraph(url) for url in nm_att]) if nm_att else nm_section_content.append(Paragraph("[None]", styles['AnswerStyleEmptyPDF']))
-                 story.append(KeepTogether(nm_section_content))
-            else: story.append(Paragraph("[No Near Miss Recorded]", styles['AnswerStyleEmptyPDF']))
-
-            # Action Points
-            story.append(Spacer(1, 0.2*inch)); story.append(Paragraph("Action Points / Recommendations", styles['MetaHeader']))
-            ap_text = data['action_points']; story.append(Paragraph(pdf_escape(ap_text), styles['AnswerStylePDF']) if ap_text else Paragraph("[None]", styles['AnswerStyleEmptyPDF']))
-
-            # General Links
-            story.append(Spacer(1, 0.2*inch)); story.append(Paragraph("General Evidence Links", styles['MetaHeader']))
-            gen_att = data['general_attachments']; story.extend([create_link_paragraph(url) for url in gen_att]) if gen_att else story.append(Paragraph("[None]", styles['AnswerStyleEmptyPDF']))
-
-            # Build PDF
-            doc.build(story)
-
-        except PermissionError:
-            messagebox.showerror("Save Error", f"Permission denied writing PDF file:\n'{os.path.basename(file_path)}'\n\nIs the file open elsewhere?")
-            raise
+            summary, errors = future.result()
         except Exception as e:
-            messagebox.showerror("PDF Export Error", f"An unexpected error occurred while creating the PDF file:\n{e}")
-            raise
+            messagebox.showerror("Compliance Error", f"Could not score the reports in:\n{folder}\n\n{e}")
+            self.status_var.set("Compliance scoring failed.")
+            return
+        if not summary.report_count:
+            messagebox.showinfo("Compliance Dashboard", f"No valid project files found in:\n{folder}")
+            self.status_var.set("No reports to score.")
+            return
+        self.status_var.set(f"Scored {summary.report_count} reports ({len(errors)} skipped).")
+        ComplianceWindow(self, summary, folder, skipped=len(errors))
+
+    # --- Report Search ---
+    def open_search(self):
+        """Opens the search panel for a folder of project files (its index is built/refreshed in the background)."""
+        folder = filedialog.askdirectory(
+            title="Select Folder with Project Files",
+            initialdir=os.path.dirname(self.project_file_path) if self.project_file_path else os.getcwd()
+        )
+        if folder: SearchWindow(self, folder)
+
+    def get_link_checker(self):
+        """The shared LinkChecker (see link_check.py), created on first use so startup never loads asyncio."""
+        if self.link_checker is None:
+            from link_check import LinkChecker
+            self.link_checker = LinkChecker()
+        return self.link_checker
 
     # --- Utility Methods ---
     def update_title(self):
         """Updates the main window title."""
         base_title = "Warehouse Safety Checklist"
         proj_name = os.path.basename(self.project_file_path) if self.project_file_path else "New Project"
-        # Add unsaved marker maybe later? Requires tracking changes.
-        self.title(f"{base_title} - {proj_name}")
+        unsaved_marker = "*" if self._dirty_fields else "" # Edits not yet in the project file
+        self.title(f"{base_title} - {unsaved_marker}{proj_name}")
+        self._update_document_bar()
+
+    def _update_document_bar(self):
+        """One tab per open report (unsaved ones marked with *); the bar is hidden while only one report is open."""
+        if not hasattr(self, 'document_tabs'): return
+        labels, active_label = {}, None
+        for document in self.workspace.documents:
+            base = ("*" if document.is_dirty else "") + document.name
+            label, n = base, 1
+            while label in labels: # Same file name in different folders
+                n += 1
+                label = f"{base} ({n})"
+            labels[label] = document
+            if document is self.workspace.active: active_label = label
+        if list(labels) != list(self._document_labels): self.document_tabs.configure(values=list(labels)) # Recreates the tab buttons
+        self._document_labels = labels
+        if active_label is not None: self.document_tabs.set(active_label)
+        if len(labels) > 1: self.document_bar.grid()
+        else: self.document_bar.grid_remove()
 
     def show_about(self):
         """Displays the About dialog."""
@@ -835,10 +1141,50 @@ class WarehouseSafetyApp(ctk.CTk):
                             "Ensure shared links are accessible to the administrator.")
 
     def on_closing(self):
-        """Handles the window close event (asks for confirmation)."""
-        # Add check for unsaved changes here later if desired
-        if messagebox.askyesno("Exit Application", "Are you sure you want to exit?", icon='question'):
-            self.destroy()
+        """Handles the window close event (asks to save unsaved changes, otherwise for confirmation)."""
+        self._sync_pending_edits()
+        export_note = "An export is still running and will be cancelled.\n\n" if self._export_jobs else ""
+        dirty = [document for document in self.workspace.documents if document.is_dirty] # Unloaded reports are never dirty
+        if dirty:
+            names = ", ".join(document.name for document in dirty[:5]) + (f" and {len(dirty) - 5} more" if len(dirty) > 5 else "")
+            answer = messagebox.askyesnocancel("Unsaved Changes", export_note + f"Save changes to {names} before exiting?", icon='warning')
+            if answer is None: return # Cancel: keep working
+            if answer:
+                for document in dirty:
+                    self.switch_document(document)
+                    self.save_project()
+                    if self.is_dirty: return # Save was cancelled or failed
+            else:
+                for document in dirty: document.journal.clear() # User chose not to keep the edits
+        elif not messagebox.askyesno("Exit Application", export_note + "Are you sure you want to exit?", icon='question'):
+            return
+        for job in self._export_jobs: job.cancel_event.set()
+        self._export_pool.shutdown(wait=False)
+        self._background_pool.shutdown(wait=False)
+        for document in self.workspace.documents: document.journal.close()
+        if self._report_store is not None: self._report_store.close()
+        self.destroy()
+
+
+# ==============================================================================
+# Background Export Job
+# ==============================================================================
+class ExportJob:
+    """Tracks one background export: its future, cancel flag and latest progress (written by the worker)."""
+    __slots__ = ("label", "file_path", "future", "cancel_event", "fraction", "message")
+
+    def __init__(self, label, file_path):
+        self.label = label
+        self.file_path = file_path
+        self.future = None
+        self.cancel_event = threading.Event()
+        self.fraction = 0.0
+        self.message = "Queued"
+
+    def report(self, fraction, message):
+        """Progress callback for exporters (plain attribute writes, read by the Tk poll)."""
+        self.fraction = fraction
+        self.message = message
 
 
 # ==============================================================================
@@ -847,123 +1193,213 @@ class WarehouseSafetyApp(ctk.CTk):
 
 # --- Checklist Frame ---
 class ChecklistFrame(ctk.CTkScrollableFrame):
-    """Scrollable frame for the main checklist questions and answers."""
-    def __init__(self, master, app_controller, checklist_data_vars):
-        super().__init__(master, corner_radius=5, fg_color=BACKGROUND_COLOR)
+    """Scrollable frame for the main checklist questions and answers.
+
+    Widgets are built once and stay bound to their answer variables, so clearing or loading
+    a report only changes variable values. Every section starts as an empty placeholder of
+    estimated height. Normally the first section is built at once and the others follow in
+    steps of about BUILD_STEP_SECONDS, with input and redraws handled in between. Long
+    checklists (see VIRTUALIZE_MIN_QUESTIONS) are virtualized instead: a section's widgets
+    are created when it scrolls near the visible area.
+    """
+    VIRTUALIZE_MIN_QUESTIONS = 60
+    EST_SECTION_HEIGHT = 60 # Header + separator
+    EST_QUESTION_HEIGHT = 44
+    WRAP_LENGTH = 450 # Use a fixed wrap length, seems more reliable than winfo_width
+    BUILD_STEP_SECONDS = 0.015 # Main-thread time per build step
+
+    def __init__(self, master, app_controller, checklist_data_vars, virtualize=None):
+        super().__init__(master, corner_radius=5, fg_color=app_controller.styles.colors["background"])
         self.app = app_controller
+        self.styles = app_controller.styles
         self.checklist_data_vars = checklist_data_vars
         self.question_widgets = {} # To potentially access widgets later if needed
+        self.section_frames = [] # One container frame per template section
+        self._built_sections = set() # Indexes of sections whose widgets exist
+        self.virtualize = virtualize # None = decide from checklist size
+        self._virtual_active = False
+        self._materialize_pending = False
+        self._next_section = 0 # Next section for the stepwise build
+        self._build_job = None # after() id of the next build step
+        self._build_started = 0.0
+        self._on_build_complete = None
         # Style scrollbar
-        self._scrollbar.configure(width=16, button_color=PRIMARY_COLOR, button_hover_color=ACCENT_COLOR)
-        # Configure internal grid columns
-        self.grid_columnconfigure(0, weight=3, uniform="checklist_cols") # Question column
-        self.grid_columnconfigure(1, weight=2, uniform="checklist_cols") # Answer column
+        self._scrollbar.configure(width=16, button_color=self.styles.colors["primary"], button_hover_color=self.styles.colors["accent"])
+        self.grid_columnconfigure(0, weight=1)
+        # Watch scrolling/resizing to materialize sections as they come into view
+        self._view_canvas = getattr(self, "_parent_canvas", None) # CTkScrollableFrame implementation detail
+        if self._view_canvas is not None:
+            self._view_canvas.configure(yscrollcommand=self._on_canvas_yscroll)
+
+    @property
+    def building(self):
+        """True while sections are still being built in steps."""
+        return self._build_job is not None
+
+    @timed("build_checklist_ui")
+    def build_checklist_ui(self, on_complete=None):
+        """Builds the checklist widgets if they don't exist yet (later calls are no-ops).
+
+        Returns once the first section exists; `on_complete()` is called when every section is built.
+        """
+        if self.section_frames: return
+        self._build_started = time.perf_counter()
+        self._on_build_complete = on_complete
+        template = self.app.report.template # Compiled checklist template (sections, questions, types)
+        virtualize = self.virtualize if self.virtualize is not None else len(template) >= self.VIRTUALIZE_MIN_QUESTIONS
+        self._virtual_active = bool(virtualize) and self._view_canvas is not None
+
+        for section_index, (section_title, questions) in enumerate(template.sections):
+            est_height = self.EST_SECTION_HEIGHT + self.EST_QUESTION_HEIGHT * len(questions)
+            container = ctk.CTkFrame(self, fg_color="transparent", height=est_height)
+            container.grid(row=section_index, column=0, sticky="ew")
+            # Same uniform columns in every section so questions/answers line up across sections
+            container.grid_columnconfigure(0, weight=3, uniform="checklist_cols") # Question column
+            container.grid_columnconfigure(1, weight=2, uniform="checklist_cols") # Answer column
+            self.section_frames.append(container)
+
+        self._next_section = 0
+        if self._virtual_active:
+            self.after_idle(self._materialize_visible)
+            self._finish_build()
+        else:
+            self._build_step()
+
+    def _build_step(self):
+        """Builds sections for about BUILD_STEP_SECONDS (at least one), then yields to the event loop."""
+        self._build_job = None
+        deadline = time.perf_counter() + self.BUILD_STEP_SECONDS
+        while self._next_section < len(self.section_frames):
+            self._build_section(self._next_section)
+            self._next_section += 1
+            if time.perf_counter() >= deadline: break
+        if self._next_section < len(self.section_frames):
+            self._build_job = self.after(1, self._build_step) # A timer, so pending redraws (idle tasks) run first
+        else:
+            self._finish_build()
 
-    def rebuild_checklist_ui(self):
-        """Clears and rebuilds the checklist UI elements more robustly."""
-        # Clear previous widgets
-        # Destroy children directly attached to the inner frame managed by CTkScrollableFrame
-        try:
-            # Access the inner frame where widgets are placed (implementation detail)
-            inner_frame = self._canvas # CTkScrollableFrame uses self._canvas to hold widgets
-            for widget in inner_frame.winfo_children():
-                 # Only destroy widgets we likely added (Labels, Frames, Entries, RadioButtons)
-                 # Avoid destroying scrollbars or other internal parts if possible
-                 if isinstance(widget, (ctk.CTkLabel, ctk.CTkFrame, ctk.CTkRadioButton, ctk.CTkEntry)):
-                     try:
-                         widget.destroy()
-                     except tk.TclError:
-                         # Ignore if widget is already gone
-                         pass
-        except AttributeError:
-             # Fallback if internal structure changes in future CTk versions
-             print("Warning: Could not reliably clear ChecklistFrame via _canvas. Using alternative.")
-             for widget in self.winfo_children():
-                 if isinstance(widget, (ctk.CTkLabel, ctk.CTkFrame, ctk.CTkRadioButton, ctk.CTkEntry)):
-                     try: widget.destroy()
-                     except: pass # Ignore all errors during fallback clear
+    def _finish_build(self):
+        record_span("checklist: all sections built", self._build_started, time.perf_counter(), sections=len(self.section_frames))
+        callback, self._on_build_complete = self._on_build_complete, None
+        if callback is not None: callback()
 
+    @timed("rebuild_checklist_ui")
+    def rebuild_checklist_ui(self):
+        """Destroys and rebuilds all checklist widgets (only needed when the checklist structure changes)."""
+        if self._build_job is not None:
+            self.after_cancel(self._build_job) # Stop a stepwise build of the old checklist
+            self._build_job = None
+        self._on_build_complete = None
+        for container in self.section_frames:
+            try:
+                container.destroy()
+            except tk.TclError:
+                pass # Ignore if widget is already gone
+        self.section_frames.clear()
+        self._built_sections.clear()
         self.question_widgets.clear()
-
+        self.build_checklist_ui()
+
+    def _build_section(self, section_index):
+        """Creates the header, separator and question/answer widgets of one section."""
+        if section_index in self._built_sections: return
+        self._built_sections.add(section_index)
+        container = self.section_frames[section_index]
+        section_title, questions = self.app.report.template.sections[section_index]
+        styles = self.styles
         current_row = 0
-        # Use a fixed wrap length, seems more reliable than winfo_width
-        wrap_len = 450
-
-        # Add items section by section
-        for section_index, (section_title, questions) in enumerate(CHECKLIST_STRUCTURE):
-            try:
-                # Section Header
-                section_label = ctk.CTkLabel(self, text=section_title, font=self.app.section_header_font, anchor="w", text_color=SECONDARY_COLOR)
-                section_label.grid(row=current_row, column=0, columnspan=2, sticky="ew", pady=(18 if section_index > 0 else 5, 6), padx=10) # Less padding for first section
-                current_row += 1
-                # Separator
-                sep = ctk.CTkFrame(self, height=2, fg_color=PRIMARY_COLOR)
-                sep.grid(row=current_row, column=0, columnspan=2, sticky='ew', padx=10, pady=(0, 10))
-                current_row += 1
-
-                # Questions and Answer Widgets for this section
-                for question_text, answer_type, mandatory in questions:
-                    # Ensure variable exists
-                    if question_text not in self.checklist_data_vars:
-                        print(f"CRITICAL ERROR: No variable for question '{question_text}'. Skipping.")
-                        continue # Skip this question entirely
-
-                    answer_var = self.checklist_data_vars[question_text]
-                    answer_widget = None
-
-                    # Create Question Label (inside its own try-except)
-                    try:
-                        q_display_text = f"{question_text}{' *' if mandatory else ''}"
-                        question_label = ctk.CTkLabel(self, text=q_display_text, font=self.app.question_font, anchor="nw", wraplength=wrap_len, justify="left")
-                        question_label.grid(row=current_row, column=0, sticky="nw", padx=(15, 10), pady=5)
-                    except Exception as label_e:
-                         print(f"ERROR creating label for '{question_text}': {label_e}")
-                         continue # Skip this question if label fails
-
-                    # Create Answer Widget (inside its own try-except)
-                    try:
-                        if answer_type == "yes_no":
-                            radio_frame = ctk.CTkFrame(self, fg_color="transparent")
-                            # Define args ONCE
-                            common_radio_args = {"variable": answer_var, "font": self.app.answer_font,"radiobutton_width": 18, "radiobutton_height": 18,"fg_color": PRIMARY_COLOR,"hover_color": ACCENT_COLOR,"border_color": SECONDARY_COLOR}
-                            # Create radio buttons with the frame as master
-                            rb_yes = ctk.CTkRadioButton(master=radio_frame, text="Yes", value="Yes", **common_radio_args)
-                            rb_no = ctk.CTkRadioButton(master=radio_frame, text="No", value="No", **common_radio_args)
-                            rb_na = ctk.CTkRadioButton(master=radio_frame, text="N/A", value="N/A", **common_radio_args)
-                            # Pack inside the frame
-                            rb_yes.pack(side=tk.LEFT, padx=(0, 20)); rb_no.pack(side=tk.LEFT, padx=(0, 20)); rb_na.pack(side=tk.LEFT, padx=(0, 15))
-                            answer_widget = radio_frame # We grid this frame later
-                            self.question_widgets[question_text] = (question_label, radio_frame)
-
-                        elif answer_type == "text":
-                            # Simplify Entry creation slightly, ensure master is self
-                            entry = ctk.CTkEntry(self, textvariable=answer_var, font=self.app.answer_font, width=280, border_width=1, corner_radius=5)
-                            answer_widget = entry # We grid this entry later
-                            self.question_widgets[question_text] = (question_label, entry)
-
-                        # Grid the created answer widget (frame or entry)
-                        if answer_widget:
-                            answer_widget.grid(row=current_row, column=1, sticky="ew", padx=10, pady=5)
-
-                    except Exception as widget_e:
-                        print(f"ERROR creating/gridding answer widget for '{question_text}': {widget_e}")
-                        # Don't increment row if widget failed
-
-                    else: # Only increment row if widget creation/gridding likely succeeded
-                         current_row += 1
-
-            except Exception as section_e:
-                 print(f"ERROR processing section '{section_title}': {section_e}")
-                 # Attempt to continue to the next section if one fails
-
-        # print("Checklist UI rebuild attempted.") # Keep for debugging if needed
+        try:
+            # Section Header
+            section_label = ctk.CTkLabel(container, text=section_title, **styles.section_label)
+            section_label.grid(row=current_row, column=0, columnspan=2, sticky="ew", pady=(18 if section_index > 0 else 5, 6), padx=10) # Less padding for first section
+            current_row += 1
+            # Separator
+            sep = ctk.CTkFrame(container, height=2, fg_color=styles.colors["primary"])
+            sep.grid(row=current_row, column=0, columnspan=2, sticky='ew', padx=10, pady=(0, 10))
+            current_row += 1
+
+            # Questions and Answer Widgets for this section
+            for question_text, answer_type, mandatory in questions:
+                # Ensure variable exists
+                if question_text not in self.checklist_data_vars:
+                    print(f"CRITICAL ERROR: No variable for question '{question_text}'. Skipping.")
+                    continue # Skip this question entirely
+
+                answer_var = self.checklist_data_vars[question_text]
+                answer_widget = None
+
+                # Create Question Label (inside its own try-except)
+                try:
+                    q_display_text = f"{question_text}{' *' if mandatory else ''}"
+                    question_label = ctk.CTkLabel(container, text=q_display_text, wraplength=self.WRAP_LENGTH, **styles.question_label)
+                    question_label.grid(row=current_row, column=0, sticky="nw", padx=(15, 10), pady=5)
+                except Exception as label_e:
+                     print(f"ERROR creating label for '{question_text}': {label_e}")
+                     continue # Skip this question if label fails
+
+                # Create Answer Widget (inside its own try-except)
+                try:
+                    if answer_type == "yes_no":
+                        radio_frame = ctk.CTkFrame(container, fg_color="transparent")
+                        # Create radio buttons with the frame as master (shared options from the style registry)
+                        rb_yes = ctk.CTkRadioButton(master=radio_frame, text="Yes", value="Yes", variable=answer_var, **styles.radio)
+                        rb_no = ctk.CTkRadioButton(master=radio_frame, text="No", value="No", variable=answer_var, **styles.radio)
+                        rb_na = ctk.CTkRadioButton(master=radio_frame, text="N/A", value="N/A", variable=answer_var, **styles.radio)
+                        # Pack inside the frame
+                        rb_yes.pack(side=tk.LEFT, padx=(0, 20)); rb_no.pack(side=tk.LEFT, padx=(0, 20)); rb_na.pack(side=tk.LEFT, padx=(0, 15))
+                        answer_widget = radio_frame # We grid this frame later
+                        self.question_widgets[question_text] = (question_label, radio_frame)
+
+                    elif answer_type == "text":
+                        entry = ctk.CTkEntry(container, textvariable=answer_var, width=280, **styles.answer_entry)
+                        answer_widget = entry # We grid this entry later
+                        self.question_widgets[question_text] = (question_label, entry)
+
+                    # Grid the created answer widget (frame or entry)
+                    if answer_widget:
+                        answer_widget.grid(row=current_row, column=1, sticky="ew", padx=10, pady=5)
+
+                except Exception as widget_e:
+                    print(f"ERROR creating/gridding answer widget for '{question_text}': {widget_e}")
+                    # Don't increment row if widget failed
+
+                else: # Only increment row if widget creation/gridding likely succeeded
+                     current_row += 1
+
+        except Exception as section_e:
+             print(f"ERROR processing section '{section_title}': {section_e}")
+
+    # --- Virtualization ---
+    def _on_canvas_yscroll(self, first, last):
+        """Canvas yscrollcommand: keeps the scrollbar in sync and schedules materialization."""
+        self._scrollbar.set(first, last)
+        if self._virtual_active and not self._materialize_pending:
+            self._materialize_pending = True
+            self.after_idle(self._materialize_visible)
+
+    def _materialize_visible(self):
+        """Builds sections within one screen height of the visible area."""
+        self._materialize_pending = False
+        if not self._virtual_active or len(self._built_sections) == len(self.section_frames): return
+        try:
+            view_height = max(self._view_canvas.winfo_height(), 1)
+            top = self._view_canvas.canvasy(0) - view_height
+            bottom = self._view_canvas.canvasy(0) + 2 * view_height
+            for section_index, container in enumerate(self.section_frames):
+                if section_index in self._built_sections: continue
+                y = container.winfo_y()
+                if y + container.winfo_height() >= top and y <= bottom:
+                    self._build_section(section_index)
+        except tk.TclError:
+            pass # Frame is being destroyed
 
 # --- Near Miss Frame ---
 class NearMissFrame(ctk.CTkFrame):
     """Frame for structured Near Miss reporting."""
     def __init__(self, master, app_controller, near_miss_data_vars, near_miss_attachments_ref):
-        super().__init__(master, fg_color=BACKGROUND_COLOR)
+        super().__init__(master, fg_color=app_controller.styles.colors["background"])
         self.app = app_controller
+        styles = app_controller.styles
         self.near_miss_vars = near_miss_data_vars
         self.attachments_ref = near_miss_attachments_ref # Direct list reference
         self.grid_columnconfigure(1, weight=1) # Allow entry fields/textboxes to expand
@@ -976,28 +1412,28 @@ class NearMissFrame(ctk.CTkFrame):
         # Create Labels and Entry/Textbox widgets
         for key in fields:
             label_text = field_labels.get(key, key + ":")
-            label = ctk.CTkLabel(self, text=label_text, font=self.app.question_font, anchor="nw", text_color=SECONDARY_COLOR) # Blue labels
+            label = ctk.CTkLabel(self, text=label_text, **styles.field_label) # Blue labels
             label.grid(row=row_num, column=0, sticky="nw", padx=15, pady=(12,2)) # Inc padding
 
             if key in ["Description", "Immediate Action", "Prevention Suggestion"]:
-                widget = ctk.CTkTextbox(self, wrap=tk.WORD, height=75, font=self.app.answer_font, border_width=1, corner_radius=5, border_color=PRIMARY_COLOR) # Inc height
+                widget = ctk.CTkTextbox(self, height=75, **styles.textbox) # Inc height
                 widget.insert("1.0", self.near_miss_vars[key].get()) # Initial value
                 # Update variable when focus leaves the textbox
                 widget.bind("<FocusOut>", lambda ev, k=key, w=widget: self.near_miss_vars[k].set(w.get("1.0", "end-1c")), add="+")
                 # Update textbox when variable changes (using trace)
                 self.near_miss_vars[key].trace_add("write", lambda n, i, m, k=key, w=widget: self._update_textbox_content(w, self.near_miss_vars[k]))
             else: # Single line Entry
-                 widget = ctk.CTkEntry(self, textvariable=self.near_miss_vars[key], font=self.app.answer_font, width=200, border_width=1)
+                 widget = ctk.CTkEntry(self, textvariable=self.near_miss_vars[key], width=200, **styles.answer_entry)
 
             widget.grid(row=row_num, column=1, sticky="ew", padx=15, pady=(10,2))
             self.detail_widgets[key] = widget
             row_num += 1
 
         # Separator
-        ctk.CTkFrame(self, height=1, fg_color="gray80").grid(row=row_num, column=0, columnspan=2, sticky='ew', pady=25); row_num += 1 # Lighter separator
+        ctk.CTkFrame(self, height=1, **styles.separator).grid(row=row_num, column=0, columnspan=2, sticky='ew', pady=25); row_num += 1 # Lighter separator
 
         # --- Near Miss Attachments Section ---
-        ctk.CTkLabel(self, text="Evidence Links (Near Miss):", font=self.app.question_font, text_color=SECONDARY_COLOR).grid(row=row_num, column=0, columnspan=2, sticky="w", pady=(0, 8), padx=15); row_num += 1 # Blue label
+        ctk.CTkLabel(self, text="Evidence Links (Near Miss):", font=styles.fonts["question_font"], text_color=styles.colors["secondary"]).grid(row=row_num, column=0, columnspan=2, sticky="w", pady=(0, 8), padx=15); row_num += 1 # Blue label
         # Embed the reusable subframe for link management
         self.link_frame = LinkAttachmentSubFrame(self, self.app, self.attachments_ref, is_near_miss=True)
         self.link_frame.grid(row=row_num, column=0, columnspan=2, sticky="nsew", padx=15, pady=(0, 15))
@@ -1005,6 +1441,7 @@ class NearMissFrame(ctk.CTkFrame):
 
     def _update_textbox_content(self, textbox, string_var):
         """Helper to update CTkTextbox content from StringVar if it differs."""
+        if self.app._bulk_update: return # refresh_from_vars() runs once at the end of the batch
         try:
             current_text = textbox.get("1.0", "end-1c")
             new_text = string_var.get()
@@ -1019,17 +1456,31 @@ class NearMissFrame(ctk.CTkFrame):
         except Exception as e:
             print(f"Error updating textbox content: {e}") # Log potential errors
 
-    def update_attachment_list(self):
-        """Delegates list update to the subframe."""
+    def refresh_from_vars(self):
+        """Sets every textbox from its variable (once, after a bulk variable update)."""
+        for key, widget in self.detail_widgets.items():
+            if isinstance(widget, ctk.CTkTextbox): _set_textbox_text(widget, self.near_miss_vars[key].get())
+
+    def commit_textboxes(self):
+        """Writes multi-line textbox text to its variable now (normally done on focus-out)."""
+        for key, widget in self.detail_widgets.items():
+            if isinstance(widget, ctk.CTkTextbox):
+                text = widget.get("1.0", "end-1c")
+                if self.near_miss_vars[key].get() != text: self.near_miss_vars[key].set(text)
+
+    def update_attachment_list(self, attachments_ref=None):
+        """Delegates list update to the subframe (pointing it at another report's list if given)."""
+        if attachments_ref is not None: self.attachments_ref = attachments_ref
         if hasattr(self, 'link_frame'):
-            self.link_frame.update_link_list()
+            self.link_frame.update_link_list(attachments_ref)
 
 # --- Action Points Frame ---
 class ActionPointsFrame(ctk.CTkFrame):
     """Frame containing the textbox for Action Points."""
     def __init__(self, master, app_controller, text_variable, label_text):
-        super().__init__(master, fg_color=BACKGROUND_COLOR)
+        super().__init__(master, fg_color=app_controller.styles.colors["background"])
         self.app = app_controller
+        styles = app_controller.styles
         self.text_variable = text_variable # Use this to sync data
         self.textbox = None # Initialize textbox reference
 
@@ -1038,11 +1489,11 @@ class ActionPointsFrame(ctk.CTkFrame):
         self.grid_columnconfigure(0, weight=1)
 
         # Label
-        label = ctk.CTkLabel(self, text=label_text, font=self.app.section_header_font, anchor="w", text_color=SECONDARY_COLOR)
+        label = ctk.CTkLabel(self, text=label_text, **styles.section_label)
         label.grid(row=0, column=0, sticky="ew", padx=15, pady=(15, 10))
 
         # Textbox
-        self.textbox = ctk.CTkTextbox(self, wrap=tk.WORD, font=self.app.answer_font, border_width=1, corner_radius=5, border_color=PRIMARY_COLOR)
+        self.textbox = ctk.CTkTextbox(self, **styles.textbox)
         self.textbox.grid(row=1, column=0, sticky="nsew", padx=15, pady=(0, 15))
 
         # Initial population and bindings
@@ -1060,6 +1511,7 @@ class ActionPointsFrame(ctk.CTkFrame):
 
     def _on_var_write(self, *args):
         """Update textbox content if the variable changes externally."""
+        if self.app._bulk_update: return # refresh_from_vars() runs once at the end of the batch
         if self.textbox:
             current_text = self.textbox.get("1.0", "end-1c")
             new_text = self.text_variable.get()
@@ -1083,6 +1535,10 @@ class ActionPointsFrame(ctk.CTkFrame):
                 except tk.TclError: pass
 
 
+    def refresh_from_vars(self):
+        """Sets the textbox from the variable (once, after a bulk variable update)."""
+        if self.textbox: _set_textbox_text(self.textbox, self.text_variable.get())
+
     def get_text(self):
         """Safely get text from the textbox."""
         return self.textbox.get("1.0", "end-1c") if self.textbox else ""
@@ -1112,64 +1568,88 @@ class ActionPointsFrame(ctk.CTkFrame):
 class LinkAttachmentFrame(ctk.CTkFrame):
     """Frame holding the label and the subframe for managing general links."""
     def __init__(self, master, app_controller, attachment_list_ref, label_text):
-         super().__init__(master, fg_color=BACKGROUND_COLOR)
+         super().__init__(master, fg_color=app_controller.styles.colors["background"])
          self.app=app_controller; self.attachments_ref=attachment_list_ref; self.label_text=label_text
          # Configure grid
          self.grid_rowconfigure(1, weight=1); self.grid_columnconfigure(0, weight=1)
          # Section Label
-         ctk.CTkLabel(self, text=self.label_text, font=self.app.section_header_font, text_color=SECONDARY_COLOR).grid(row=0, column=0, sticky="w", pady=(15, 10), padx=15)
+         ctk.CTkLabel(self, text=self.label_text, **self.app.styles.section_label).grid(row=0, column=0, sticky="w", pady=(15, 10), padx=15)
          # Embed the subframe
          self.link_subframe = LinkAttachmentSubFrame(self, self.app, self.attachments_ref, is_near_miss=False)
          self.link_subframe.grid(row=1, column=0, sticky="nsew", padx=15, pady=(0,15))
 
-    def update_link_list(self):
-         """Delegates update action to the embedded subframe."""
+    def update_link_list(self, attachments_ref=None):
+         """Delegates update action to the embedded subframe (pointing it at another report's list if given)."""
+         if attachments_ref is not None: self.attachments_ref = attachments_ref
          if hasattr(self, 'link_subframe'):
-             self.link_subframe.update_link_list()
+             self.link_subframe.update_link_list(attachments_ref)
 
 # --- Link Attachment Sub-Frame (Reusable UI) ---
+LINK_ROW_HEIGHT = 28 # Height of one link row button (plus LINK_ROW_PADY above and below)
+LINK_ROW_PADY = 1
+LINK_STATE_MARKS = {"ok": "✓", "restricted": "!", "broken": "✗", "invalid": "✗", "unreachable": "?"} # Row prefix after a link check
+LINK_PROBLEM_STATES = {"restricted", "broken", "invalid"}
+
 class LinkAttachmentSubFrame(ctk.CTkFrame):
-    """Internal reusable frame managing the list display and buttons for links."""
+    """Internal reusable frame managing the list display and buttons for links.
+
+    The list is virtualized: only the rows that fit the visible height exist as widgets, and those
+    pooled buttons are re-pointed at other links while scrolling. The URLs stay in the report's list
+    (attachments_ref); _link_index mirrors it as an ordered set for O(1) duplicate checks.
+    """
     def __init__(self, master, app_controller, attachment_list_ref, is_near_miss=False):
         super().__init__(master, fg_color="transparent") # Transparent background
         self.app = app_controller
         self.attachments_ref = attachment_list_ref # Reference to the actual list
         self.is_near_miss = is_near_miss
+        styles = app_controller.styles
 
         # Configure grid
         self.grid_rowconfigure(0, weight=1); self.grid_columnconfigure(0, weight=1)
 
         # Container for the list with a border
-        list_container = ctk.CTkFrame(self, border_width=1, corner_radius=5, border_color=PRIMARY_COLOR)
+        list_container = ctk.CTkFrame(self, border_width=1, corner_radius=5, border_color=styles.colors["primary"])
         list_container.grid(row=0, column=0, sticky="nsew", pady=(0, 10))
         list_container.grid_rowconfigure(0, weight=1); list_container.grid_columnconfigure(0, weight=1)
 
-        # Scrollable frame for links
-        self.link_list_frame = ctk.CTkScrollableFrame(list_container, fg_color="transparent",
-                                                      scrollbar_button_color=PRIMARY_COLOR,
-                                                      scrollbar_button_hover_color=ACCENT_COLOR)
-        self.link_list_frame.grid(row=0, column=0, sticky="nsew")
+        # Fixed-size frame for the pooled rows (no propagation, so adding rows never resizes it)
+        self.link_list_frame = ctk.CTkFrame(list_container, fg_color="transparent", height=200)
+        self.link_list_frame.grid(row=0, column=0, sticky="nsew", padx=(3, 0), pady=3)
         self.link_list_frame.grid_columnconfigure(0, weight=1) # Make links expand width
+        self.link_list_frame.grid_propagate(False)
+        self.link_list_frame.bind("<Configure>", self._on_list_resize, add="+")
+        self.scrollbar = ctk.CTkScrollbar(list_container, command=self._on_scrollbar,
+                                          button_color=styles.colors["primary"], button_hover_color=styles.colors["accent"])
+        self.scrollbar.grid(row=0, column=1, sticky="ns", padx=(0, 3), pady=3)
+        self._bind_mouse_wheel(self.link_list_frame)
 
         # Frame for buttons below the list
         button_frame = ctk.CTkFrame(self, fg_color="transparent")
         button_frame.grid(row=1, column=0, sticky="w", pady=(0,5))
 
         # Add Link Button (Green)
-        add_button = ctk.CTkButton(button_frame, text="Add Link...", command=self.add_link,
-                                   font=self.app.button_font, width=120,
-                                   fg_color=PRIMARY_COLOR, hover_color=ACCENT_COLOR, text_color=TEXT_ON_PRIMARY)
+        add_button = ctk.CTkButton(button_frame, text="Add Link...", command=self.add_link, width=120, **styles.primary_button)
         add_button.pack(side=tk.LEFT, padx=(0, 10))
 
         # Remove Link Button (Blue)
         self.remove_button = ctk.CTkButton(button_frame, text="Remove Selected", command=self.remove_selected_link,
-                                           font=self.app.button_font, width=120, state=tk.DISABLED, # Start disabled
-                                           fg_color=SECONDARY_COLOR, hover_color="#2C5D8F", text_color=TEXT_ON_SECONDARY)
+                                           width=120, state=tk.DISABLED, **styles.secondary_button) # Start disabled
         self.remove_button.pack(side=tk.LEFT)
 
-        # State tracking for selection
-        self.selected_link_widget = None
-        self.link_widgets = [] # Keep track of created link widgets
+        # Check Links Button (Blue): reachability and sharing of every link, in the background
+        self.check_button = ctk.CTkButton(button_frame, text="Check Links", command=self.check_links, width=120,
+                                          **styles.secondary_button)
+        self.check_button.pack(side=tk.LEFT, padx=(10, 0))
+
+        # State tracking for selection (by URL, so it survives scrolling) and the row pool
+        self.selected_url = None
+        self.selected_link_widget = None # Row button currently showing the selected link (None if scrolled out of view)
+        self._link_index = {} # url -> None, in list order
+        self._link_results = {} # url -> LinkStatus from this list's last "Check Links"
+        self._row_pool = [] # Slot i shows link number self._first_row + i
+        self._row_shown = [] # (url, selected, link check state) drawn in each slot; None while the slot is hidden
+        self._first_row = 0
+        self._visible_rows = 0 # Set from the list height on <Configure>
 
         self.update_link_list() # Initial population
 
@@ -1186,9 +1666,11 @@ class LinkAttachmentSubFrame(ctk.CTkFrame):
                  messagebox.showwarning("Invalid Link", "URL must start with http:// or https://", parent=self.app)
                  return
              # Add if not duplicate
-             if url not in self.attachments_ref:
+             if url not in self._link_index:
                  self.attachments_ref.append(url)
-                 self.update_link_list() # Refresh UI
+                 self._link_index[url] = None
+                 self.app.on_attachments_changed(self.is_near_miss)
+                 self._scroll_to(len(self.attachments_ref)) # Show the new link (only changed rows are redrawn)
                  self.app.status_var.set(f"{context} link added.")
              else:
                  messagebox.showinfo("Duplicate Link", f"This link has already been added for {context.lower()} evidence.", parent=self.app)
@@ -1196,12 +1678,14 @@ class LinkAttachmentSubFrame(ctk.CTkFrame):
     def remove_selected_link(self):
         """Removes the currently selected link from the list."""
         context = "Near Miss" if self.is_near_miss else "General"
-        if self.selected_link_widget and hasattr(self.selected_link_widget, "_url_reference"):
-            url_to_remove = self.selected_link_widget._url_reference
-            if url_to_remove in self.attachments_ref:
+        url_to_remove = self.selected_url
+        if url_to_remove is not None:
+            if url_to_remove in self._link_index:
                  try:
                      self.attachments_ref.remove(url_to_remove)
-                     self.update_link_list() # Refresh UI, also disables button
+                     del self._link_index[url_to_remove]
+                     self.app.on_attachments_changed(self.is_near_miss)
+                     self._set_selection(None)
                      self.app.status_var.set(f"{context} link removed.")
                  except ValueError: # Should not happen if UI is synced
                      messagebox.showerror("Error", "Could not remove link (internal list mismatch).", parent=self.app)
@@ -1217,65 +1701,299 @@ class LinkAttachmentSubFrame(ctk.CTkFrame):
 
     def _on_link_select(self, clicked_widget, url):
         """Handles visual selection of a link in the list."""
-        # Get default text color from theme for deselection
-        default_text_color = ctk.ThemeManager.theme["CTkLabel"]["text_color"]
-
-        # Deselect previously selected widget (if any)
-        if self.selected_link_widget and self.selected_link_widget != clicked_widget:
-            try: # Add try-except in case widget was destroyed unexpectedly
-                self.selected_link_widget.configure(fg_color="transparent", text_color=default_text_color)
-            except tk.TclError: pass # Ignore if widget doesn't exist anymore
-
-        # Select the new widget
-        # Use button text color from theme for better contrast on selection background
-        # Get button text color safely
-        try:
-            select_text_color = ctk.ThemeManager.theme["CTkButton"]["text_color"]
-        except KeyError:
-             select_text_color = ("#000000", "#FFFFFF") # Fallback black/white
-
-        clicked_widget.configure(fg_color=ACCENT_COLOR, text_color=select_text_color) # Use accent green for select BG
-
-        # Update state
+        self._set_selection(url) # Redraws only the previously selected row and this one
         self.selected_link_widget = clicked_widget
         self.remove_button.configure(state=tk.NORMAL) # Enable remove button
+        status = self._link_status(url)
+        if status is not None:
+            from link_check import STATE_LABELS # Already loaded: there is a status
+            self.app.status_var.set(f"Link check: {STATE_LABELS[status.state]} - {status.detail}")
+
+    def _set_selection(self, url):
+        self.selected_url = url
+        if url is None: self.remove_button.configure(state=tk.DISABLED)
+        self._render_rows()
+
+    def update_link_list(self, attachments_ref=None):
+         """Re-syncs the list with attachments_ref after it was replaced (load/clear); clears the selection.
+
+         `attachments_ref` points the list at another report's list (switching between open reports).
+         """
+         if attachments_ref is not None: self.attachments_ref = attachments_ref
+         self._link_index = dict.fromkeys(self.attachments_ref)
+         self._first_row = 0
+         self._set_selection(None) # Rows whose link is unchanged are not redrawn
+
+    # --- Link check ---
+    def check_links(self):
+        """Checks every link in a worker thread (see link_check.py); each row then shows its result."""
+        if not self.attachments_ref:
+            self.app.status_var.set("No links to check.")
+            return
+        urls = list(self.attachments_ref)
+        self.check_button.configure(state=tk.DISABLED)
+        self.app.status_var.set(f"Checking {len(urls)} link(s)...")
+        future = self.app._background_pool.submit(self.app.get_link_checker().check, urls)
+        self.after(100, lambda: self._poll_link_check(future))
+
+    def _poll_link_check(self, future):
+        if not self.winfo_exists(): return
+        if not future.done():
+            self.after(100, lambda: self._poll_link_check(future))
+            return
+        self.check_button.configure(state=tk.NORMAL)
+        try:
+            results = future.result()
+        except Exception as e:
+            self.app.status_var.set(f"Link check failed: {e}")
+            return
+        from link_check import summarize
+        self._link_results.update(results)
+        self._render_rows()
+        note = " No link could be reached - are you offline?" if all(s.state == "unreachable" for s in results.values()) else ""
+        self.app.status_var.set(f"Link check: {summarize(results.values())}.{note}")
+
+    def _link_status(self, url):
+        """Result of the last check of this list, else a fresh cached one (None if never checked)."""
+        status = self._link_results.get(url)
+        if status is None and self.app.link_checker is not None: status = self.app.link_checker.cached(url)
+        return status
+
+    def _link_state(self, url):
+        status = self._link_status(url)
+        return status.state if status is not None else None
+
+    # --- Virtualized rows ---
+    def _make_row(self, slot):
+        """Creates pooled row button number `slot` (hidden until _render_rows gives it a link)."""
+        row = ctk.CTkButton(self.link_list_frame, text=" ", font=self.app.answer_font, height=LINK_ROW_HEIGHT,
+                            anchor="w", hover=False, corner_radius=3, **self.app.styles.link_row[False]) # Looks like a label
+        row._url_reference = None # URL currently shown in this row
+        row.configure(command=lambda w=row: self._on_link_select(w, w._url_reference))
+        row.grid(row=slot, column=0, sticky="ew", padx=5, pady=LINK_ROW_PADY)
+        row.grid_remove()
+        self._bind_mouse_wheel(row)
+        return row
+
+    def _render_rows(self):
+        """Shows links _first_row onwards in the pooled rows; only rows whose link or selection changed are touched."""
+        urls = self.attachments_ref
+        self._first_row = max(0, min(self._first_row, len(urls) - self._visible_rows))
+        while len(self._row_pool) < min(self._visible_rows, len(urls)):
+            self._row_pool.append(self._make_row(len(self._row_pool)))
+            self._row_shown.append(None)
+        self.selected_link_widget = None
+        for slot, row in enumerate(self._row_pool):
+            index = self._first_row + slot
+            if slot < self._visible_rows and index < len(urls):
+                shown = (urls[index], urls[index] == self.selected_url, self._link_state(urls[index]))
+                if self._row_shown[slot] != shown:
+                    row._url_reference = shown[0]
+                    styles = self.app.styles
+                    colors = styles.link_row_problem if shown[2] in LINK_PROBLEM_STATES and not shown[1] else styles.link_row[shown[1]]
+                    row.configure(text=f"{LINK_STATE_MARKS[shown[2]]}  {shown[0]}" if shown[2] else shown[0], **colors)
+                    if self._row_shown[slot] is None: row.grid()
+                    self._row_shown[slot] = shown
+                if shown[1]: self.selected_link_widget = row
+            elif self._row_shown[slot] is not None:
+                row.grid_remove()
+                self._row_shown[slot] = None
+        count = len(urls)
+        if count > self._visible_rows:
+            self.scrollbar.set(self._first_row / count, (self._first_row + self._visible_rows) / count)
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+    def _scroll_to(self, first_row):
+        """Scrolls so link number `first_row` is the top row (clamped to the list)."""
+        self._first_row = first_row
+        self._render_rows() # Clamps, and redraws only the rows that now show another link
+
+    def _on_list_resize(self, event):
+        row_height = (self._row_pool[0].winfo_reqheight() if self._row_pool else LINK_ROW_HEIGHT) + 2 * LINK_ROW_PADY
+        visible = max(1, event.height // row_height)
+        if visible != self._visible_rows:
+            self._visible_rows = visible
+            self._render_rows()
+
+    def _on_scrollbar(self, action, amount, unit="units"):
+        if action == "moveto":
+            self._scroll_to(round(float(amount) * len(self.attachments_ref)))
+        elif action == "scroll":
+            self._scroll_to(self._first_row + int(amount) * (self._visible_rows if unit == "pages" else 1))
+
+    def _on_mouse_wheel(self, event):
+        if event.num in (4, 5): rows = -3 if event.num == 4 else 3 # X11 wheel buttons
+        elif sys.platform == "darwin": rows = -event.delta
+        else: rows = -int(event.delta / 40) # Windows: 120 per notch
+        self._scroll_to(self._first_row + rows)
+
+    def _bind_mouse_wheel(self, widget):
+        for sequence in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            widget.bind(sequence, self._on_mouse_wheel, add="+")
+
+
+# --- Compliance Dashboard Window ---
+class ComplianceWindow(ctk.CTkToplevel):
+    """Shows a ComplianceSummary (see compliance.py) as tables, with export to Excel."""
+    def __init__(self, master, summary, folder, skipped=0):
+        super().__init__(master, fg_color=master.styles.colors["background"])
+        self.app = master
+        self.summary = summary
+        self.title(f"Compliance Dashboard - {os.path.basename(folder)}")
+        self.geometry("1000x600")
+        self.grid_columnconfigure(0, weight=1)
+        self.grid_rowconfigure(1, weight=1)
 
-    def update_link_list(self):
-         """Clears and repopulates the list of links."""
-         # Clear previous widgets safely
-         for widget in self.link_list_frame.winfo_children():
-             # Destroy only the buttons we added
-             if isinstance(widget, ctk.CTkButton):
-                 try:
-                     widget.destroy()
-                 except tk.TclError: pass # Ignore if already gone
-         self.link_widgets.clear()
-         self.selected_link_widget = None
-         self.remove_button.configure(state=tk.DISABLED) # Disable remove button
-
-         # Get default text color safely
-         try:
-            default_text_color = ctk.ThemeManager.theme["CTkLabel"]["text_color"]
-         except KeyError:
-             default_text_color = ("#000000", "#FFFFFF") # Fallback
-
-         # Add new link widgets (using CTkButton styled as labels)
-         for i, url in enumerate(self.attachments_ref):
-              # Create button, initially looks like label
-              link_widget = ctk.CTkButton(
-                  self.link_list_frame, text=url, font=self.app.answer_font,
-                  anchor="w", # Left align text
-                  fg_color="transparent", # No background
-                  text_color=default_text_color,
-                  hover=False, # No hover effect
-                  corner_radius=3
-              )
-              link_widget._url_reference = url # Store the URL data with the widget
-              # Set command AFTER creating widget to avoid recursion issues
-              link_widget.configure(command=lambda w=link_widget, u=url: self._on_link_select(w, u))
-              # Grid the widget
-              link_widget.grid(row=i, column=0, sticky="ew", padx=5, pady=1) # Grid with small padding
-              self.link_widgets.append(link_widget)
+        from compliance import report_score
+        current_pct, current_failures = report_score(master.report)
+        current = f"{current_pct:.1f}%" if current_pct is not None else "not answered"
+        overall = f"{summary.overall_pct:.1f}%" if summary.overall_pct == summary.overall_pct else "n/a"
+        header = (f"{summary.report_count} reports from {len(summary.warehouses)} warehouses ({skipped} skipped)   |   "
+                  f"Overall compliance: {overall}   |   Open report: {current}, {current_failures} mandatory No")
+        ctk.CTkLabel(self, text=header, font=master.metadata_label_font, anchor="w").grid(row=0, column=0, sticky="ew", padx=15, pady=(12, 6))
+
+        tabs = ctk.CTkTabview(self, fg_color=master.styles.colors["background"], segmented_button_selected_color=master.styles.colors["primary"])
+        tabs.grid(row=1, column=0, sticky="nsew", padx=10, pady=0)
+        pct = lambda v: "" if v != v else f"{v:.1f}"
+
+        self._table(tabs.add("Sections"), ["Warehouse", "Reports", "Overall %"] + summary.sections,
+                    [[wh, int(summary.report_counts[w]), pct(summary.warehouse_pct[w])] + [pct(v) for v in summary.section_pct[w]]
+                     for w, wh in enumerate(summary.warehouses)] +
+                    [["All Warehouses", summary.report_count, pct(summary.overall_pct)] + [pct(v) for v in summary.overall_section_pct]])
+        failures = sorted(((int(n), q) for q, n, m in zip(summary.questions, summary.question_failures, summary.mandatory) if m), reverse=True)
+        self._table(tabs.add("Mandatory Failures"), ["Reports Answering No", "Mandatory Question"], [[n, q] for n, q in failures],
+                    widths=[150, 700])
+        self._table(tabs.add("Monthly Trend"), ["Compliance %"] + summary.months,
+                    [["All Warehouses"] + [pct(v) for v in summary.monthly_pct],
+                     ["Change vs. previous month"] + [pct(v) for v in summary.monthly_change]] +
+                    [[wh] + [pct(v) for v in summary.warehouse_monthly_pct[w]] for w, wh in enumerate(summary.warehouses)])
+
+        export_button = ctk.CTkButton(self, text="Export Sheet (.xlsx)...", command=self.export_sheet,
+                                      state=tk.NORMAL if OPENPYXL_AVAILABLE else tk.DISABLED, **master.styles.secondary_button)
+        export_button.grid(row=2, column=0, sticky="e", padx=15, pady=10)
+
+    def _table(self, parent, columns, rows, widths=None):
+        """Read-only table (ttk.Treeview) filling `parent`, first column left-aligned."""
+        parent.grid_columnconfigure(0, weight=1)
+        parent.grid_rowconfigure(0, weight=1)
+        ids = [f"c{i}" for i in range(len(columns))]
+        tree = ttk.Treeview(parent, columns=ids, show="headings")
+        for i, (col_id, title) in enumerate(zip(ids, columns)):
+            tree.heading(col_id, text=title)
+            width = widths[i] if widths else (200 if i == 0 else max(90, min(180, 7 * len(title))))
+            tree.column(col_id, width=width, anchor="w" if i == 0 or widths else "e", stretch=False)
+        for row in rows: tree.insert("", tk.END, values=row)
+        y_scroll = ttk.Scrollbar(parent, orient="vertical", command=tree.yview)
+        x_scroll = ttk.Scrollbar(parent, orient="horizontal", command=tree.xview)
+        tree.configure(yscrollcommand=y_scroll.set, xscrollcommand=x_scroll.set)
+        tree.grid(row=0, column=0, sticky="nsew")
+        y_scroll.grid(row=0, column=1, sticky="ns")
+        x_scroll.grid(row=1, column=0, sticky="ew")
+
+    def export_sheet(self):
+        file_path = filedialog.asksaveasfilename(parent=self, defaultextension=".xlsx", filetypes=[("Excel Files", "*.xlsx")],
+                                                 initialfile="Compliance_Summary.xlsx", title="Export Compliance Sheet")
+        if not file_path: return
+        from exporters import export_compliance_excel
+        try:
+            export_compliance_excel(self.summary, file_path)
+        except ExportError as e:
+            messagebox.showerror("Save Error", str(e), parent=self)
+            return
+        self.app.status_var.set(f"Exported: {os.path.basename(file_path)}")
+
+
+# --- Report Search Window ---
+class SearchWindow(ctk.CTkToplevel):
+    """Full-text search over a folder's project files (see search_index.py). Double-click a match to open it."""
+    SEARCH_DELAY_MS = 150 # Typing pause before searching
+
+    def __init__(self, master, folder):
+        super().__init__(master, fg_color=master.styles.colors["background"])
+        self.app = master
+        self.folder = folder
+        self.index = None
+        self._search_job = None
+        self.title(f"Search Reports - {os.path.basename(folder)}")
+        self.geometry("1000x550")
+        self.grid_columnconfigure(0, weight=1)
+        self.grid_rowconfigure(1, weight=1)
+
+        self.query_var = tk.StringVar()
+        entry = ctk.CTkEntry(self, textvariable=self.query_var, font=master.metadata_entry_font) # Words, e.g. "forklift spill"
+        entry.grid(row=0, column=0, sticky="ew", padx=(15, 5), pady=(12, 6))
+        entry.bind("<Return>", lambda event: self.run_search())
+        entry.focus_set()
+        self.query_var.trace_add("write", lambda *args: self._schedule_search())
+        ctk.CTkButton(self, text="Refresh Index", command=self.refresh_index, width=120,
+                      **master.styles.secondary_button).grid(row=0, column=1, padx=(5, 15), pady=(12, 6))
+
+        frame = ctk.CTkFrame(self, fg_color=master.styles.colors["background"])
+        frame.grid(row=1, column=0, columnspan=2, sticky="nsew", padx=10)
+        frame.grid_columnconfigure(0, weight=1)
+        frame.grid_rowconfigure(0, weight=1)
+        columns = [("date", "Report Date", 100), ("warehouse", "Warehouse", 160), ("field", "Field", 260), ("snippet", "Match", 460)]
+        self.tree = ttk.Treeview(frame, columns=[c[0] for c in columns], show="headings")
+        for col_id, title, width in columns:
+            self.tree.heading(col_id, text=title)
+            self.tree.column(col_id, width=width, anchor="w", stretch=col_id == "snippet")
+        y_scroll = ttk.Scrollbar(frame, orient="vertical", command=self.tree.yview)
+        self.tree.configure(yscrollcommand=y_scroll.set)
+        self.tree.grid(row=0, column=0, sticky="nsew")
+        y_scroll.grid(row=0, column=1, sticky="ns")
+        self.tree.bind("<Double-1>", self._open_selected)
+        self._paths = {} # Treeview item -> project file path
+
+        self.status_var = tk.StringVar()
+        ctk.CTkLabel(self, textvariable=self.status_var, font=master.status_font, anchor="w").grid(
+            row=2, column=0, columnspan=2, sticky="ew", padx=15, pady=(4, 10))
+        self.refresh_index()
+
+    # --- Index ---
+    def refresh_index(self):
+        """Loads/refreshes the folder's index in a worker thread; the previous index stays searchable meanwhile."""
+        self.status_var.set("Indexing reports...")
+        from search_index import SearchIndex
+        future = self.app._background_pool.submit(SearchIndex.open, self.folder, template=self.app.report.template)
+        self.after(100, lambda: self._poll_index(future))
+
+    def _poll_index(self, future):
+        if not self.winfo_exists(): return
+        if not future.done():
+            self.after(100, lambda: self._poll_index(future))
+            return
+        try:
+            self.index, changed = future.result()
+        except Exception as e:
+            self.status_var.set(f"Indexing failed: {e}")
+            return
+        self.status_var.set(f"{len(self.index)} reports indexed ({changed} updated).")
+        if self.query_var.get().strip(): self.run_search()
+
+    # --- Searching ---
+    def _schedule_search(self):
+        if self._search_job is not None: self.after_cancel(self._search_job)
+        self._search_job = self.after(self.SEARCH_DELAY_MS, self.run_search)
+
+    def run_search(self):
+        self._search_job = None
+        if self.index is None: return # Runs when indexing finishes
+        query = self.query_var.get()
+        start = time.perf_counter()
+        hits = self.index.search(query)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        self.tree.delete(*self.tree.get_children())
+        self._paths = {}
+        for hit in hits:
+            item = self.tree.insert("", tk.END, values=(hit.report_date, hit.warehouse, hit.field, hit.snippet))
+            self._paths[item] = hit.path
+        if query.strip():
+            self.status_var.set(f"{len(hits)} match(es) in {elapsed_ms:.1f} ms across {len(self.index)} reports.")
+
+    def _open_selected(self, event=None):
+        item = self.tree.focus()
+        if item in self._paths: self.app.load_project(self._paths[item])
 
 
 # ==============================================================================
@@ -1284,7 +2002,7 @@ class LinkAttachmentSubFrame(ctk.CTkFrame):
 if __name__ == "__main__":
     # Recommended: Add error handling for app initialization itself
     try:
-        app = WarehouseSafetyApp()
+        app = WarehouseSafetyApp(sys.argv[1:]) # Project files only; other arguments went to cli.main above
         app.mainloop()
     except Exception as e:
         print(f"FATAL ERROR: Could not start application.\n{e}")
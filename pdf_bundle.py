@@ -0,0 +1,197 @@
+# pdf_bundle.py - One PDF per warehouse plus a bookmarked master PDF, rendered across a process pool
+#
+# Usage:
+#   python pdf_bundle.py <project_dir> --out bundle/
+#   python pdf_bundle.py <project_dir> --out bundle/ --workers 8 --recursive --template my_template.json
+#
+# Writes SafetyReports_<Warehouse>.pdf for every warehouse and SafetyReports_All.pdf with one bookmark
+# per warehouse and the reports nested below it. Each report's pages are the same as its single
+# "Export Report" PDF. The master is merged from the warehouse files with 'pypdf' (Requirement.txt);
+# without it the master is rendered once more in this process (same pages, just slower).
+#
+# Files are grouped by their metadata alone (compact files only decode their header); each worker then
+# reads, validates and renders its own warehouse's files, so no file is parsed twice.
+
+import argparse
+import importlib.util
+import os
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from checklist_template import TemplateError
+from consolidate import DEFAULT_PATTERN, iter_project_files
+from project_schema import iter_reports
+from report_core import ProjectFileError, read_project_metadata, resolve_template, safe_file_name, warehouse_key
+
+PYPDF_AVAILABLE = importlib.util.find_spec("pypdf") is not None
+FILE_PREFIX = "SafetyReports"
+MASTER_FILE = f"{FILE_PREFIX}_All.pdf"
+
+
+def group_by_warehouse(file_paths):
+    """Groups files by the warehouse in their metadata. Returns ([(warehouse, [path, ...]), ...], errors), both sorted.
+
+    Warehouses are matched on report_core.warehouse_key() like the consolidated workbook, and shown
+    with the spelling of their earliest report. Reports within a warehouse are ordered by report date. Only the
+    metadata is read (validation happens when a worker loads the reports), and only paths are kept.
+    """
+    groups, errors = {}, []
+    for path in file_paths:
+        try:
+            metadata = read_project_metadata(path)
+        except ProjectFileError as e:
+            errors.append((path, [str(e)]))
+            continue
+        name = str(metadata.get("Warehouse Name") or "").strip() or "Unknown"
+        groups.setdefault(warehouse_key(name), []).append((str(metadata.get("Report Date") or ""), path, name))
+    ordered = []
+    for key in sorted(groups):
+        reports = sorted(groups[key])
+        ordered.append((reports[0][2], [path for _, path, _ in reports]))
+    return ordered, sorted(errors)
+
+def warehouse_pdf_name(warehouse, used):
+    """File name of one warehouse's PDF, unique within a bundle.
+
+    Characters that are unsafe in file names become "_", so "WH 1" and "WH_1" would share a name;
+    later ones get _2, _3, ... (compared case-insensitively for Windows and macOS). `used` holds the
+    lower-cased names taken so far (including the master) and is updated.
+    """
+    base = f"{FILE_PREFIX}_{safe_file_name(warehouse) or 'UnknownWH'}"
+    name, n = f"{base}.pdf", 2
+    while name.lower() in used:
+        name, n = f"{base}_{n}.pdf", n + 1
+    used.add(name.lower())
+    return name
+
+def report_title(report, file_path):
+    """Bookmark title for a report: its date, plus the file name to tell same-day reports apart."""
+    date = report.metadata.get("Report Date") or "No date"
+    return f"{date} ({os.path.basename(file_path)})"
+
+def _load_reports(paths, template):
+    """Validated (report, title) pairs of the files that load, and [(path, [problems])] for the rest."""
+    reports, errors = [], []
+    for result in iter_reports(paths, template):
+        if result.errors: errors.append((result.path, [str(p) for p in result.errors]))
+        else: reports.append((result.report, report_title(result.report, result.path)))
+    return reports, errors
+
+def _render_warehouse(task):
+    """Worker: validates and renders one warehouse's reports into its PDF.
+
+    Returns (warehouse, out_path, starts, page_count, errors); out_path is None (and no file is written)
+    if none of the warehouse's files are valid.
+    """
+    warehouse, paths, out_path, template_path = task
+    from exporters import export_reports_pdf # Imported in the worker process
+    reports, errors = _load_reports(paths, resolve_template(template_path))
+    if not reports: return warehouse, None, [], 0, errors
+    starts, pages = export_reports_pdf([(None, reports)], out_path)
+    return warehouse, out_path, starts, pages, errors
+
+def render_warehouses(tasks, workers=None, max_pending=None):
+    """Renders warehouse PDFs across a process pool, yielding results in task order.
+
+    At most `max_pending` tasks are queued or running at once (default: 2 per worker), so a
+    large batch never holds more than a few warehouses' reports in memory.
+    """
+    if workers == 1:
+        for task in tasks: yield _render_warehouse(task)
+        return
+    limit = max_pending or 2 * (workers or os.cpu_count() or 1)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for task in tasks:
+            if len(pending) >= limit:
+                yield pending.popleft().result()
+            pending.append(pool.submit(_render_warehouse, task))
+        while pending:
+            yield pending.popleft().result()
+
+def merge_master(results, master_path):
+    """Concatenates the warehouse PDFs into the master, with a bookmark per warehouse and per report."""
+    from pypdf import PdfWriter
+    writer = PdfWriter()
+    for warehouse, path, starts, _, _ in results:
+        offset = len(writer.pages)
+        writer.append(path, import_outline=False)
+        parent = writer.add_outline_item(warehouse, offset)
+        for title, page in starts:
+            writer.add_outline_item(title, offset + page - 1, parent=parent)
+    writer.page_mode = "/UseOutlines"
+    tmp_path = master_path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        writer.write(f)
+    os.replace(tmp_path, master_path)
+
+def render_master(groups, master_path, template_path=None):
+    """Fallback without pypdf: renders every report into the master directly.
+
+    Reports are loaded one at a time as the story is built, but the story itself still grows with
+    the batch; merge_master() is the bounded path.
+    """
+    from exporters import export_reports_pdf
+    template = resolve_template(template_path)
+    def valid_reports(paths):
+        for result in iter_reports(paths, template):
+            if not result.errors: yield result.report, report_title(result.report, result.path)
+    export_reports_pdf(((wh, valid_reports(paths)) for wh, paths in groups), master_path)
+
+def bundle_directory(directory, out_dir, pattern=DEFAULT_PATTERN, recursive=False, workers=None, template_path=None,
+                     progress=print):
+    """Writes one PDF per warehouse and the master PDF into `out_dir`.
+
+    Returns (warehouse_count, report_count, errors) where errors is a list of (file_path, [problems]).
+    """
+    resolve_template(template_path) # Validates the template (and fills its cache) before forking
+    groups, errors = group_by_warehouse(iter_project_files(directory, pattern, recursive))
+    os.makedirs(out_dir, exist_ok=True)
+    used_names = {MASTER_FILE.lower()}
+    tasks = [(wh, paths, os.path.join(out_dir, warehouse_pdf_name(wh, used_names)), template_path) for wh, paths in groups]
+
+    results = []
+    for result in render_warehouses(tasks, workers):
+        warehouse, path, starts, pages, problems = result
+        errors.extend(problems)
+        if path is None: continue
+        if progress: progress(f"{warehouse}: {len(starts)} report(s), {pages} page(s) -> {os.path.basename(path)}")
+        results.append(result)
+
+    if results:
+        master_path = os.path.join(out_dir, MASTER_FILE)
+        if PYPDF_AVAILABLE: merge_master(results, master_path)
+        else:
+            if progress: progress("pypdf not installed; rendering the master PDF directly (pip install pypdf to merge instead)")
+            render_master(groups, master_path, template_path)
+    return len(results), sum(len(starts) for _, _, starts, _, _ in results), sorted(errors)
+
+
+# ==============================================================================
+# Command Line
+# ==============================================================================
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render one PDF per warehouse plus a bookmarked master PDF.")
+    parser.add_argument("directory", help="Folder containing project .json files")
+    parser.add_argument("--out", required=True, help="Output folder (created if missing)")
+    parser.add_argument("--pattern", default=DEFAULT_PATTERN, help=f"File name pattern (default: {DEFAULT_PATTERN})")
+    parser.add_argument("--recursive", action="store_true", help="Also search sub-folders")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count, 1 = no pool)")
+    parser.add_argument("--template", default=None, help="Checklist template file (.json/.yaml); default: built-in checklist")
+    args = parser.parse_args(argv)
+
+    if not os.path.isdir(args.directory):
+        parser.error(f"not a directory: {args.directory}")
+    try:
+        warehouses, reports, errors = bundle_directory(args.directory, args.out, args.pattern, args.recursive,
+                                                       args.workers, args.template)
+    except TemplateError as e:
+        parser.error(str(e))
+    for path, problems in errors:
+        print(f"SKIPPED {path}: " + "; ".join(problems), file=sys.stderr)
+    print(f"Bundled {reports} report(s) from {warehouses} warehouse(s) into {args.out} ({len(errors)} skipped).")
+    return 1 if errors and not reports else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
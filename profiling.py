@@ -0,0 +1,135 @@
+# profiling.py - Optional timing instrumentation for startup, load, save and export
+#
+# Off by default. Turn it on with the WAREHOUSE_PROFILE environment variable or the --profile flag:
+#   python main.py --profile              spans -> Chrome trace JSON (open in chrome://tracing or ui.perfetto.dev)
+#   python main.py --profile=cprofile     cProfile stats of the main thread (python -m pstats <file>)
+#   WAREHOUSE_PROFILE=trace python main.py
+# Files are written on exit to PROFILE_DIR (or WAREHOUSE_PROFILE_DIR). In both modes the spans also
+# feed the status-bar readout of the last operation's duration.
+#
+# Instrumenting code:
+#   with span("load_project", file=name): ...
+#   @timed("export.pdf")
+#   def export(...): ...
+# While profiling is off, span() and @timed cost one flag check.
+
+import atexit
+import functools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+PROFILE_ENV_VAR = "WAREHOUSE_PROFILE" # "trace" or "cprofile" ("1" = trace)
+PROFILE_DIR_ENV_VAR = "WAREHOUSE_PROFILE_DIR"
+PROFILE_DIR = os.path.join(os.path.expanduser("~"), ".warehouse_safety", "profiles")
+PROFILE_MODES = ("trace", "cprofile")
+
+
+class Profiler:
+    """Collects timed spans (per thread, nested) and writes them, or cProfile stats, on exit."""
+    def __init__(self):
+        self.enabled = False
+        self.mode = None
+        self.out_dir = PROFILE_DIR
+        self.events = [] # Chrome trace "complete" events; list.append is thread-safe
+        self.last = None # (name, seconds) of the last finished top-level span, for the status bar
+        self._depth = threading.local()
+        self._thread_names = {}
+        self._cprofile = None
+
+    def enable(self, mode="trace", out_dir=None):
+        if mode not in PROFILE_MODES:
+            raise ValueError(f"unknown profile mode {mode!r} (use {' or '.join(PROFILE_MODES)})")
+        if self.enabled: return
+        self.enabled, self.mode = True, mode
+        self.out_dir = out_dir or os.environ.get(PROFILE_DIR_ENV_VAR) or PROFILE_DIR
+        if mode == "cprofile":
+            import cProfile
+            self._cprofile = cProfile.Profile()
+            self._cprofile.enable()
+        atexit.register(self.dump)
+
+    # --- Recording ---
+    def record(self, name, start, end, **args):
+        """Adds a span measured elsewhere (perf_counter() start/end), e.g. from process start to a milestone."""
+        if not self.enabled: return
+        thread = threading.current_thread()
+        self._thread_names.setdefault(thread.ident, thread.name)
+        event = {"name": name, "ph": "X", "ts": start * 1e6, "dur": (end - start) * 1e6, "pid": os.getpid(), "tid": thread.ident}
+        if args: event["args"] = {k: str(v) for k, v in args.items()}
+        self.events.append(event)
+        if not getattr(self._depth, "value", 0): self.last = (name, end - start)
+
+    @contextmanager
+    def span(self, name, **args):
+        """Times the body as one span. Nested spans show up nested in the trace."""
+        if not self.enabled:
+            yield
+            return
+        depth = getattr(self._depth, "value", 0)
+        self._depth.value = depth + 1
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            self._depth.value = depth
+            self.record(name, start, end, **args)
+
+    def timed(self, name=None):
+        """Decorator form of span(); the span is named after the function unless `name` is given."""
+        def decorate(func):
+            label = name or func.__qualname__
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled: return func(*args, **kwargs)
+                with self.span(label):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorate
+
+    # --- Output ---
+    def dump(self):
+        """Writes the trace JSON (trace mode) or .prof stats (cprofile mode). Returns the file path, or None."""
+        if not self.enabled: return None
+        stamp = time.strftime("%Y%m%d_%H%M%S")
+        try:
+            os.makedirs(self.out_dir, exist_ok=True)
+            if self.mode == "cprofile":
+                self._cprofile.disable()
+                path = os.path.join(self.out_dir, f"profile_{stamp}_{os.getpid()}.prof")
+                self._cprofile.dump_stats(path)
+            else:
+                path = os.path.join(self.out_dir, f"trace_{stamp}_{os.getpid()}.json")
+                names = [{"name": "thread_name", "ph": "M", "pid": os.getpid(), "tid": tid, "args": {"name": thread_name}}
+                         for tid, thread_name in self._thread_names.items()]
+                with open(path, "w", encoding="utf-8") as f:
+                    json.dump({"traceEvents": names + self.events, "displayTimeUnit": "ms"}, f)
+        except OSError as e:
+            print(f"Warning: could not write profile ({e})")
+            return None
+        self.enabled = False # Written once, also if dump() runs again from atexit
+        print(f"Profile written to {path}")
+        return path
+
+
+PROFILER = Profiler()
+span, timed, record = PROFILER.span, PROFILER.timed, PROFILER.record
+
+def configure(argv, environ=os.environ):
+    """Enables profiling from --profile[=mode] in argv or WAREHOUSE_PROFILE. Returns argv without the flag."""
+    mode, rest = environ.get(PROFILE_ENV_VAR, "").strip().lower() or None, []
+    for arg in argv:
+        if arg == "--profile" or arg.startswith("--profile="):
+            mode = arg.partition("=")[2] or "trace"
+        else:
+            rest.append(arg)
+    if mode in ("0", "off", "no", "false"): mode = None
+    if mode:
+        try:
+            PROFILER.enable("trace" if mode in ("1", "on", "yes", "true") else mode)
+        except ValueError as e:
+            print(f"Warning: profiling disabled ({e})")
+    return rest
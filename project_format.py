@@ -0,0 +1,219 @@
+# project_format.py - Compact binary project files (.wsc), an alternative to the JSON project format
+#
+# Layout:
+#   b"WSCP" | format version (1 byte) | header length (uint32, little endian) | header | section data
+# The header is uncompressed JSON with the metadata, the template hash/name, the question ids of that
+# template and the byte range of each section. Sections are zlib-compressed JSON, written only when they
+# have content:
+#   checklist      answers as a list, by question index of the template that wrote the file
+#   near_miss      {"details": {...}, "attachments": [...]}
+#   action_points  string
+#   links          general attachment URLs
+# Opening a file only parses the header; each section is decompressed the first time it is read.
+# Answers are mapped by question id when the file is read with another template, so a file stays
+# readable without the template that wrote it (files written before the ids were stored need that
+# template: the built-in checklist or the compiled template cache). Anything malformed raises
+# ProjectFileError. read_project_file()/write_project_file() in report_core pick the format by magic
+# bytes / file extension, so every tool handles both.
+
+import json
+import os
+import pickle
+import struct
+import zlib
+
+from checklist_template import TEMPLATE_CACHE_DIR
+from report_core import (BUILTIN_TEMPLATE, COMPACT_MAGIC as MAGIC, METADATA_FIELDS, NEAR_MISS_FIELDS,
+                         ProjectFileError, ReportModel)
+
+FORMAT_VERSION = 1
+_PREFIX = struct.Struct("<4sBI") # magic, version, header length
+_SECTION_TYPES = {"checklist": list, "near_miss": dict, "action_points": str, "links": list} # Written in this order
+
+
+def is_compact_file(file_path):
+    """True if the file starts with the compact format's magic bytes."""
+    try:
+        with open(file_path, "rb") as f:
+            return f.read(len(MAGIC)) == MAGIC
+    except OSError:
+        return False
+
+def _pack(value):
+    return zlib.compress(json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8"), 6)
+
+def encode_report(report):
+    """Returns the compact file contents (bytes) for a ReportModel."""
+    values = {
+        "checklist": report.answers if any(report.answers) else None,
+        "near_miss": ({"details": report.near_miss, "attachments": report.near_miss_attachments}
+                      if any(report.near_miss.values()) or report.near_miss_attachments else None),
+        "action_points": report.action_points or None,
+        "links": report.general_attachments or None,
+    }
+    sections, blobs, offset = {}, [], 0
+    for name in _SECTION_TYPES:
+        if values[name] is None: continue
+        blob = _pack(values[name])
+        sections[name] = [offset, len(blob)]
+        blobs.append(blob)
+        offset += len(blob)
+    header = json.dumps({"template": report.template.content_hash, "template_name": report.template.name,
+                         "questions": len(report.template), "question_ids": [q.id for q in report.template.questions],
+                         "metadata": report.metadata, "sections": sections},
+                        ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return _PREFIX.pack(MAGIC, FORMAT_VERSION, len(header)) + header + b"".join(blobs)
+
+def _cached_template(content_hash):
+    """Compiled template with the given hash from the built-in checklist or the template cache (else None)."""
+    if content_hash == BUILTIN_TEMPLATE.content_hash:
+        return BUILTIN_TEMPLATE
+    try:
+        with open(os.path.join(TEMPLATE_CACHE_DIR, content_hash + ".pickle"), "rb") as f:
+            return pickle.load(f)
+    except Exception:
+        return None
+
+def _text(value):
+    return value if isinstance(value, str) else ""
+
+def _is_span(span, size):
+    return (isinstance(span, list) and len(span) == 2 and all(type(n) is int and n >= 0 for n in span)
+            and span[0] + span[1] <= size)
+
+def _is_text_list(value):
+    return isinstance(value, list) and all(isinstance(v, str) for v in value)
+
+def _check_header(header, data_size):
+    """Raises ValueError for a header this module did not write."""
+    if not isinstance(header, dict): raise ValueError("header is not an object")
+    if not isinstance(header.get("template", ""), str): raise ValueError("bad template hash")
+    metadata = header.get("metadata") or {}
+    if not isinstance(metadata, dict) or not all(isinstance(v, str) for v in metadata.values()):
+        raise ValueError("metadata must map field names to text")
+    sections = header.get("sections") or {}
+    if not isinstance(sections, dict) or not all(_is_span(span, data_size) for span in sections.values()):
+        raise ValueError("bad section table")
+    if header.get("question_ids") is not None and not _is_text_list(header["question_ids"]):
+        raise ValueError("bad question id list")
+
+
+class CompactProject:
+    """A compact project file opened for reading. Only the header is parsed up front."""
+    def __init__(self, raw, name="project"):
+        self.name = name
+        try:
+            magic, version, header_len = _PREFIX.unpack_from(raw)
+            if magic != MAGIC: raise ValueError("not a compact project file")
+            if version > FORMAT_VERSION: raise ValueError(f"format version {version} is newer than this app")
+            body = _PREFIX.size + header_len
+            if body > len(raw): raise ValueError("file is truncated")
+            header = json.loads(raw[_PREFIX.size:body].decode("utf-8"))
+            _check_header(header, len(raw) - body)
+        except (struct.error, ValueError) as e:
+            raise ProjectFileError(f"{name}: invalid compact project file ({e})") from e
+        self._raw, self._body = raw, body
+        self.template_hash = header.get("template", "")
+        self.template_name = str(header.get("template_name", ""))
+        self.question_ids = header.get("question_ids") # None in files written before ids were stored
+        self.metadata = header.get("metadata") or {}
+        self._sections = header.get("sections") or {}
+        self._decoded = {}
+
+    @classmethod
+    def open(cls, file_path):
+        try:
+            with open(file_path, "rb") as f:
+                return cls(f.read(), os.path.basename(file_path))
+        except OSError as e:
+            raise ProjectFileError(f"{os.path.basename(file_path)}: could not read file ({e})") from e
+
+    def section(self, name, default=None):
+        """Decoded value of a section (decompressed on first access; `default` if it was not written)."""
+        if name not in self._decoded:
+            span = self._sections.get(name)
+            if span is None:
+                self._decoded[name] = default
+            else:
+                start = self._body + span[0]
+                try:
+                    value = json.loads(zlib.decompress(self._raw[start:start + span[1]]).decode("utf-8"))
+                    if not isinstance(value, _SECTION_TYPES.get(name, object)):
+                        raise ValueError(f"expected {_SECTION_TYPES[name].__name__}, got {type(value).__name__}")
+                except (zlib.error, ValueError) as e:
+                    raise ProjectFileError(f"{self.name}: damaged '{name}' section ({e})") from e
+                self._decoded[name] = value
+        return self._decoded[name]
+
+    def writer_template(self, template=None):
+        """The template the file was written with: `template` if the hash matches, else from the cache.
+
+        Only needed for files without question ids. Raises ProjectFileError if it is not available.
+        """
+        if template is not None and template.content_hash == self.template_hash:
+            return template
+        found = _cached_template(self.template_hash)
+        if found is None:
+            raise ProjectFileError(f"{self.name}: saved with checklist template '{self.template_name}', which is not "
+                                   "available. Open that template first (File -> Checklist Template).")
+        return found
+
+    def _stored_answers(self):
+        return [_text(a) for a in self.section("checklist", [])]
+
+    def answers(self, template=None):
+        """Checklist answers by question index of `template` (default: built-in), mapped by id if it differs."""
+        template = template or BUILTIN_TEMPLATE
+        stored = self._stored_answers()
+        if template.content_hash == self.template_hash:
+            return (stored + [""] * len(template))[:len(template)]
+        if self.question_ids is not None:
+            answers = [""] * len(template)
+            for question_id, answer in zip(self.question_ids, stored):
+                index = template.index_by_id.get(question_id)
+                if index is not None: answers[index] = answer
+            return answers
+        writer = self.writer_template(template)
+        if writer is template:
+            return list(stored)
+        report = ReportModel(writer)
+        report.answers[:] = (stored + [""] * len(writer))[:len(writer)]
+        report.set_template(template)
+        return report.answers
+
+    def load_header_into(self, report):
+        """Fills metadata and checklist answers of a ReportModel (near miss, action points and links untouched)."""
+        for k in METADATA_FIELDS: report.metadata[k] = self.metadata.get(k, "")
+        report.answers[:] = self.answers(report.template)
+
+    def load_sections_into(self, report):
+        """Fills the near miss, action points and link sections of a ReportModel."""
+        near_miss = self.section("near_miss", {})
+        details = near_miss.get("details")
+        if not isinstance(details, dict): details = {}
+        for k in NEAR_MISS_FIELDS: report.near_miss[k] = _text(details.get(k))
+        attachments = near_miss.get("attachments")
+        report.near_miss_attachments[:] = [u for u in attachments if isinstance(u, str)] if isinstance(attachments, list) else []
+        report.action_points = self.section("action_points", "")
+        report.general_attachments[:] = [u for u in self.section("links", []) if isinstance(u, str)]
+
+    def to_report(self, template=None):
+        report = ReportModel(template)
+        self.load_header_into(report)
+        self.load_sections_into(report)
+        return report
+
+    def to_dict(self):
+        """get_all_data() layout, with answers keyed by the question text of the writing template.
+
+        If that template is not available, answers are keyed by question id (project_schema accepts both).
+        """
+        writer = _cached_template(self.template_hash)
+        if writer is not None or self.question_ids is None:
+            return self.to_report(writer or self.writer_template()).to_dict()
+        report = ReportModel()
+        self.load_sections_into(report)
+        data = report.to_dict()
+        data["metadata"] = {k: self.metadata.get(k, "") for k in METADATA_FIELDS}
+        data["checklist"] = dict(zip(self.question_ids, self._stored_answers()))
+        return data
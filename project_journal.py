@@ -0,0 +1,87 @@
+# project_journal.py - Write-ahead journal of per-field edits, used for autosave and crash recovery
+#
+# Every edit is appended as one JSON line (a few bytes) next to the project file:
+#   SafetyChecklist_WH1_2024-05-01.json.journal
+#   {"s": "metadata", "k": "Location", "v": "Pune"}
+#   {"s": "checklist", "k": "is_your_fire_noc_valid_and_current", "v": "Yes"}
+#   {"s": "general_attachments", "v": ["https://..."]}
+# The journal is folded into the project file (atomically) on save/autosave and then emptied.
+# After a crash, the records still in the journal are replayed on top of the project file.
+# Unsaved ("New Project") reports journal to UNTITLED_JOURNAL instead.
+
+import json
+import os
+
+AUTOSAVE_DIR = os.path.join(os.path.expanduser("~"), ".warehouse_safety", "autosave")
+UNTITLED_JOURNAL = os.path.join(AUTOSAVE_DIR, "untitled.journal")
+JOURNAL_SUFFIX = ".journal"
+
+
+def journal_path_for(project_path):
+    """Journal file belonging to a project file (or the untitled journal if there is no file yet)."""
+    return project_path + JOURNAL_SUFFIX if project_path else UNTITLED_JOURNAL
+
+def read_journal(journal_path):
+    """Returns the records in a journal file. A torn last line (crash mid-write) is ignored."""
+    records = []
+    try:
+        with open(journal_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue # Partial line from an interrupted write
+                if isinstance(record, dict) and "s" in record: records.append(record)
+    except FileNotFoundError:
+        pass
+    return records
+
+
+class ProjectJournal:
+    """Append-only change log for one project file."""
+    def __init__(self, journal_path):
+        self.path = journal_path
+        self.pending = 0 # Records appended since the last compaction
+        self._file = None
+
+    def append(self, section, key, value):
+        """Records one field change. Flushed immediately so it survives the app being killed."""
+        if self._file is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            torn = self._ends_mid_line()
+            self._file = open(self.path, 'a', encoding='utf-8')
+            if torn: self._file.write("\n") # Keep the next record off a partial line left by a crash
+        record = {"s": section, "v": value} if key is None else {"s": section, "k": key, "v": value}
+        self._file.write(json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n")
+        self._file.flush()
+        self.pending += 1
+
+    def _ends_mid_line(self):
+        try:
+            with open(self.path, 'rb') as f:
+                f.seek(0, os.SEEK_END)
+                if f.tell() == 0: return False
+                f.seek(-1, os.SEEK_END)
+                return f.read(1) != b"\n"
+        except FileNotFoundError:
+            return False
+
+    def records(self):
+        return read_journal(self.path)
+
+    def clear(self):
+        """Empties the journal once its changes are safely in the project file."""
+        self.close()
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+        self.pending = 0
+
+    def close(self):
+        if self._file is not None:
+            try:
+                self._file.close()
+            except OSError:
+                pass
+            self._file = None
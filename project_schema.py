@@ -0,0 +1,201 @@
+# project_schema.py - Declared layout of project data (get_all_data()) and a validating single-pass loader
+#
+# load_project_data() walks a loaded project dict once against PROJECT_SCHEMA, building the
+# ReportModel and collecting every problem with its JSON path, e.g.
+#   $.near_miss.attachments[2]: expected a string, got object
+#   $.checklist["Is the dock clear?"]: unknown question (answer ignored)
+# Errors make a file unusable. Warnings (unknown fields or questions, numbers where text is expected,
+# unusual Yes/No answers) are reported, but the file still loads. Checklist keys may be a question's
+# text, its id or one of its "previous_texts" from the template, so renamed questions keep their answers.
+#
+# iter_reports() is the streaming form for batch tools: one file is in memory at a time, and the
+# caller reports the problems of all files together at the end.
+
+import json
+import re
+from collections import namedtuple
+
+from report_core import BUILTIN_TEMPLATE, METADATA_FIELDS, NEAR_MISS_FIELDS, ProjectFileError, ReportModel, read_project_file
+
+ERROR, WARNING = "error", "warning"
+TEXT, TEXT_LIST, ANSWERS = "text", "text list", "answers" # Leaf types; dicts are nested objects
+
+PROJECT_SCHEMA = {
+    "metadata": {k: TEXT for k in METADATA_FIELDS},
+    "checklist": ANSWERS, # {question text / id / previous text: answer}
+    "near_miss": {
+        "details": {k: TEXT for k in NEAR_MISS_FIELDS},
+        "attachments": TEXT_LIST,
+    },
+    "action_points": TEXT,
+    "general_attachments": TEXT_LIST,
+}
+YES_NO_VALUES = ("Yes", "No", "N/A", "")
+_IDENTIFIER_RE = re.compile(r"[A-Za-z_]\w*\Z")
+_TYPE_NAMES = {dict: "object", list: "array", str: "string", bool: "boolean", int: "number", float: "number"}
+
+
+class Problem(namedtuple("Problem", "path message level")):
+    """One validation finding; str() gives "<json path>: <message>" (just the message for file-level problems)."""
+    __slots__ = ()
+
+    def __str__(self):
+        return f"{self.path}: {self.message}" if self.path else self.message
+
+LoadResult = namedtuple("LoadResult", "path report errors warnings") # report is None if there are errors
+
+
+class ProjectValidationError(ProjectFileError):
+    """A project file with structural errors. `problems` lists every error found."""
+    def __init__(self, name, problems):
+        self.problems = problems
+        super().__init__(f"{name}: " + "; ".join(str(p) for p in problems))
+
+
+def _type_name(value):
+    return "null" if value is None else _TYPE_NAMES.get(type(value), type(value).__name__)
+
+def format_path(path):
+    """JSON path text for a key tuple: ("near_miss", "attachments", 2) -> $.near_miss.attachments[2]."""
+    parts = ["$"]
+    for key in path:
+        if isinstance(key, int): parts.append(f"[{key}]")
+        elif _IDENTIFIER_RE.match(key): parts.append(f".{key}")
+        else: parts.append(f"[{json.dumps(key, ensure_ascii=False)}]")
+    return "".join(parts)
+
+
+class _Loader:
+    """Converts one project dict following PROJECT_SCHEMA; missing or null values become empty.
+
+    Paths are kept as key tuples and only formatted when there is a problem to report.
+    """
+    def __init__(self, template):
+        self.template = template
+        self.problems = []
+
+    def problem(self, path, message, level=ERROR):
+        self.problems.append(Problem(format_path(path), message, level))
+
+    def value(self, value, schema, path):
+        if schema == TEXT: return self.text(value, path)
+        if schema == TEXT_LIST: return self.text_list(value, path)
+        if schema == ANSWERS: return self.answers(value, path)
+        return self.object(value, schema, path)
+
+    def text(self, value, path):
+        if value.__class__ is str:
+            return value
+        if value is None:
+            return ""
+        if isinstance(value, (bool, int, float)):
+            self.problem(path, f"expected a string, got {_type_name(value)} (used as text)", WARNING)
+            return str(value)
+        self.problem(path, f"expected a string, got {_type_name(value)}")
+        return ""
+
+    def text_list(self, value, path):
+        if value is None:
+            return []
+        if not isinstance(value, list):
+            self.problem(path, f"expected an array, got {_type_name(value)}")
+            return []
+        if all(item.__class__ is str for item in value):
+            return list(value)
+        return [self.text(item, path + (i,)) for i, item in enumerate(value)]
+
+    def object(self, value, schema, path):
+        if value is None:
+            value = {}
+        elif not isinstance(value, dict):
+            self.problem(path, f"expected an object, got {_type_name(value)}")
+            value = {}
+        elif len(value) != len(schema) or not all(key in schema for key in value):
+            for key in value:
+                if key not in schema: self.problem(path + (str(key),), "unknown field (ignored)", WARNING)
+        result = {}
+        for key, sub in schema.items():
+            item = value.get(key)
+            result[key] = item if sub == TEXT and item.__class__ is str else self.value(item, sub, path + (key,))
+        return result
+
+    def answers(self, value, path):
+        answers, matched_by = [""] * len(self.template), [None] * len(self.template)
+        if value is None:
+            return answers
+        if not isinstance(value, dict):
+            self.problem(path, f"expected an object, got {_type_name(value)}")
+            return answers
+        keys = _answer_keys(self.template)
+        for key, answer in value.items():
+            entry = keys.get(key)
+            if entry is None:
+                self.problem(path + (key,), "unknown question (answer ignored)", WARNING)
+                continue
+            index, rank, yes_no = entry
+            if answer.__class__ is not str: answer = self.text(answer, path + (key,))
+            if yes_no and answer not in YES_NO_VALUES:
+                self.problem(path + (key,), f"unexpected answer {answer!r} for a Yes/No question", WARNING)
+            previous = matched_by[index]
+            if previous is not None:
+                if answers[index] != answer:
+                    self.problem(path + (key,), f"answered twice (also under {previous[1]!r}); the current question "
+                                                "text takes precedence over the id, the id over previous texts", WARNING)
+                if previous[0] <= rank: continue
+            answers[index], matched_by[index] = answer, (rank, key)
+        return answers
+
+_answer_key_tables = {} # content hash -> {checklist key: (question index, rank, is yes/no)}
+
+def _answer_keys(template):
+    """Every key a template accepts in "checklist": current text (rank 1), id (2) and previous texts (3)."""
+    table = _answer_key_tables.get(template.content_hash)
+    if table is None:
+        table = {}
+        for text, index in template.index_by_text.items():
+            question = template.questions[index]
+            table[text] = (index, 1 if question.text == text else 3, question.type == "yes_no")
+        for question_id, index in template.index_by_id.items():
+            table.setdefault(question_id, (index, 2, template.questions[index].type == "yes_no"))
+        _answer_key_tables[template.content_hash] = table
+    return table
+
+
+# ==============================================================================
+# Loading
+# ==============================================================================
+def load_project_data(data, template=None):
+    """Validates a loaded project dict and builds its ReportModel in one pass.
+
+    Returns (report, errors, warnings); report is None if there are errors. Problems are Problem tuples.
+    """
+    template = template or BUILTIN_TEMPLATE
+    if not isinstance(data, dict):
+        return None, [Problem("$", f"expected an object, got {_type_name(data)}", ERROR)], []
+    loader = _Loader(template)
+    fields = loader.object(data, PROJECT_SCHEMA, ())
+    errors = [p for p in loader.problems if p.level == ERROR]
+    warnings = [p for p in loader.problems if p.level == WARNING]
+    if errors:
+        return None, errors, warnings
+    report = ReportModel(template)
+    report.metadata.update(fields["metadata"])
+    report.answers[:] = fields["checklist"]
+    report.near_miss.update(fields["near_miss"]["details"])
+    report.near_miss_attachments[:] = fields["near_miss"]["attachments"]
+    report.action_points = fields["action_points"]
+    report.general_attachments[:] = fields["general_attachments"]
+    return report, errors, warnings
+
+def load_project_file(file_path, template=None):
+    """Reads (.json or compact) and validates one project file. Returns a LoadResult; never raises."""
+    try:
+        data = read_project_file(file_path)
+    except ProjectFileError as e:
+        return LoadResult(file_path, None, [Problem("", str(e), ERROR)], []) # Unreadable file or broken JSON
+    return LoadResult(file_path, *load_project_data(data, template))
+
+def iter_reports(file_paths, template=None):
+    """Streaming loader for batch tools: yields a LoadResult per path, holding one file at a time."""
+    for file_path in file_paths:
+        yield load_project_file(file_path, template)
@@ -0,0 +1,265 @@
+# report_core.py - Tk-free data layer shared by the GUI and headless tools
+
+import json
+import os
+from datetime import datetime
+
+from checklist_template import compile_structure, load_template
+
+# --- Brand Colors (shared by the GUI and exported reports) ---
+PRIMARY_COLOR = "#39B54A" # Main Green
+SECONDARY_COLOR = "#14467C" # Dark Blue
+DARK_GREY = "#676767" # Placeholder text in exports ([N/A], [None])
+
+# --- Checklist Structure (Unchanged) ---
+CHECKLIST_STRUCTURE = [("Fire Safety Training", [("Have you commenced Fire Safety presentations as scheduled?", "yes_no", True), ("How are you tracking training completion?", "text", True)]), ("Documentation & Certifications", [("Is your Fire NOC valid and current?", "yes_no", True), ("Are warehouse fire layout diagrams displayed properly?", "yes_no", True)]), ("Safety Infrastructure", [("Have fluorescent markings been installed for emergency evacuation routes?", "yes_no", True), ("Are smoke detection systems, fire alarms, and emergency notification boards in place?", "yes_no", True), ("When was the last functionality test for sprinkler systems and fire hydrants?", "text", True)]), ("Operational Protocols", [("Is visitor registration being properly maintained?", "yes_no", True), ("Have daily SOPs and safety checklists been implemented?", "yes_no", True), ("How are you enforcing the prohibition of fire-ignition tools?", "text", True), ("Have you established machinery inspection schedules for hazard identification?", "yes_no", True)]), ("Maintenance Documentation", [("Has the procurement team implemented maintenance logbook protocols?", "yes_no", True)]), ("Personnel Qualification", [("Have you verified ITI certification or equivalent for all electrical personnel?", "yes_no", True)]), ("Safety Engagement Initiatives", [("What safety engagement activities have you organized recently?", "text", False), ("Which best practices from training have you implemented?", "text", False), ("Have you developed facility-specific internal safety protocols?", "yes_no", True)]), ("Compliance Verification", [("Have cross-Warehouse audits been conducted?", "yes_no", False), ("Is your monthly machinery safety inspection schedule established?", "yes_no", True), ("When was your last mock drill conducted?", "text", True), ("How are you maintaining inspection and compliance records?", "text", True)]), ("Seasonal Safety", [("Have all seasonal equipment (water coolers, etc.) been inspected?", "yes_no", True)])]
+
+# Compiled form of the built-in checklist, used whenever no external template is loaded
+BUILTIN_TEMPLATE = compile_structure("Standard Warehouse", CHECKLIST_STRUCTURE)
+
+def resolve_template(template_path=None):
+    """Compiled template of a template file, or the built-in checklist for None. Raises TemplateError.
+
+    Cheap to call in every worker process: load_template() keeps an on-disk cache of compiled templates.
+    """
+    return load_template(template_path) if template_path else BUILTIN_TEMPLATE
+
+# --- Field Definitions ---
+METADATA_FIELDS = ["Warehouse Name", "Location", "Report Date", "Report Month", "Uploaded By Name", "Uploaded By Role", "Uploaded By Emp ID", "Uploaded By Email", "Manager Name"]
+NEAR_MISS_FIELDS = ["Incident Date", "Incident Location", "Description", "Immediate Action", "Prevention Suggestion"]
+REQUIRED_METADATA = ["Warehouse Name", "Location", "Uploaded By Name", "Uploaded By Role"]
+
+# --- Project File Formats ---
+COMPACT_EXTENSION = ".wsc" # Compact binary project files (project_format.py); any other name is JSON
+COMPACT_MAGIC = b"WSCP"
+
+
+class ProjectFileError(Exception):
+    """Raised when a project file cannot be read or does not match the get_all_data() layout."""
+
+
+# ==============================================================================
+# Project File Helpers
+# ==============================================================================
+def iter_questions(structure=CHECKLIST_STRUCTURE):
+    """Yields (section_title, question_text, answer_type, mandatory) in checklist order."""
+    for section_title, questions in structure:
+        for qt, at, m in questions:
+            yield section_title, qt, at, m
+
+def safe_file_name(text):
+    """`text` usable as part of a file name: spaces and anything but letters, digits, "-", "_" and "." become "_"."""
+    return "".join(c if c.isalnum() or c in "-_." else "_" for c in text.replace(" ", "_"))
+
+def report_file_stem(metadata, prefix="SafetyReport"):
+    """Default file name (no extension) for a report: <prefix>_<Warehouse_Name>_<Report Date>, made file-name safe."""
+    wh_name = safe_file_name(metadata.get("Warehouse Name") or "") or "UnknownWH"
+    rep_date = safe_file_name(metadata.get("Report Date") or datetime.now().strftime('%Y%m%d'))
+    return f"{prefix}_{wh_name}_{rep_date}"
+
+def warehouse_key(name):
+    """Grouping key for a warehouse name: case-insensitive, surrounding spaces ignored ("" -> "unknown")."""
+    return (str(name or "").strip() or "Unknown").casefold()
+
+def report_month_key(metadata):
+    """YYYY-MM for a report: from "Report Date" (YYYY-MM-DD), else "Report Month" ("May 2024"), else ""."""
+    date = (metadata.get("Report Date") or "").strip()
+    if len(date) >= 7 and date[4] == "-" and date[:4].isdigit() and date[5:7].isdigit():
+        return date[:7]
+    try:
+        return datetime.strptime((metadata.get("Report Month") or "").strip(), "%B %Y").strftime("%Y-%m")
+    except ValueError:
+        return ""
+
+def _read_project_bytes(file_path):
+    try:
+        with open(file_path, 'rb') as f:
+            return f.read()
+    except OSError as e:
+        raise ProjectFileError(f"{os.path.basename(file_path)}: could not read file ({e})") from e
+
+def _parse_project_bytes(raw, file_path, header_only=False):
+    if raw.startswith(COMPACT_MAGIC):
+        from project_format import CompactProject
+        project = CompactProject(raw, os.path.basename(file_path))
+        return {"metadata": project.metadata} if header_only else project.to_dict()
+    try:
+        return json.loads(raw.decode('utf-8'))
+    except (json.JSONDecodeError, UnicodeDecodeError) as e:
+        raise ProjectFileError(f"{os.path.basename(file_path)}: invalid JSON ({e})") from e
+
+def read_project_file(file_path):
+    """Reads a project file (.json, or the compact format of project_format.py) and returns the raw data dictionary."""
+    return _parse_project_bytes(_read_project_bytes(file_path), file_path)
+
+def read_project_metadata(file_path):
+    """Metadata dict of a project file. Compact files only decode their header."""
+    data = _parse_project_bytes(_read_project_bytes(file_path), file_path, header_only=True)
+    metadata = data.get("metadata") if isinstance(data, dict) else None
+    return metadata if isinstance(metadata, dict) else {}
+
+def is_compact_path(file_path):
+    """True if a project file name uses the compact format's extension."""
+    return file_path.lower().endswith(COMPACT_EXTENSION)
+
+def write_project_file(file_path, data, template=None):
+    """Writes a project dict (or ReportModel) atomically: temp file in the same folder, fsync, then os.replace.
+
+    A crash mid-write leaves the previous file intact instead of a truncated one. Paths ending in
+    COMPACT_EXTENSION get the compact format (see project_format.py), everything else JSON.
+    """
+    tmp_path = f"{file_path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, 'wb') as f:
+            if is_compact_path(file_path):
+                from project_format import encode_report
+                f.write(encode_report(ReportModel.coerce(data, template)))
+            else:
+                if isinstance(data, ReportModel): data = data.to_dict()
+                f.write(json.dumps(data, indent=4, ensure_ascii=False).encode('utf-8'))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, file_path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+def validate_project_data(data, template=None):
+    """Returns a list of structural errors in a loaded project dict, each with its JSON path (empty list means valid).
+
+    See project_schema.py; load_project_data() there also returns the ReportModel and the warnings.
+    """
+    from project_schema import load_project_data
+    return [str(p) for p in load_project_data(data, template)[1]]
+
+def normalize_project_data(data):
+    """Returns a copy of a loaded project dict with every known field present (missing -> empty)."""
+    return ReportModel.from_dict(data).to_dict()
+
+
+# ==============================================================================
+# Report Model
+# ==============================================================================
+def _str(value):
+    """Coerces loaded values to str (None -> "")."""
+    return value if isinstance(value, str) else ("" if value is None else str(value))
+
+class ReportModel:
+    """Plain-Python report state. Checklist answers are stored by question index of the compiled template."""
+    __slots__ = ("template", "metadata", "answers", "near_miss", "near_miss_attachments", "action_points", "general_attachments")
+
+    def __init__(self, template=None):
+        self.template = template or BUILTIN_TEMPLATE
+        self.metadata = {k: "" for k in METADATA_FIELDS}
+        self.answers = [""] * len(self.template)
+        self.near_miss = {k: "" for k in NEAR_MISS_FIELDS}
+        self.near_miss_attachments = [] # List of URL strings
+        self.action_points = ""
+        self.general_attachments = [] # List of URL strings
+
+    @classmethod
+    def new(cls, template=None):
+        """Returns an empty report with today's date and month filled in."""
+        report = cls(template)
+        report.reset()
+        return report
+
+    @classmethod
+    def from_dict(cls, data, template=None):
+        """Builds a report from a get_all_data() style dictionary."""
+        report = cls(template)
+        report.update_from_dict(data)
+        return report
+
+    @classmethod
+    def coerce(cls, report_or_data, template=None):
+        """Accepts either a ReportModel or a get_all_data() dict."""
+        return report_or_data if isinstance(report_or_data, cls) else cls.from_dict(report_or_data, template)
+
+    def reset(self):
+        """Clears every field in place (lists keep their identity) and sets the default dates."""
+        for k in self.metadata: self.metadata[k] = ""
+        self.metadata["Report Date"] = datetime.now().strftime('%Y-%m-%d')
+        self.metadata["Report Month"] = datetime.now().strftime('%B %Y')
+        self.answers[:] = [""] * len(self.template)
+        for k in self.near_miss: self.near_miss[k] = ""
+        self.near_miss_attachments.clear()
+        self.action_points = ""
+        self.general_attachments.clear()
+
+    def update_from_dict(self, data):
+        """Replaces the report contents in place from a get_all_data() style dictionary."""
+        meta = data.get("metadata") or {}
+        checklist = data.get("checklist") or {}
+        near_miss = data.get("near_miss") or {}
+        details = near_miss.get("details") or {}
+        for k in self.metadata: self.metadata[k] = _str(meta.get(k))
+        # Project files key answers by question text; ids are accepted too so reworded questions still load
+        self.answers[:] = [_str(checklist.get(q.text, checklist.get(q.id))) for q in self.template.questions]
+        if len(self.template.index_by_text) > len(self.template): # Template lists previous question texts
+            for text, index in self.template.index_by_text.items():
+                if not self.answers[index] and text in checklist: self.answers[index] = _str(checklist[text])
+        for k in self.near_miss: self.near_miss[k] = _str(details.get(k))
+        self.near_miss_attachments[:] = [_str(u) for u in near_miss.get("attachments") or []]
+        self.action_points = _str(data.get("action_points"))
+        self.general_attachments[:] = [_str(u) for u in data.get("general_attachments") or []]
+
+    def to_dict(self):
+        """Returns the get_all_data() dictionary layout used by project files and exports."""
+        return {
+            "metadata": dict(self.metadata),
+            "checklist": {q.text: self.answers[i] for i, q in enumerate(self.template.questions)},
+            "near_miss": {
+                "details": dict(self.near_miss),
+                "attachments": list(self.near_miss_attachments)
+            },
+            "action_points": self.action_points,
+            "general_attachments": list(self.general_attachments)
+        }
+
+    def _question_index(self, question):
+        index = self.template.find(question)
+        if index is None: raise KeyError(question)
+        return index
+
+    def get_answer(self, question):
+        """Answer for a question text or id. Raises KeyError for a question not in the template."""
+        return self.answers[self._question_index(question)]
+
+    def set_answer(self, question, value):
+        self.answers[self._question_index(question)] = value
+
+    def set_template(self, template):
+        """Switches to another compiled template, carrying answers over by question id (then text)."""
+        old_template, old_answers = self.template, list(self.answers)
+        self.template = template
+        self.answers[:] = [""] * len(template)
+        for i, q in enumerate(old_template.questions):
+            index = template.find(q.id)
+            if index is None: index = template.index_by_text.get(q.text)
+            if index is not None: self.answers[index] = old_answers[i]
+
+    def apply_change(self, section, key, value):
+        """Applies one journal record (see project_journal.py). Unknown fields/questions are ignored."""
+        if section == "metadata" and key in self.metadata: self.metadata[key] = _str(value)
+        elif section == "near_miss" and key in self.near_miss: self.near_miss[key] = _str(value)
+        elif section == "checklist":
+            index = self.template.find(key)
+            if index is not None: self.answers[index] = _str(value)
+        elif section == "action_points": self.action_points = _str(value)
+        elif section == "near_miss_attachments": self.near_miss_attachments[:] = [_str(u) for u in value or []]
+        elif section == "general_attachments": self.general_attachments[:] = [_str(u) for u in value or []]
+
+    def iter_sections(self):
+        """Yields (section_title, [(question, answer_type, mandatory, answer), ...]) in checklist order."""
+        for (section_title, questions), (start, _) in zip(self.template.sections, self.template.section_ranges):
+            yield section_title, [(qt, at, m, self.answers[start + i]) for i, (qt, at, m) in enumerate(questions)]
+
+    def has_content(self):
+        """True if anything beyond the default report date/month has been entered."""
+        return (any(v for k, v in self.metadata.items() if k not in ("Report Date", "Report Month")) or
+                any(self.answers) or any(self.near_miss.values()) or
+                bool(self.near_miss_attachments) or bool(self.action_points) or bool(self.general_attachments))
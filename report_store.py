@@ -0,0 +1,260 @@
+# report_store.py - Optional SQLite store of saved reports for historical queries (local file, no server)
+#
+# Project .json files stay the source of truth; the store indexes them so questions like
+# "which warehouses answered No to the Fire NOC question in the last six months" need one query
+# instead of opening every file. It can be rebuilt from the files at any time:
+#   python main.py db import path/to/projects [--recursive]
+#   python main.py db query --question is_your_fire_noc_valid_and_current --answer No --months 6
+#
+# The GUI writes to the store on save when WAREHOUSE_REPORT_DB is set to a database path.
+
+import argparse
+import json
+import os
+import sqlite3
+import sys
+from datetime import datetime
+
+from checklist_template import TemplateError
+from consolidate import DEFAULT_PATTERN, iter_project_files
+from project_schema import iter_reports
+from report_core import METADATA_FIELDS, ReportModel, report_month_key, resolve_template, warehouse_key
+
+STORE_ENV_VAR = "WAREHOUSE_REPORT_DB" # Database path; the GUI only uses the store when this is set
+DEFAULT_DB_PATH = os.path.join(os.path.expanduser("~"), ".warehouse_safety", "reports.sqlite3")
+IMPORT_BATCH_SIZE = 500 # Reports written per transaction during batch import
+_SCHEMA_VERSION = 2
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS reports (
+    id INTEGER PRIMARY KEY,
+    source_path TEXT NOT NULL UNIQUE,
+    warehouse TEXT NOT NULL,
+    warehouse_key TEXT NOT NULL DEFAULT '', -- report_core.warehouse_key(warehouse), for case-insensitive matching
+    location TEXT,
+    report_date TEXT,
+    report_month TEXT,            -- YYYY-MM, for range queries
+    template_name TEXT,
+    metadata TEXT NOT NULL,       -- JSON object with every metadata field
+    action_points TEXT,
+    stored_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS answers (
+    report_id INTEGER NOT NULL REFERENCES reports(id) ON DELETE CASCADE,
+    question_id TEXT NOT NULL,
+    question_text TEXT NOT NULL,
+    answer TEXT NOT NULL,
+    PRIMARY KEY (report_id, question_id)
+);
+CREATE TABLE IF NOT EXISTS near_misses (
+    report_id INTEGER PRIMARY KEY REFERENCES reports(id) ON DELETE CASCADE,
+    incident_date TEXT,
+    incident_location TEXT,
+    description TEXT,
+    immediate_action TEXT,
+    prevention_suggestion TEXT
+);
+CREATE TABLE IF NOT EXISTS links (
+    report_id INTEGER NOT NULL REFERENCES reports(id) ON DELETE CASCADE,
+    kind TEXT NOT NULL,           -- 'near_miss' or 'general'
+    position INTEGER NOT NULL,
+    url TEXT NOT NULL,
+    PRIMARY KEY (report_id, kind, position)
+);
+"""
+_INDEXES = """
+DROP INDEX IF EXISTS idx_reports_warehouse_month;
+CREATE INDEX IF NOT EXISTS idx_reports_warehouse_key_month ON reports(warehouse_key, report_month);
+CREATE INDEX IF NOT EXISTS idx_reports_month ON reports(report_month);
+CREATE INDEX IF NOT EXISTS idx_answers_question ON answers(question_id, answer, report_id);
+"""
+
+
+def months_ago_key(months, today=None):
+    """YYYY-MM of the first month of the last `months` months (1 = this month only)."""
+    today = today or datetime.now()
+    index = today.year * 12 + today.month - 1 - (months - 1)
+    return f"{index // 12:04d}-{index % 12 + 1:02d}"
+
+
+class ReportStore:
+    """SQLite database of reports. Use one instance per thread (sqlite3 connections are not shared)."""
+    def __init__(self, db_path=DEFAULT_DB_PATH):
+        self.path = db_path
+        if db_path != ":memory:": os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self.conn = sqlite3.connect(db_path)
+        self.conn.execute("PRAGMA foreign_keys = ON")
+        self.conn.execute("PRAGMA journal_mode = WAL") # Readers (queries) don't block the writer (GUI saves)
+        self.conn.execute("PRAGMA synchronous = NORMAL")
+        with self.conn:
+            self.conn.executescript(_SCHEMA)
+            if self.conn.execute("PRAGMA user_version").fetchone()[0] < 2: self._add_warehouse_key()
+            self.conn.executescript(_INDEXES)
+            self.conn.execute(f"PRAGMA user_version = {_SCHEMA_VERSION}")
+
+    def _add_warehouse_key(self):
+        """Version 1 stores have no warehouse_key column: adds and fills it."""
+        if "warehouse_key" in {row[1] for row in self.conn.execute("PRAGMA table_info(reports)")}: return
+        self.conn.create_function("warehouse_key", 1, warehouse_key)
+        self.conn.execute("ALTER TABLE reports ADD COLUMN warehouse_key TEXT NOT NULL DEFAULT ''")
+        self.conn.execute("UPDATE reports SET warehouse_key = warehouse_key(warehouse)")
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # --- Writing ---
+    def save_report(self, source_path, report):
+        """Stores (or replaces) one report, keyed by its project file path."""
+        self.save_reports([(source_path, report)])
+
+    def save_reports(self, items):
+        """Stores many (source_path, ReportModel) pairs in a single transaction. Returns the count."""
+        count = 0
+        with self.conn:
+            for source_path, report in items:
+                self._write(os.path.abspath(source_path), report)
+                count += 1
+        return count
+
+    def _write(self, source_path, report):
+        meta = report.metadata
+        warehouse = meta.get("Warehouse Name", "").strip()
+        self.conn.execute("DELETE FROM reports WHERE source_path = ?", (source_path,)) # Children cascade
+        report_id = self.conn.execute(
+            "INSERT INTO reports (source_path, warehouse, warehouse_key, location, report_date, report_month, template_name,"
+            " metadata, action_points, stored_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (source_path, warehouse, warehouse_key(warehouse), meta.get("Location", ""), meta.get("Report Date", ""),
+             report_month_key(meta), report.template.name, json.dumps(meta, ensure_ascii=False), report.action_points,
+             datetime.now().isoformat(timespec="seconds"))).lastrowid
+        self.conn.executemany(
+            "INSERT INTO answers (report_id, question_id, question_text, answer) VALUES (?, ?, ?, ?)",
+            [(report_id, q.id, q.text, a) for q, a in zip(report.template.questions, report.answers) if a])
+        if any(report.near_miss.values()):
+            nm = report.near_miss
+            self.conn.execute("INSERT INTO near_misses VALUES (?, ?, ?, ?, ?, ?)",
+                              (report_id, nm["Incident Date"], nm["Incident Location"], nm["Description"],
+                               nm["Immediate Action"], nm["Prevention Suggestion"]))
+        self.conn.executemany(
+            "INSERT INTO links (report_id, kind, position, url) VALUES (?, ?, ?, ?)",
+            [(report_id, "near_miss", i, u) for i, u in enumerate(report.near_miss_attachments)] +
+            [(report_id, "general", i, u) for i, u in enumerate(report.general_attachments)])
+
+    def remove_report(self, source_path):
+        with self.conn:
+            self.conn.execute("DELETE FROM reports WHERE source_path = ?", (os.path.abspath(source_path),))
+
+    # --- Reading ---
+    def report_count(self):
+        return self.conn.execute("SELECT COUNT(*) FROM reports").fetchone()[0]
+
+    def find_answers(self, question_id, answer=None, since_month=None, warehouse=None):
+        """Reports that answered a question (optionally with a given answer / from a month on / one warehouse).
+
+        The warehouse is matched like report_core.warehouse_key(): ignoring case and surrounding spaces.
+        Returns [(warehouse, report_date, answer, source_path), ...] ordered by warehouse and date.
+        """
+        sql = ("SELECT r.warehouse, r.report_date, a.answer, r.source_path FROM answers a"
+               " JOIN reports r ON r.id = a.report_id WHERE a.question_id = ?")
+        params = [question_id]
+        if answer is not None: sql += " AND a.answer = ?"; params.append(answer)
+        if since_month: sql += " AND r.report_month >= ?"; params.append(since_month)
+        if warehouse: sql += " AND r.warehouse_key = ?"; params.append(warehouse_key(warehouse))
+        return self.conn.execute(sql + " ORDER BY r.warehouse_key, r.report_date", params).fetchall()
+
+    def load_report(self, source_path, template=None):
+        """Rebuilds a ReportModel from the store (None if the file was never stored)."""
+        row = self.conn.execute("SELECT id, metadata, action_points FROM reports WHERE source_path = ?",
+                                (os.path.abspath(source_path),)).fetchone()
+        if row is None:
+            return None
+        report_id, metadata, action_points = row
+        report = ReportModel(template)
+        stored_meta = json.loads(metadata)
+        for k in METADATA_FIELDS: report.metadata[k] = stored_meta.get(k, "")
+        report.action_points = action_points or ""
+        for question_id, answer in self.conn.execute("SELECT question_id, answer FROM answers WHERE report_id = ?", (report_id,)):
+            index = report.template.index_by_id.get(question_id)
+            if index is not None: report.answers[index] = answer
+        nm = self.conn.execute("SELECT incident_date, incident_location, description, immediate_action, prevention_suggestion"
+                               " FROM near_misses WHERE report_id = ?", (report_id,)).fetchone()
+        if nm: report.near_miss.update(zip(("Incident Date", "Incident Location", "Description", "Immediate Action",
+                                            "Prevention Suggestion"), nm))
+        for kind, url in self.conn.execute("SELECT kind, url FROM links WHERE report_id = ? ORDER BY kind, position", (report_id,)):
+            (report.near_miss_attachments if kind == "near_miss" else report.general_attachments).append(url)
+        return report
+
+
+# ==============================================================================
+# Batch Import
+# ==============================================================================
+def import_directory(store, directory, pattern=DEFAULT_PATTERN, recursive=False, template_path=None,
+                     batch_size=IMPORT_BATCH_SIZE):
+    """Stores every valid project file under `directory`, IMPORT_BATCH_SIZE reports per transaction.
+
+    Returns (stored_count, errors) where errors is a list of (file_path, [problems]).
+    """
+    template = resolve_template(template_path)
+    stored, errors, batch = 0, [], []
+    for result in iter_reports(iter_project_files(directory, pattern, recursive), template): # One file in memory at a time
+        if result.errors:
+            errors.append((result.path, [str(p) for p in result.errors]))
+            continue
+        batch.append((result.path, result.report))
+        if len(batch) >= batch_size:
+            stored += store.save_reports(batch)
+            batch = []
+    if batch: stored += store.save_reports(batch)
+    return stored, errors
+
+
+# ==============================================================================
+# Command Line
+# ==============================================================================
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="SQLite store of warehouse safety reports.")
+    parser.add_argument("--db", default=os.environ.get(STORE_ENV_VAR) or DEFAULT_DB_PATH,
+                        help=f"Database file (default: ${STORE_ENV_VAR} or {DEFAULT_DB_PATH})")
+    sub = parser.add_subparsers(dest="command", required=True)
+    imp = sub.add_parser("import", help="Store (or refresh) every project file in a folder")
+    imp.add_argument("directory")
+    imp.add_argument("--pattern", default=DEFAULT_PATTERN, help=f"File name pattern (default: {DEFAULT_PATTERN})")
+    imp.add_argument("--recursive", action="store_true", help="Also search sub-folders")
+    imp.add_argument("--template", default=None, help="Checklist template file (.json/.yaml); default: built-in checklist")
+    query = sub.add_parser("query", help="List reports by their answer to one question")
+    query.add_argument("--question", required=True, help="Question id (see the template file) or exact question text")
+    query.add_argument("--answer", default=None, help="Only this answer, e.g. No")
+    query.add_argument("--months", type=int, default=None, help="Only reports from the last N months")
+    query.add_argument("--warehouse", default=None)
+    query.add_argument("--template", default=None, help="Template used to look up question text (default: built-in)")
+    args = parser.parse_args(argv)
+
+    try:
+        template = resolve_template(args.template)
+    except TemplateError as e:
+        parser.error(str(e))
+    with ReportStore(args.db) as store:
+        if args.command == "import":
+            if not os.path.isdir(args.directory):
+                parser.error(f"not a directory: {args.directory}")
+            stored, errors = import_directory(store, args.directory, args.pattern, args.recursive, args.template)
+            for path, problems in errors:
+                print(f"SKIPPED {path}: " + "; ".join(problems), file=sys.stderr)
+            print(f"Stored {stored} report(s) in {args.db} ({len(errors)} skipped, {store.report_count()} in total).")
+            return 1 if errors and not stored else 0
+
+        index = template.find(args.question)
+        question_id = template.questions[index].id if index is not None else args.question
+        rows = store.find_answers(question_id, args.answer, months_ago_key(args.months) if args.months else None, args.warehouse)
+        for warehouse, report_date, answer, source_path in rows:
+            print(f"{warehouse:<24} {report_date:<12} {answer:<6} {source_path}")
+        print(f"{len(rows)} report(s), {len({warehouse_key(r[0]) for r in rows})} warehouse(s).")
+        return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
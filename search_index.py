@@ -0,0 +1,220 @@
+# search_index.py - Incremental full-text index over the free-text fields of a folder of project files
+#
+# Indexed fields: near-miss Description / Immediate Action / Prevention Suggestion and every "text"
+# checklist answer. Each folder gets one index file under SEARCH_INDEX_DIR; on refresh only files
+# whose size or modification time changed are read again, and deleted files are dropped.
+#
+# Queries are words; every word must match (AND), and each word also matches as a prefix
+# ("extinguish" finds "extinguisher"). Usage from the command line:
+#   python main.py search path/to/projects "forklift spill" [--template my_template.json]
+
+import argparse
+import bisect
+import hashlib
+import os
+import pickle
+import re
+import sys
+import time
+from collections import namedtuple
+
+from checklist_template import TemplateError
+from consolidate import DEFAULT_PATTERN, iter_project_files
+from project_schema import load_project_file
+from report_core import BUILTIN_TEMPLATE, resolve_template
+
+SEARCH_INDEX_DIR = os.path.join(os.path.expanduser("~"), ".warehouse_safety", "search_index")
+NEAR_MISS_TEXT_FIELDS = ["Description", "Immediate Action", "Prevention Suggestion"]
+_INDEX_VERSION = 1 # Bump when the pickled layout changes; old index files are then rebuilt
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+SearchHit = namedtuple("SearchHit", "path warehouse report_date field snippet")
+
+
+def tokenize(text):
+    """Lower-case word tokens of a text (letters/digits/underscore runs)."""
+    return _TOKEN_RE.findall(text.lower())
+
+def searchable_fields(report):
+    """(field label, text) pairs of a report that go into the index (empty ones skipped)."""
+    fields = [(f"Near Miss: {name}", report.near_miss.get(name, "")) for name in NEAR_MISS_TEXT_FIELDS]
+    fields += [(q.text, a) for q, a in zip(report.template.questions, report.answers) if q.type == "text"]
+    return [(label, text) for label, text in fields if text.strip()]
+
+def _snippet(text, terms, width=60):
+    """Part of `text` around the first query term, on one line."""
+    lower = text.lower()
+    positions = [p for p in (lower.find(t) for t in terms) if p >= 0]
+    start = max(0, min(positions) - width // 3) if positions else 0
+    snippet = " ".join(text[start:start + width].split())
+    return ("..." if start else "") + snippet + ("..." if start + width < len(text) else "")
+
+
+class SearchIndex:
+    """Inverted index (token -> document ids) with per-file stat signatures for incremental refresh."""
+    def __init__(self, folder, pattern=DEFAULT_PATTERN, recursive=False, template=None):
+        self.folder = os.path.abspath(folder)
+        self.pattern = pattern
+        self.recursive = recursive
+        self.template = template or BUILTIN_TEMPLATE
+        self.docs = {} # doc id -> (path, signature, warehouse, report_date, [(field label, text), ...])
+        self.doc_by_path = {}
+        self.postings = {} # token -> set of doc ids
+        self._next_id = 0
+        self._sorted_tokens = None # Built on demand for prefix lookups, dropped on every change
+
+    # --- Persistence ---
+    @staticmethod
+    def index_path(folder, cache_dir=SEARCH_INDEX_DIR):
+        key = hashlib.sha1(os.path.abspath(folder).encode("utf-8")).hexdigest()[:16]
+        return os.path.join(cache_dir, f"{key}.pickle")
+
+    @classmethod
+    def open(cls, folder, pattern=DEFAULT_PATTERN, recursive=False, template=None, cache_dir=SEARCH_INDEX_DIR):
+        """Loads the saved index of a folder (or starts an empty one) and refreshes it. Returns (index, changed_files)."""
+        index = None
+        path = cls.index_path(folder, cache_dir)
+        try:
+            with open(path, "rb") as f:
+                state = pickle.load(f)
+            if state.get("version") == _INDEX_VERSION and state.get("options") == (pattern, recursive, (template or BUILTIN_TEMPLATE).content_hash):
+                index = cls(folder, pattern, recursive, template)
+                index.docs, index.postings, index._next_id = state["docs"], state["postings"], state["next_id"]
+                index.doc_by_path = {doc[0]: doc_id for doc_id, doc in index.docs.items()}
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"Warning: rebuilding search index ({e})") # Corrupt/old index file: start over
+        if index is None:
+            index = cls(folder, pattern, recursive, template)
+        changed = index.refresh()
+        if changed: index.save(cache_dir)
+        return index, changed
+
+    def save(self, cache_dir=SEARCH_INDEX_DIR):
+        """Writes the index atomically (temp file + os.replace)."""
+        path = self.index_path(self.folder, cache_dir)
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        state = {"version": _INDEX_VERSION, "options": (self.pattern, self.recursive, self.template.content_hash),
+                 "docs": self.docs, "postings": self.postings, "next_id": self._next_id}
+        with open(tmp_path, "wb") as f:
+            pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+
+    # --- Updating ---
+    def refresh(self):
+        """Re-reads new and modified files and drops deleted ones. Returns the number of files changed."""
+        seen, changed = set(), 0
+        for path in iter_project_files(self.folder, self.pattern, self.recursive):
+            seen.add(path)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            signature = (st.st_mtime_ns, st.st_size)
+            doc_id = self.doc_by_path.get(path)
+            if doc_id is not None and self.docs[doc_id][1] == signature:
+                continue
+            if doc_id is not None: self._remove(doc_id)
+            self._add(path, signature)
+            changed += 1
+        for path in [p for p in self.doc_by_path if p not in seen]:
+            self._remove(self.doc_by_path[path])
+            changed += 1
+        return changed
+
+    def _add(self, path, signature):
+        report = load_project_file(path, self.template).report
+        if report is None:
+            fields, warehouse, report_date = [], "", "" # Still recorded, so it is not re-read until it changes
+        else:
+            fields = searchable_fields(report)
+            warehouse, report_date = report.metadata["Warehouse Name"], report.metadata["Report Date"]
+        doc_id = self._next_id
+        self._next_id += 1
+        self.docs[doc_id] = (path, signature, warehouse, report_date, fields)
+        self.doc_by_path[path] = doc_id
+        for token in {t for _, text in fields for t in tokenize(text)}:
+            self.postings.setdefault(token, set()).add(doc_id)
+        self._sorted_tokens = None
+
+    def _remove(self, doc_id):
+        path, _, _, _, fields = self.docs.pop(doc_id)
+        del self.doc_by_path[path]
+        for token in {t for _, text in fields for t in tokenize(text)}:
+            ids = self.postings.get(token)
+            if ids is not None:
+                ids.discard(doc_id)
+                if not ids: del self.postings[token]
+        self._sorted_tokens = None
+
+    # --- Searching ---
+    def _matching_docs(self, term):
+        """Documents containing a token that starts with `term`."""
+        if self._sorted_tokens is None: self._sorted_tokens = sorted(self.postings)
+        tokens = self._sorted_tokens
+        start = bisect.bisect_left(tokens, term)
+        end = bisect.bisect_left(tokens, term + "\uffff", start)
+        if end - start == 1:
+            return self.postings[tokens[start]]
+        result = set()
+        for token in tokens[start:end]: result |= self.postings[token]
+        return result
+
+    def search(self, query, limit=200):
+        """Returns up to `limit` SearchHits (one per matching field), newest reports first."""
+        terms = tokenize(query)
+        if not terms: return []
+        doc_ids = None
+        for term in sorted(terms, key=len, reverse=True): # Longest (most selective) term first
+            matches = self._matching_docs(term)
+            doc_ids = set(matches) if doc_ids is None else doc_ids & matches
+            if not doc_ids: return []
+        hits = []
+        for doc_id in sorted(doc_ids, key=lambda d: (self.docs[d][3], self.docs[d][0]), reverse=True):
+            path, _, warehouse, report_date, fields = self.docs[doc_id]
+            for label, text in fields:
+                words = tokenize(text)
+                if any(w.startswith(t) for t in terms for w in words):
+                    hits.append(SearchHit(path, warehouse, report_date, label, _snippet(text, terms)))
+                    if len(hits) >= limit: return hits
+        return hits
+
+    def __len__(self):
+        return len(self.docs)
+
+
+# ==============================================================================
+# Command Line
+# ==============================================================================
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Full-text search over near-miss and text answers of project files.")
+    parser.add_argument("directory", help="Folder containing project .json files")
+    parser.add_argument("query", help="Words to find (all must match; each also matches as a prefix)")
+    parser.add_argument("--pattern", default=DEFAULT_PATTERN, help=f"File name pattern (default: {DEFAULT_PATTERN})")
+    parser.add_argument("--recursive", action="store_true", help="Also search sub-folders")
+    parser.add_argument("--limit", type=int, default=50)
+    parser.add_argument("--template", default=None, help="Checklist template file (.json/.yaml); default: built-in checklist")
+    args = parser.parse_args(argv)
+    if not os.path.isdir(args.directory):
+        parser.error(f"not a directory: {args.directory}")
+    try:
+        template = resolve_template(args.template)
+    except TemplateError as e:
+        parser.error(str(e))
+
+    t = time.perf_counter()
+    index, changed = SearchIndex.open(args.directory, args.pattern, args.recursive, template)
+    t_index = time.perf_counter() - t
+    t = time.perf_counter()
+    hits = index.search(args.query, args.limit)
+    t_search = time.perf_counter() - t
+    for hit in hits:
+        print(f"{hit.report_date:<12} {hit.warehouse:<20} {hit.field[:40]:<40} {hit.snippet}")
+    print(f"{len(hits)} match(es) in {t_search * 1000:.1f} ms ({len(index)} files indexed, "
+          f"{changed} refreshed in {t_index * 1000:.0f} ms).")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
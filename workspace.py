@@ -0,0 +1,132 @@
+# workspace.py - Several reports open at once, with a limit on how many stay in memory
+#
+# A Workspace holds the open ReportDocuments in tab order. A document keeps everything that belongs
+# to one report: the ReportModel, the project file path, its autosave journal, the set of fields
+# edited since the last save and (for compact files) the sections that are not decoded yet. The
+# compiled checklist template and the app's widgets are shared: switching reports only changes
+# which document the widgets show.
+#
+# At most `max_loaded` reports are kept in memory (WAREHOUSE_MAX_OPEN_REPORTS, default 8). Beyond
+# that, the least recently used saved report is unloaded: its unsaved edits are written to its
+# project file first, and it is read from the file again when its tab is selected. The active
+# report and the untitled one ("New Project") are never unloaded.
+
+import os
+from collections import OrderedDict
+
+from project_journal import ProjectJournal, journal_path_for
+from report_core import write_project_file
+
+MAX_LOADED_ENV_VAR = "WAREHOUSE_MAX_OPEN_REPORTS"
+DEFAULT_MAX_LOADED = 8
+UNTITLED_NAME = "New Project"
+
+
+def _same_path(a, b):
+    return os.path.normcase(os.path.abspath(a)) == os.path.normcase(os.path.abspath(b))
+
+def max_loaded_from_env(environ=os.environ):
+    """The memory limit named by WAREHOUSE_MAX_OPEN_REPORTS (at least 1), else DEFAULT_MAX_LOADED."""
+    value = environ.get(MAX_LOADED_ENV_VAR, "").strip()
+    if not value: return DEFAULT_MAX_LOADED
+    try:
+        return max(1, int(value))
+    except ValueError:
+        print(f"Warning: ignoring {MAX_LOADED_ENV_VAR}={value!r} (not a number)")
+        return DEFAULT_MAX_LOADED
+
+
+class ReportDocument:
+    """One open report. `report` is None while the document is unloaded (see Workspace.unload)."""
+    def __init__(self, report, path=None, deferred=None):
+        self.report = report
+        self.path = path
+        self.journal = ProjectJournal(journal_path_for(path)) # Write-ahead log of edits (autosave / crash recovery)
+        self.dirty_fields = set() # (section, key) edited since the last save/load; empty = nothing unsaved
+        self.deferred = deferred # CompactProject whose near miss/link sections are not decoded yet
+
+    @property
+    def loaded(self):
+        return self.report is not None
+
+    @property
+    def is_dirty(self):
+        return bool(self.dirty_fields)
+
+    @property
+    def name(self):
+        return os.path.basename(self.path) if self.path else UNTITLED_NAME
+
+    def load_sections(self):
+        """Decodes the deferred sections of a compact project into the report. Raises ProjectFileError."""
+        project, self.deferred = self.deferred, None
+        if project is not None: project.load_sections_into(self.report)
+
+    def flush(self):
+        """Writes unsaved edits to the project file (atomic) and empties the journal.
+
+        Returns True if the file was written. Raises OSError or ProjectFileError (damaged compact file).
+        """
+        if not self.path or not (self.dirty_fields or self.journal.pending): return False
+        self.load_sections() # The file is rewritten whole
+        write_project_file(self.path, self.report.to_dict(), self.report.template)
+        self.journal.clear()
+        self.dirty_fields.clear()
+        return True
+
+
+class Workspace:
+    """Open documents in tab order, the active one, and the loaded ones by last use."""
+    def __init__(self, max_loaded=None):
+        self.documents = []
+        self.active = None
+        self.max_loaded = max(1, max_loaded or max_loaded_from_env())
+        self._recent = OrderedDict() # Loaded documents, least recently used first
+
+    def add(self, document):
+        self.documents.append(document)
+        if document.loaded: self._recent[document] = None
+        return document
+
+    def find(self, path):
+        """The open document of a project file, or None."""
+        for document in self.documents:
+            if document.path and _same_path(document.path, path): return document
+        return None
+
+    def untitled(self):
+        """The document not saved to a file yet, or None (there is at most one: it owns the untitled journal)."""
+        for document in self.documents:
+            if not document.path: return document
+        return None
+
+    def activate(self, document):
+        """Makes a loaded document the active one and its most recently used."""
+        self.active = document
+        self._recent[document] = None
+        self._recent.move_to_end(document)
+
+    def loaded_documents(self):
+        return list(self._recent)
+
+    def over_limit(self):
+        """Saved, inactive documents to unload to get back to `max_loaded`, least recently used first."""
+        excess = len(self._recent) - self.max_loaded
+        if excess <= 0: return []
+        return [d for d in self._recent if d is not self.active and d.path][:excess]
+
+    def unload(self, document):
+        """Drops a document's report from memory (flush() it first). It stays open as a tab."""
+        document.journal.close()
+        document.report = document.deferred = None
+        self._recent.pop(document, None)
+
+    def close(self, document):
+        """Removes a document. Returns the neighbour to show instead (None if it was the last one)."""
+        index = self.documents.index(document)
+        self.documents.remove(document)
+        self._recent.pop(document, None)
+        document.journal.close()
+        if self.active is document: self.active = None
+        if not self.documents: return None
+        return self.documents[min(index, len(self.documents) - 1)]